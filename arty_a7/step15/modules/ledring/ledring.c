@@ -1,5 +1,8 @@
 #include <stdio.h>
+#include <stdlib.h>
 #include <string.h>
+#include <time.h>
+#include <unistd.h>
 #include <error.h>
 
 #include <sys/socket.h>
@@ -19,17 +22,25 @@ struct session_s
     char *sys_clk;
     int frequ;
 
+    /* Each ring has its own clock edge tracker */
+    clk_edge_state_t edge;
+
     int cnt_high, cnt_low;
     int val;
     int pulse_cnt;
     int get_bit;
-    unsigned int ring[12];
-    unsigned int ring_prev[12];
+    int nleds;
+    unsigned int *ring;
+    unsigned int *ring_prev;
     int led_index;
     int val_high;
     int val_low;
     int val_reset;
 
+    /* Frames are sent at most every min_interval ns (of real time) */
+    long long min_interval;
+    long long last_send;
+
     struct sockaddr_in server;
     int sock;
 
@@ -76,6 +87,36 @@ out:
     return ret;
 }
 
+/*-----------------------------------------------------------
+ * Same for the optional arguments: an integer, or 'def'
+ * when the argument is not given.
+ *------------------------------------------------------------
+ */
+static int litex_sim_module_get_int_arg(char *args, char *arg, int def)
+{
+    json_object *jsobj = NULL;
+    json_object *obj = NULL;
+    int val = def;
+
+    jsobj = json_tokener_parse(args);
+    if (jsobj && json_object_is_type(jsobj, json_type_object) &&
+        json_object_object_get_ex(jsobj, arg, &obj))
+        val = json_object_get_int(obj);
+
+    if (jsobj)
+        json_object_put(jsobj);
+    return val;
+}
+
+/* Monotonic time in ns */
+static long long ledring_now(void)
+{
+    struct timespec ts;
+
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (long long)ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
 /*----------------------------------------
  * This is how we get pads from interfaces
  * It really should be something generic.
@@ -143,6 +184,35 @@ static int ledring_new(void **sess, char *args)
 
     memset(s, 0, sizeof(struct session_s));
 
+    /*--------------------------------------------
+     * Get arguments from sim_config.add_module
+     *--------------------------------------------
+     *
+     *  sim_config.add_module("ledring", ("data_out", 1),
+     *      args={"freq": sys_clk_freq, "nleds": 24, "port": 8889, "fps": 30})
+     *
+     * "freq" is needed, the others are optional: 12 LEDs, UDP port 8888,
+     * at most 60 frames per second sent (0 sends all the frames that
+     * change).
+     */
+    char *c_frequ = NULL;
+    ret = litex_sim_module_get_args(args, "freq", &c_frequ);
+    if (RC_OK != ret)
+            goto out;
+
+    s->nleds = litex_sim_module_get_int_arg(args, "nleds", 12);
+    int port = litex_sim_module_get_int_arg(args, "port", 8888);
+    int fps  = litex_sim_module_get_int_arg(args, "fps", 60);
+
+    s->ring      = (unsigned int *)calloc(s->nleds, sizeof(unsigned int));
+    s->ring_prev = (unsigned int *)calloc(s->nleds, sizeof(unsigned int));
+    if (s->nleds <= 0 || !s->ring || !s->ring_prev) {
+        ret = RC_NOENMEM;
+        goto out;
+    }
+    s->min_interval = fps > 0 ? 1000000000LL / fps : 0;
+    s->last_send    = ledring_now() - s->min_interval;
+
     /*--------------------------------------
      * Create a socket
      *--------------------------------------
@@ -150,36 +220,50 @@ static int ledring_new(void **sess, char *args)
     s->sock = socket(AF_INET, SOCK_DGRAM, 0);
     if (s->sock < 0) {
         printf("Error while creating socket\n");
-        return -1;
+        ret = RC_ERROR;
+        goto out;
     }
 
     s->server.sin_addr.s_addr = inet_addr("127.0.0.1");
     s->server.sin_family = AF_INET;
-    s->server.sin_port = htons(8888);
-
-    /*--------------------------------------------
-     * Get arguments from sim_config.add_module
-     *--------------------------------------------
-     */
-    char *c_frequ = NULL;
-    ret = litex_sim_module_get_args(args, "freq", &c_frequ);
-    if (RC_OK != ret)
-            goto out;
+    s->server.sin_port = htons(port);
 
     /*--------------------------------------------
      * Compute delays
      *--------------------------------------------
      */
     s->frequ = atoi(c_frequ);
+    free(c_frequ);
     s->val_high  = (int)(800e-9 * (float)(s->frequ));
     s->val_low   = (int)(400e-9 * (float)(s->frequ));
     s->val_reset = (int)(5e-6 * (float)(s->frequ));
 
+    printf("[ledring] %d LEDs sent to UDP port %d\n", s->nleds, port);
+
 out:
     *sess = (void *)s;
     return ret;
 }
 
+/*----------------------------------------
+ * Delete a session
+ *-----------------------------------------
+ */
+static int ledring_close(void *sess)
+{
+    struct session_s *s = (struct session_s *)sess;
+
+    if (!s)
+        return RC_OK;
+
+    if (s->sock > 0)
+        close(s->sock);
+    free(s->ring);
+    free(s->ring_prev);
+    free(s);
+    return RC_OK;
+}
+
 /*----------------------------------------
  * Get pads from interfaces
  *-----------------------------------------
@@ -236,11 +320,10 @@ out:
 static int ledring_tick(void *sess, uint64_t time_ps)
 {
     struct session_s *s = (struct session_s *)sess;
-    static clk_edge_state_t edge;
     int bit = 0, reset = 0;
 
     /* Because it could also be a falling edge */
-    if (!clk_pos_edge(&edge, *s->sys_clk))
+    if (!clk_pos_edge(&s->edge, *s->sys_clk))
         return RC_OK;
 
     /* If data is high, count how long it stays high */
@@ -274,16 +357,19 @@ static int ledring_tick(void *sess, uint64_t time_ps)
             s->val = (s->val << 1) | bit;
         }
 
-        /* This is the condition for sending the values to the LED ring */
+        /* This is the condition for sending the values to the LED ring
+         * (only once, when the reset gap is long enough) */
         s->cnt_high = 0;
-        if (s->cnt_low > s->val_reset)
+        if (s->cnt_low == s->val_reset + 1)
             reset = 1;
     }
 
-    /* If we've got 24 bits, move to the next LED */
+    /* If we've got 24 bits, move to the next LED (the LEDs after the
+     * last one are not there) */
     if (s->pulse_cnt == 24) {
         s->pulse_cnt = 0;
-        s->ring[s->led_index] = s->val;
+        if (s->led_index < s->nleds)
+            s->ring[s->led_index] = s->val;
         s->led_index++;
         s->val = 0;
     }
@@ -294,15 +380,21 @@ static int ledring_tick(void *sess, uint64_t time_ps)
         s->pulse_cnt = 0;
         s->led_index = 0;
 
-        /* Only if values have changed...*/
-        if (memcmp(s->ring, s->ring_prev, 12 * sizeof(unsigned int))) {
-            /* Send it */
-            int ret = sendto(s->sock, s->ring, 12 * sizeof(unsigned int),
-                             0, (const struct sockaddr *)&s->server, sizeof(s->server));
-            if (ret == -1)
-                printf("sendto error\n");
-            /* Save current values */
-            memcpy(s->ring_prev, s->ring, 12 * sizeof(unsigned int));
+        /* Only if values have changed since the last frame sent, and
+         * not more often than min_interval: the ring sends the same
+         * frame again and again, a frame not sent now will be later. */
+        if (memcmp(s->ring, s->ring_prev, s->nleds * sizeof(unsigned int))) {
+            long long now = ledring_now();
+            if (now - s->last_send >= s->min_interval) {
+                /* Send it */
+                int ret = sendto(s->sock, s->ring, s->nleds * sizeof(unsigned int),
+                                 0, (const struct sockaddr *)&s->server, sizeof(s->server));
+                if (ret == -1)
+                    printf("sendto error\n");
+                /* Save current values */
+                memcpy(s->ring_prev, s->ring, s->nleds * sizeof(unsigned int));
+                s->last_send = now;
+            }
         }
     }
 
@@ -314,7 +406,7 @@ static struct ext_module_s ext_mod = {
     ledring_start,      /* Called once during start */
     ledring_new,        /* Called once for each module instance */
     ledring_add_pads,   /* Called for every interface */
-    NULL,               /* End of simulation callback */
+    ledring_close,      /* End of simulation callback */
     ledring_tick        /* Called every clock cycle */
 };
 
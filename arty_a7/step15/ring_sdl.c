@@ -15,6 +15,7 @@ int sock;
 #define WINDOW_SIZE_Y   240
 #define LED_SIZE        15
 #define RING_RADIUS     80.0
+#define MAX_LEDS        256
 
 void fill_circle(SDL_Surface *surface, int cx, int cy, int radius, Uint32 pixel)
 {
@@ -49,16 +50,22 @@ void fill_circle(SDL_Surface *surface, int cx, int cy, int radius, Uint32 pixel)
     }
 }
 
-void redraw_ring(SDL_Surface *windowSurface, unsigned int *data, int x, int y, int led_size, float radius)
+void redraw_ring(SDL_Surface *windowSurface, unsigned int *data, int nleds, int x, int y, int led_size, float radius)
 {
-    int i = 0;
-    for (float theta = 0; theta < (3.14159 * 2); theta += (2 * 3.14159 / 12)) {
+    // Smaller LEDs when they don't fit on the ring
+    int size = led_size;
+    if (size > (int)(3.14159 * radius / nleds))
+        size = (int)(3.14159 * radius / nleds);
+    if (size < 1)
+        size = 1;
+
+    SDL_FillRect(windowSurface, NULL, 0);
+    for (int i = 0; i < nleds; i++) {
+        float theta = 2 * 3.14159 * i / nleds;
         int new_x = (int)((float)x + (radius * cos ( theta )));
         int new_y = (int)((float)y - (radius * sin ( theta )));
 
-        if (i < 12)
-            fill_circle(windowSurface, new_x, new_y, led_size, data[i] == 0 ? 0x00404040 : data[i]);
-        i++;
+        fill_circle(windowSurface, new_x, new_y, size, data[i] == 0 ? 0x00404040 : data[i]);
     }
 }
 
@@ -73,6 +80,11 @@ int main(int argc, char *argv[])
 
     SDL_Surface *windowSurface;
 
+    // ./ring [port]: one viewer per ring, on the port given to the ledring module
+    int port = argc > 1 ? atoi(argv[1]) : 8888;
+    char title[32];
+    snprintf(title, sizeof(title), "LED Ring (%d)", port);
+
     sock = socket(AF_INET, SOCK_DGRAM, 0);
     if (sock < 0) {
         printf("Error while creating socket\n");
@@ -81,7 +93,7 @@ int main(int argc, char *argv[])
 
 	server.sin_addr.s_addr = htonl(INADDR_ANY);//inet_addr("127.0.0.1");
 	server.sin_family = AF_INET;
-	server.sin_port = htons( 8888 );
+	server.sin_port = htons( port );
 
     struct timeval read_timeout;
     read_timeout.tv_sec = 0;
@@ -100,7 +112,7 @@ int main(int argc, char *argv[])
     }
     else
     {
-        window = SDL_CreateWindow("LED Ring", SDL_WINDOWPOS_CENTERED, SDL_WINDOWPOS_CENTERED, WINDOW_SIZE_X, WINDOW_SIZE_Y, SDL_WINDOW_SHOWN);
+        window = SDL_CreateWindow(title, SDL_WINDOWPOS_CENTERED, SDL_WINDOWPOS_CENTERED, WINDOW_SIZE_X, WINDOW_SIZE_Y, SDL_WINDOW_SHOWN);
         if (window == NULL)
         {
             printf("Window Creation Error: %s\n", SDL_GetError());
@@ -109,31 +121,23 @@ int main(int argc, char *argv[])
         {
             windowSurface = SDL_GetWindowSurface(window);
 
-            unsigned int data[12] = {
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-                0x00404040,
-            };
-
-            redraw_ring(windowSurface, data, WINDOW_SIZE_X / 2, WINDOW_SIZE_Y / 2, LED_SIZE, RING_RADIUS);
+            // The number of LEDs is the size of the frames received
+            unsigned int data[MAX_LEDS];
+            int nleds = 12;
+            for (int i = 0; i < MAX_LEDS; i++)
+                data[i] = 0x00404040;
+
+            redraw_ring(windowSurface, data, nleds, WINDOW_SIZE_X / 2, WINDOW_SIZE_Y / 2, LED_SIZE, RING_RADIUS);
 
             //Main loop
             while (!b_Quit)
             {
                    int len = sizeof(cliaddr);
                     int ret = recvfrom(sock, data, sizeof(data), 0, ( struct sockaddr *)&cliaddr, (socklen_t*)&len);
-                    if( ret > 0 )
+                    if( ret >= (int)sizeof(unsigned int) )
                     {
-                        redraw_ring(windowSurface, data, WINDOW_SIZE_X / 2, WINDOW_SIZE_Y / 2, LED_SIZE, RING_RADIUS);
+                        nleds = ret / sizeof(unsigned int);
+                        redraw_ring(windowSurface, data, nleds, WINDOW_SIZE_X / 2, WINDOW_SIZE_Y / 2, LED_SIZE, RING_RADIUS);
                     }
 
                 //Event Loop
@@ -51,15 +51,17 @@ _io = [
 # Platform -----------------------------------------------------------------------------------------
 
 class Platform(SimPlatform):
-    def __init__(self):
-        SimPlatform.__init__(self, "SIM", _io)
+    def __init__(self, nrings=1):
+        # One more data out pin for each other ring
+        rings_io = [("data_out", i, Pins(1)) for i in range(1, nrings)]
+        SimPlatform.__init__(self, "SIM", _io + rings_io)
 
 # BaseSoC ------------------------------------------------------------------------------------------
 
 class BaseSoC(SoCCore):
-    def __init__(self, sys_clk_freq=int(100e6), **kwargs):
+    def __init__(self, sys_clk_freq=int(100e6), nrings=1, **kwargs):
 
-        platform = Platform()
+        platform = Platform(nrings)
 
         SoCCore.__init__(self, platform, sys_clk_freq,
             ident               = "LiteX SoC Simulation",
@@ -75,6 +77,12 @@ class BaseSoC(SoCCore):
         self.submodules.ledring = led
         self.add_csr("ledring")
 
+        # The other rings: ledring1, ledring2...
+        for i in range(1, nrings):
+            ring = RingControl(platform.request("data_out", i), mode.DOUBLE, 12, sys_clk_freq, sim=True)
+            setattr(self.submodules, "ledring{}".format(i), ring)
+            self.add_csr("ledring{}".format(i))
+
         #-------------------------------------------------------------------------------
         # Using the etherbone bridge, we can run litescope on the simulated platform
         #-------------------------------------------------------------------------------
@@ -96,6 +104,10 @@ class BaseSoC(SoCCore):
 # Build --------------------------------------------------------------------------------------------
 
 def main():
+    parser = argparse.ArgumentParser(description="LiteX SoC simulation with LED rings")
+    parser.add_argument("--rings", default=1, type=int, help="Number of LED rings (default: 1)")
+    args = parser.parse_args()
+
     sim_config = SimConfig()
     sys_clk_freq = int(20e6)
 
@@ -105,13 +117,16 @@ def main():
     # Needed to create the simulated serial port + terminal
     sim_config.add_module("serial2console", "serial")
 
-    # This is our LedRing model
-    sim_config.add_module("ledring", "data_out", args={"freq" : sys_clk_freq})
+    # This is our LedRing model, one for each ring. Ring n is sent to UDP
+    # port 8888 + n: run "./ring 8888", "./ring 8889"... to see them.
+    for i in range(args.rings):
+        sim_config.add_module("ledring", ("data_out", i),
+            args={"freq" : sys_clk_freq, "nleds" : 12, "port" : 8888 + i})
 
     # In case we want Ethernet
     #sim_config.add_module("ethernet", "eth", args={"interface": "tap0", "ip": "192.168.1.100"})
 
-    soc     = BaseSoC(sys_clk_freq)
+    soc     = BaseSoC(sys_clk_freq, nrings=args.rings)
     builder = Builder(soc, csr_csv="csr.csv")
     builder.build(
         extra_mods = ["ledring"],
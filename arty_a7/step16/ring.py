@@ -0,0 +1,1283 @@
+import math
+from enum import IntEnum
+
+from migen import *
+from migen.genlib.misc import WaitTimer
+from migen.genlib.cdc import MultiReg, PulseSynchronizer
+
+from litex.soc.interconnect import wishbone, stream
+from litex.soc.interconnect.csr import AutoCSR, CSR, CSRStorage, CSRStatus
+from litex.soc.interconnect.csr_eventmanager import EventManager, EventSourcePulse
+
+class mode(IntEnum):
+    SINGLE = 0
+    DOUBLE = 1
+
+MAJOR = 2
+MINOR = 0
+
+class RingControl(Module, AutoCSR):
+    def __init__(self, pad, mode, nleds, sys_clk_freq, lanes=1, chip="WS2812B",
+                 with_framebuffer=True, double_buffer=True, bpp=24, with_gamma=False,
+                 symbol_clk_freq=None, with_dma=False, with_fade=False, with_timing_csr=True,
+                 time_scale=1):
+        self.version   = CSRStatus(16, reset=(MAJOR << 8) + MINOR)
+
+        # For simulations: all the durations (bit timings, reset gap,
+        # millisecond ticks) are divided by time_scale. The design runs as
+        # if its clock was time_scale times slower, a decoder running at
+        # sys_clk_freq/time_scale sees the usual timings.
+
+        # Without timing CSRs, the bit timings of 'chip' are constants
+        # (smaller, but another chip needs a rebuild).
+
+        # RGB565 pixels are expanded to 24 bits on the fly, just before
+        # the serializer (and the cross-fade and gamma correction).
+        # With a symbol clock, the "ring" clock domain runs a symbol encoder
+        # instead of the FSM serializer.
+        if symbol_clk_freq is None:
+            ring = RingSerialCtrl(nleds, sys_clk_freq, lanes, chip, with_csr=with_timing_csr,
+                                  bpp=max(bpp, 24), time_scale=time_scale)
+        else:
+            ring = RingSymbolEncoder(nleds, symbol_clk_freq, lanes, chip, bpp=max(bpp, 24),
+                                     time_scale=time_scale)
+        self.submodules.ring = ring
+
+        sink = ring.sink
+        if with_gamma:
+            self.submodules.gamma = RingGamma(lanes, bpp=max(bpp, 24))
+            self.comb += self.gamma.source.connect(sink)
+            self.lut_bus = self.gamma.bus
+            sink = self.gamma.sink
+        if with_fade:
+            self.submodules.fade = RingFade(nleds, lanes, bpp=max(bpp, 24))
+            self.comb += self.fade.source.connect(sink)
+            sink = self.fade.sink
+        if bpp == 16:
+            self.submodules.expander = RGB565Expander(lanes)
+            self.comb += self.expander.source.connect(sink)
+            sink = self.expander.sink
+
+        self.comb += pad.eq(ring.do)
+
+        # An interrupt is raised each time a frame has been sent, and, with
+        # the DMA, when its FIFO runs low: the bus does not keep up.
+        self.submodules.ev = EventManager()
+        self.ev.frame_done = EventSourcePulse()
+        if with_dma and not with_framebuffer:
+            self.ev.fifo_low = EventSourcePulse()
+        self.ev.finalize()
+
+        self.comb += self.ev.frame_done.trigger.eq(ring.frame_done)
+
+        # Frame rate and throughput counters
+        self.submodules.stats = stats = RingStats(with_framebuffer, double_buffer)
+        self.comb += [
+            stats.frame_done.eq(ring.frame_done),
+            stats.idle.eq(ring.idle),
+        ]
+
+        # Without framebuffer, pixels are given by any stream source
+        # (FIFO, Etherbone...) connected to our sink, or read from main
+        # memory by our own DMA.
+        if not with_framebuffer:
+            if with_dma:
+                self.submodules.dma = RingFrameReader(nleds, lanes, bpp)
+                self.dma_bus = self.dma.bus
+                self.comb += [
+                    self.dma.source.connect(sink),
+                    self.ev.fifo_low.trigger.eq(self.dma.fifo_low),
+                ]
+            else:
+                self.sink = sink
+            return
+
+        fb = RingFramebuffer(nleds, lanes, double_buffer, bpp)
+        self.submodules.fb = fb
+        self.bus = fb.bus
+
+        self.comb += [
+            fb.source.connect(sink),
+            stats.write.eq(fb.write),
+            stats.drop.eq(fb.drop),
+        ]
+
+        # The framebuffer content can be rotated around the ring, by hand
+        # or at a given pace.
+        self.submodules.rotate = RingRotate(nleds, sys_clk_freq, time_scale)
+        self.comb += fb.rotation.eq(self.rotate.rotation)
+
+        # The animation is a program of the keyframe sequencer. It is
+        # loaded with the rotating pattern given by 'mode' and can be
+        # replaced at runtime.
+        if (mode == mode.DOUBLE):
+            print("Led ring controller configured for dual led")
+        else:
+            print("Led ring controller configured for single led")
+
+        seq = RingSequencer(nleds, sys_clk_freq, bpp, program=rotating_program(nleds, mode),
+                            time_scale=time_scale)
+        self.submodules.seq = seq
+        self.seq_bus = seq.bus
+
+        self.comb += [
+            seq.led_adr.eq(fb.led_adr),
+            fb.led_on.eq(seq.led_on),
+            fb.led_fb.eq(seq.led_fb),
+            fb.led_color.eq(seq.color),
+        ]
+
+class RingRotate(Module, AutoCSR):
+    def __init__(self, nleds, sys_clk_freq, time_scale=1):
+        self.rotation = Signal(max=nleds)
+
+        # Writing 'offset' sets the rotation: LED n shows pixel n + offset.
+        # Then, if 'period' is not 0, 'step' is added to the rotation every
+        # 'period' ms. Use nleds - 1 to rotate the other way. Offset and
+        # step are taken modulo nleds.
+        self.offset   = CSRStorage(16)
+        self.step     = CSRStorage(16)
+        self.period   = CSRStorage(16)
+
+        ###
+
+        # Offset and step are reduced modulo nleds after each write, by
+        # subtracting nleds << k when we can, k going down to 0 (at most
+        # 16 cycles). The rotation is set once the offset is reduced.
+        kmax           = bits_for(0xffff//nleds) - 1
+        divisor        = Array([nleds << k for k in range(kmax + 1)])
+        rem            = Signal(16)
+        rem_next       = Signal(16)
+        k              = Signal(max=kmax + 1)
+        busy           = Signal()
+        to_step        = Signal()
+        pending_offset = Signal()
+        pending_step   = Signal()
+        step           = Signal(max=nleds)
+        applied        = Signal()
+        self.comb += rem_next.eq(Mux(rem >= divisor[k], rem - divisor[k], rem))
+        self.sync += [
+            applied.eq(0),
+            If(busy,
+                rem.eq(rem_next),
+                k.eq(k - 1),
+                If(k == 0,
+                    busy.eq(0),
+                    If(to_step,
+                        step.eq(rem_next)
+                    ).Else(
+                        applied.eq(1)
+                    )
+                )
+            ).Elif(pending_offset,
+                pending_offset.eq(0),
+                busy.eq(1),
+                to_step.eq(0),
+                rem.eq(self.offset.storage),
+                k.eq(kmax)
+            ).Elif(pending_step,
+                pending_step.eq(0),
+                busy.eq(1),
+                to_step.eq(1),
+                rem.eq(self.step.storage),
+                k.eq(kmax)
+            ),
+            If(self.offset.re,
+                pending_offset.eq(1)
+            ),
+            If(self.step.re,
+                pending_step.eq(1)
+            )
+        ]
+
+        tick = WaitTimer(int(1e-3*sys_clk_freq/time_scale))
+        self.submodules += tick
+        self.comb += tick.wait.eq(~tick.done)
+
+        # Both are below nleds: one subtraction wraps the sum.
+        ms      = Signal(16)
+        rotated = Signal(max=2*nleds)
+        self.comb += rotated.eq(self.rotation + step)
+
+        self.sync += [
+            If(applied,
+                self.rotation.eq(rem),
+                ms.eq(0)
+            ).Elif(tick.done & (self.period.storage != 0),
+                ms.eq(ms + 1),
+                If(ms >= self.period.storage - 1,
+                    ms.eq(0),
+                    If(rotated >= nleds,
+                        self.rotation.eq(rotated - nleds)
+                    ).Else(
+                        self.rotation.eq(rotated)
+                    )
+                )
+            )
+        ]
+
+# Keyframes of the sequencer: 4 words each
+#   word 0: color, in the framebuffer pixel format
+#   word 1: range A of lit LEDs: first [15:0], count [31:16]
+#   word 2: range B of lit LEDs: first [15:0], count [31:16]
+#   word 3: duration in ms [15:0], jump target [23:16], loops [29:24],
+#           FB [30], JUMP [31]
+# Lit LEDs show 'color', or the framebuffer when FB is set. The other
+# LEDs are off. After 'duration', the sequencer goes to the next entry
+# or, when JUMP is set, to 'target'. With a non-zero 'loops', the jump
+# is only taken 'loops' times in a row (loops can't be nested).
+SEQ_FB   = 1 << 30
+SEQ_JUMP = 1 << 31
+
+def keyframe(color=0, first=0, count=0, first2=0, count2=0, duration=0, target=0, loops=0, flags=0):
+    return [
+        color,
+        (count << 16) | first,
+        (count2 << 16) | first2,
+        flags | (loops << 24) | (target << 16) | duration,
+    ]
+
+# The pattern we used to hard-code: one lit LED (two opposite ones in
+# DOUBLE mode) moving every 50ms, showing the framebuffer.
+def rotating_program(nleds, mode, nentries=256):
+    steps   = min(nleds, nentries)
+    program = []
+    for i in range(steps):
+        pos = i*nleds//steps
+        program += keyframe(first=pos, count=1,
+                            first2=(pos + nleds//2) % nleds, count2=1 if mode == mode.DOUBLE else 0,
+                            duration=50, flags=SEQ_FB | (SEQ_JUMP if i == steps - 1 else 0))
+    return program
+
+class RingSequencer(Module, AutoCSR):
+    def __init__(self, nleds, sys_clk_freq, bpp=24, nentries=256, program=[], time_scale=1):
+        self.bus     = bus = wishbone.Interface(data_width=32)
+
+        # The LED being read from the framebuffer, and what to do with it
+        self.led_adr = Signal(max=nleds)
+        self.led_on  = Signal()
+        self.led_fb  = Signal()
+        self.color   = Signal(bpp)
+
+        # The program runs while 'enable' is set, from entry 0. Otherwise
+        # the framebuffer is shown as is.
+        self.enable  = CSRStorage()
+        self.entry   = CSRStatus(8)
+
+        ###
+
+        assert nentries <= 256
+
+        # The program memory: keyframe n is at word address 4*n of our
+        # bus region. One port for the bus, one for the sequencer.
+        depth = 4*nentries
+        mem = Memory(32, depth, init=program + [0]*(depth - len(program)))
+        self.specials += mem
+
+        bus_port = mem.get_port(write_capable=True)
+        self.specials += bus_port
+        self.comb += [
+            bus_port.adr.eq(bus.adr[:log2_int(depth)]),
+            bus_port.dat_w.eq(bus.dat_w),
+            bus_port.we.eq(bus.cyc & bus.stb & bus.we & ~bus.ack),
+            bus.dat_r.eq(bus_port.dat_r),
+        ]
+        self.sync += [
+            bus.ack.eq(0),
+            If(bus.cyc & bus.stb & ~bus.ack,
+                bus.ack.eq(1)
+            )
+        ]
+
+        rd_port = mem.get_port()
+        self.specials += rd_port
+
+        # Millisecond tick
+        tick = WaitTimer(int(1e-3*sys_clk_freq/time_scale))
+        self.submodules += tick
+        self.comb += tick.wait.eq(~tick.done)
+
+        # The current keyframe. It is only updated once all its words
+        # have been read so LEDs never mix two keyframes.
+        entry     = Signal(log2_int(nentries))
+        words     = [Signal(32) for i in range(3)]
+        color     = Signal(32)
+        first     = Signal(16)
+        count     = Signal(16)
+        first2    = Signal(16)
+        count2    = Signal(16)
+        ctrl      = Signal(32)
+        remaining = Signal(16)
+        active    = Signal()
+        looping   = Signal()
+        loop_cnt  = Signal(6)
+
+        duration  = ctrl[0:16]
+        target    = ctrl[16:24]
+        loops     = ctrl[24:30]
+        fb_flag   = ctrl[30]
+        jump      = ctrl[31]
+
+        self.comb += self.entry.status.eq(entry)
+
+        self.submodules.fsm = fsm = FSM(reset_state="IDLE")
+        fsm.act("IDLE",
+            NextValue(active, 0),
+            NextValue(looping, 0),
+            NextValue(entry, 0),
+            If(self.enable.storage,
+                NextState("READ0")
+            )
+        )
+        # The read port is synchronous: word n is there when we are in
+        # state READ(n+1).
+        for i in range(4):
+            actions = [rd_port.adr.eq(Cat(C(i, 2), entry))]
+            if i > 0:
+                actions.append(NextValue(words[i-1], rd_port.dat_r))
+            fsm.act("READ{}".format(i), *actions, NextState("READ{}".format(i + 1)))
+        fsm.act("READ4",
+            NextValue(active, 1),
+            NextValue(color, words[0]),
+            NextValue(first, words[1][0:16]),
+            NextValue(count, words[1][16:32]),
+            NextValue(first2, words[2][0:16]),
+            NextValue(count2, words[2][16:32]),
+            NextValue(ctrl, rd_port.dat_r),
+            NextValue(remaining, rd_port.dat_r[0:16]),
+            NextState("RUN")
+        )
+        fsm.act("RUN",
+            If(~self.enable.storage,
+                NextState("IDLE")
+            ).Elif(remaining == 0,
+                NextValue(entry, entry + 1),
+                If(jump,
+                    If(loops == 0,
+                        NextValue(entry, target)
+                    ).Elif(~looping,
+                        NextValue(looping, 1),
+                        NextValue(loop_cnt, loops - 1),
+                        NextValue(entry, target)
+                    ).Elif(loop_cnt != 0,
+                        NextValue(loop_cnt, loop_cnt - 1),
+                        NextValue(entry, target)
+                    ).Else(
+                        NextValue(looping, 0)
+                    )
+                ),
+                NextState("READ0")
+            ).Elif(tick.done,
+                NextValue(remaining, remaining - 1)
+            )
+        )
+
+        # Is the LED being read in one of the ranges?
+        adr = self.led_adr
+        lit = (((adr >= first)  & (adr < first + count)) |
+               ((adr >= first2) & (adr < first2 + count2)))
+
+        self.comb += [
+            self.led_on.eq(~active | lit),
+            self.led_fb.eq(~active | fb_flag),
+            self.color.eq(color),
+        ]
+
+class RingStats(Module, AutoCSR):
+    def __init__(self, with_framebuffer=True, double_buffer=True):
+        self.frame_done = Signal()
+        self.idle       = Signal()
+        self.write      = Signal()
+        self.drop       = Signal()
+
+        # All the counters are 32-bit and wrap around. The host can sample
+        # 'frames' twice to get the refresh rate, or read the length of the
+        # last frame. Cycles are sys_clk cycles.
+        self.frames       = CSRStatus(32)  # Frames sent
+        self.frame_cycles = CSRStatus(32)  # Last frame, reset gap included
+        self.rst_cycles   = CSRStatus(32)  # Reset gap of the last frame
+        if with_framebuffer:
+            # Framebuffer writes while a frame is being sent. Without double
+            # buffering, each of them may tear the frame.
+            self.writes   = CSRStatus(32)
+        if double_buffer and with_framebuffer:
+            # Swaps requested before the previous one was done: a frame has
+            # been drawn but never shown.
+            self.dropped  = CSRStatus(32)
+
+        ###
+
+        # A frame starts at the end of the previous one, so its reset gap
+        # comes first.
+        cycles     = Signal(32)
+        rst_cycles = Signal(32)
+        self.sync += [
+            cycles.eq(cycles + 1),
+            If(self.idle,
+                rst_cycles.eq(rst_cycles + 1)
+            ),
+            If(self.frame_done,
+                self.frames.status.eq(self.frames.status + 1),
+                self.frame_cycles.status.eq(cycles + 1),
+                self.rst_cycles.status.eq(rst_cycles),
+                cycles.eq(0),
+                rst_cycles.eq(0)
+            )
+        ]
+
+        if with_framebuffer:
+            self.sync += If(self.write & ~self.idle,
+                self.writes.status.eq(self.writes.status + 1)
+            )
+        if double_buffer and with_framebuffer:
+            self.sync += If(self.drop,
+                self.dropped.status.eq(self.dropped.status + 1)
+            )
+
+class RingFramebuffer(Module, AutoCSR):
+    def __init__(self, nleds, lanes=1, double_buffer=True, bpp=24):
+        self.bus     = bus = wishbone.Interface(data_width=32)
+        self.source  = source = stream.Endpoint([("data", bpp*lanes)])
+        self.led_adr = Signal(max=nleds)
+        self.led_on  = Signal(reset=1)
+
+        # When led_fb is cleared, the pixel is led_color instead of the
+        # framebuffer content (same for all lanes).
+        self.led_fb    = Signal(reset=1)
+        self.led_color = Signal(bpp)
+
+        # LED n shows pixel (n + rotation) % nleds of the framebuffer. It is
+        # taken into account at the start of each frame.
+        self.rotation  = Signal(max=nleds)
+
+        # For the statistics: a pulse for each bus write, and for each
+        # swap requested while the previous one is still pending (the
+        # previous back buffer is never shown).
+        self.write   = Signal()
+        self.drop    = Signal()
+
+        ###
+
+        # The framebuffer: one GRB (24 bpp), GRBW (32 bpp) or RGB565 (16 bpp)
+        # pixel per LED. RGB565 pixels are packed two by 32-bit word
+        # (LED 2n in the LSBs) so the memory and the bus transfers are halved.
+        # One port is given to the Wishbone bus, the other one to
+        # the serializer. So the CPU can write the next frame while
+        # the current one is being sent.
+        # With several lanes, a memory word holds the pixels of all lanes
+        # for the same word address: lane n is at bits [w*n:w*(n+1)].
+        # The serializer gets every lane with a single read.
+        ppw   = 2 if bpp == 16 else 1
+        width = bpp*ppw
+        words = (nleds + ppw - 1)//ppw
+
+        # Word n of lane l is at address l*stride + n of our bus region.
+        # So each lane has its own framebuffer region.
+        # The slave gets the full address: only keep the bits we decode.
+        self.stride = stride = 2**log2_int(words, need_pow2=False)
+        adr_bits  = log2_int(stride)
+        lane_bits = log2_int(lanes, need_pow2=False)
+        lane      = Signal(max(lane_bits, 1))
+        lane_r    = Signal(max(lane_bits, 1))
+
+        # With double buffering, the memory holds two frames: the front one
+        # is sent while the CPU writes the back one. The frame in memory
+        # bank b starts at address b*stride.
+        # Writing 'swap' requests a swap of the two banks. It is done when
+        # the last LED of the current frame has been read: a frame is never
+        # made of two banks, whatever the time of the request.
+        front      = Signal()
+        front_next = Signal()
+        depth      = words
+        if double_buffer:
+            self.swap    = CSR()
+            self.pending = CSRStatus()
+            depth        = stride + words
+
+            swap_now = Signal()
+            self.comb += [
+                swap_now.eq(self.pending.status & source.valid & source.ready & source.last),
+                front_next.eq(front ^ swap_now),
+            ]
+            self.comb += self.drop.eq(self.swap.re & self.pending.status)
+            self.sync += [
+                front.eq(front_next),
+                If(swap_now,
+                    self.pending.status.eq(0)
+                ),
+                If(self.swap.re,
+                    self.pending.status.eq(1)
+                )
+            ]
+
+        fb = Memory(width*lanes, depth, init=[0]*depth)
+        self.specials += fb
+
+        fb_bus = fb.get_port(write_capable=True, we_granularity=8)
+        self.specials += fb_bus
+
+        # The memory is synchronous: the read data is available one clock
+        # cycle after the address so we can't ack in the same clock cycle.
+        # A single access takes two cycles but incrementing bursts (cti =
+        # 0b010) go at one word per cycle: while a beat is acked, the memory
+        # is already given the address of the next one (linear, or wrapped
+        # on 4, 8 or 16 words as told by bte).
+        # Writes are done when they are acked, only for the bytes selected
+        # by 'sel'.
+        burst     = Signal()
+        adr_bus   = Signal(len(bus.adr))
+        adr_burst = Signal(len(bus.adr))
+        self.comb += [
+            burst.eq(bus.cti == 0b010),
+            Case(bus.bte, {
+                0b00: adr_burst.eq(bus.adr + 1),
+                0b01: adr_burst.eq(Cat((bus.adr + 1)[:2], bus.adr[2:])),
+                0b10: adr_burst.eq(Cat((bus.adr + 1)[:3], bus.adr[3:])),
+                0b11: adr_burst.eq(Cat((bus.adr + 1)[:4], bus.adr[4:])),
+            }),
+            If(bus.ack & burst & ~bus.we,
+                adr_bus.eq(adr_burst)
+            ).Else(
+                adr_bus.eq(bus.adr)
+            )
+        ]
+        if lanes > 1:
+            self.comb += lane.eq(adr_bus[adr_bits:adr_bits+lane_bits])
+
+        self.comb += [
+            fb_bus.adr.eq(Cat(adr_bus[:adr_bits], ~front if double_buffer else 0)),
+            fb_bus.dat_w.eq(Replicate(bus.dat_w[:width], lanes)),
+            bus.dat_r.eq(Array(fb_bus.dat_r[width*i:width*(i+1)] for i in range(lanes))[lane_r]),
+        ]
+        self.comb += self.write.eq(bus.cyc & bus.stb & bus.we & bus.ack)
+        for i in range(lanes):
+            for j in range(width//8):
+                self.comb += fb_bus.we[i*width//8 + j].eq(self.write & (lane == i) & bus.sel[j])
+
+        self.sync += [
+            lane_r.eq(lane),
+            If(bus.ack,
+                bus.ack.eq(bus.cyc & bus.stb & burst)
+            ).Else(
+                bus.ack.eq(bus.cyc & bus.stb)
+            )
+        ]
+
+        # The frame is read in a loop and given as a stream: 'last' is set
+        # on the last LED. The read port is given the address of the pixel
+        # we will present in the next cycle, so its (synchronous) output
+        # is always the word of led_adr.
+        # led_on, led_fb and led_color have to be given for led_adr.
+        # The rotation is free: we just follow a second counter, 'pix', for
+        # the pixel of led_adr. It starts at 'rotation' and wraps around.
+        fb_port = fb.get_port()
+        self.specials += fb_port
+
+        adr      = self.led_adr
+        adr_next = Signal(max=nleds)
+        pix      = Signal(max=nleds)
+        pix_next = Signal(max=nleds)
+        rd_adr   = Signal(adr_bits)
+
+        self.comb += [
+            adr_next.eq(adr),
+            If(source.valid & source.ready,
+                If(adr == nleds - 1,
+                    adr_next.eq(0)
+                ).Else(
+                    adr_next.eq(adr + 1)
+                )
+            ),
+            pix_next.eq(pix),
+            If(source.valid & source.ready,
+                If(adr == nleds - 1,
+                    pix_next.eq(self.rotation)
+                ).Elif(pix == nleds - 1,
+                    pix_next.eq(0)
+                ).Else(
+                    pix_next.eq(pix + 1)
+                )
+            ),
+            rd_adr.eq(pix_next[log2_int(ppw):]),
+            fb_port.adr.eq(Cat(rd_adr, front_next if double_buffer else 0)),
+            source.last.eq(adr == nleds - 1),
+        ]
+
+        # Pick our pixel in the word of each lane
+        for i in range(lanes):
+            word  = fb_port.dat_r[width*i:width*(i+1)]
+            pixel = source.data[bpp*i:bpp*(i+1)]
+            if ppw > 1:
+                word = Array(word[bpp*k:bpp*(k+1)] for k in range(ppw))[pix[:log2_int(ppw)]]
+            self.comb += If(self.led_on, pixel.eq(Mux(self.led_fb, word, self.led_color)))
+
+        self.sync += [
+            adr.eq(adr_next),
+            pix.eq(pix_next),
+            source.valid.eq(1)
+        ]
+
+class RingFrameReader(Module, AutoCSR):
+    def __init__(self, nleds, lanes=1, bpp=24, burst_length=16, fifo_depth=64):
+        self.bus    = bus = wishbone.Interface(data_width=32)
+        self.source = source = stream.Endpoint([("data", bpp*lanes)])
+
+        # The frame is read in a loop from 'base' (a byte address in main
+        # memory) while 'enable' is set. It is made of 'length' LEDs, one
+        # 32-bit word per LED and per lane: LED n of lane l is at word
+        # n*lanes + l, the pixel in its LSBs.
+        # base and length are taken into account at the start of a frame.
+        self.enable = CSRStorage()
+        self.base   = CSRStorage(32)
+        self.length = CSRStorage(16, reset=nleds)
+
+        # Pulse when less than a burst is left in the FIFO while running
+        self.fifo_low = Signal()
+
+        ###
+
+        assert fifo_depth >= 2*burst_length
+
+        # The FIFO is filled by bursts, ahead of the serializer: a burst is
+        # only started when there is room for all its words. So the bus
+        # never waits for the FIFO and the serializer never waits for the
+        # bus latency.
+        fifo = stream.SyncFIFO([("data", 32)], fifo_depth, buffered=True)
+        self.submodules.fifo = fifo
+
+        # Words to LEDs: one word per lane
+        if lanes > 1:
+            converter = stream.Converter(32, 32*lanes)
+            self.submodules.converter = converter
+            self.comb += fifo.source.connect(converter.sink)
+            words = converter.source
+        else:
+            words = fifo.source
+        self.comb += [
+            words.connect(source, omit={"data", "valid_token_count"}),
+            source.data.eq(Cat(*[words.data[32*l:32*l+bpp] for l in range(lanes)])),
+        ]
+
+        # The FIFO is empty when we start: it only counts once it has been
+        # filled.
+        primed = Signal()
+        low    = Signal()
+        low_r  = Signal()
+        self.comb += [
+            low.eq(primed & (fifo.level < burst_length)),
+            self.fifo_low.eq(low & ~low_r),
+        ]
+        self.sync += [
+            low_r.eq(low),
+            If(~self.enable.storage,
+                primed.eq(0)
+            ).Elif(fifo.level >= burst_length,
+                primed.eq(1)
+            )
+        ]
+
+        base   = Signal(30)
+        total  = Signal(16 + log2_int(lanes, need_pow2=False))
+        offset = Signal(len(total))
+        beats  = Signal(max=burst_length + 1)
+        last   = Signal()
+        self.comb += last.eq(offset == total - 1)
+
+        self.submodules.fsm = fsm = FSM(reset_state="IDLE")
+        fsm.act("IDLE",
+            If(self.enable.storage & (self.length.storage != 0),
+                NextValue(base, self.base.storage[2:]),
+                NextValue(total, self.length.storage*lanes),
+                NextValue(offset, 0),
+                NextState("WAIT")
+            )
+        )
+        # Wait for room in the FIFO for a full burst
+        fsm.act("WAIT",
+            NextValue(beats, burst_length),
+            If(fifo.level <= fifo_depth - burst_length,
+                NextState("BURST")
+            )
+        )
+        # An incrementing burst, up to the end of the frame. The last beat
+        # is told with cti = 0b111.
+        fsm.act("BURST",
+            bus.cyc.eq(1),
+            bus.stb.eq(1),
+            bus.sel.eq(0xf),
+            bus.adr.eq(base + offset),
+            bus.cti.eq(0b010),
+            If((beats == 1) | last,
+                bus.cti.eq(0b111)
+            ),
+            fifo.sink.valid.eq(bus.ack),
+            fifo.sink.data.eq(bus.dat_r),
+            fifo.sink.last.eq(last),
+            If(bus.ack,
+                NextValue(offset, offset + 1),
+                NextValue(beats, beats - 1),
+                If(last,
+                    NextState("IDLE")
+                ).Elif(beats == 1,
+                    NextState("WAIT")
+                )
+            )
+        )
+
+class RGB565Expander(Module):
+    def __init__(self, lanes=1):
+        self.sink   = sink = stream.Endpoint([("data", 16*lanes)])
+        self.source = source = stream.Endpoint([("data", 24*lanes)])
+
+        ###
+
+        # RGB565 is R[15:11] G[10:5] B[4:0].
+        # The MSBs are copied in the LSBs so that full scale stays full scale.
+        self.comb += sink.connect(source, omit={"data"})
+        for i in range(lanes):
+            rgb = sink.data[16*i:16*(i+1)]
+            r, g, b = rgb[11:16], rgb[5:11], rgb[0:5]
+            self.comb += source.data[24*i:24*(i+1)].eq(Cat(
+                b[2:5], b,   # Blue  [7:0]
+                r[2:5], r,   # Red   [15:8]
+                g[4:6], g,   # Green [23:16]
+            ))
+
+class RingGamma(Module, AutoCSR):
+    def __init__(self, lanes=1, bpp=24, gamma=2.2):
+        self.bus        = bus = wishbone.Interface(data_width=32)
+        self.sink       = sink = stream.Endpoint([("data", bpp*lanes)])
+        self.source     = source = stream.Endpoint([("data", bpp*lanes)])
+
+        # Global brightness: the corrected value is multiplied by
+        # (brightness + 1)/256.
+        self.brightness = CSRStorage(8, reset=255)
+
+        ###
+
+        # One 256 x 8-bit lookup table per color channel: LUT n is used for
+        # byte n of the pixel (0 is Blue in GRB, White in GRBW). So gamma
+        # and white balance can be different for each color.
+        # LUT n, entry i is at address n*256 + i of our bus region.
+        # The tables are loaded with a 'gamma' curve at build time.
+        # As each lane needs its own read port, every lane has its own copy
+        # of the tables: the bus writes them all, reads are done on lane 0.
+        nchannels = bpp//8
+        init      = [int(round(255*(i/255)**gamma)) for i in range(256)]
+
+        channel   = Signal(2)
+        self.comb += channel.eq(bus.adr[8:10])
+
+        # Pipeline: it moves when the output is free.
+        ce        = Signal()
+        valid     = Signal(2)
+        last      = Signal(2)
+        self.comb += [
+            ce.eq(source.ready | ~source.valid),
+            sink.ready.eq(ce),
+            source.valid.eq(valid[1]),
+            source.last.eq(last[1]),
+        ]
+        self.sync += If(ce,
+            valid.eq(Cat(sink.valid, valid[0])),
+            last.eq(Cat(sink.last, last[0])),
+        )
+
+        bus_dat_r = Array(Signal(8) for n in range(nchannels))
+        for l in range(lanes):
+            for n in range(nchannels):
+                lut = Memory(8, 256, init=init)
+                self.specials += lut
+
+                # Bus port
+                wr_port = lut.get_port(write_capable=True)
+                self.specials += wr_port
+                self.comb += [
+                    wr_port.adr.eq(bus.adr[:8]),
+                    wr_port.dat_w.eq(bus.dat_w[:8]),
+                    wr_port.we.eq(bus.cyc & bus.stb & bus.we & ~bus.ack & (channel == n)),
+                ]
+                if l == 0:
+                    self.comb += bus_dat_r[n].eq(wr_port.dat_r)
+
+                # Stage 1: table lookup
+                rd_port = lut.get_port(has_re=True)
+                self.specials += rd_port
+                offset = bpp*l + 8*n
+                self.comb += [
+                    rd_port.adr.eq(sink.data[offset:offset+8]),
+                    rd_port.re.eq(ce),
+                ]
+
+                # Stage 2: brightness
+                self.sync += If(ce,
+                    source.data[offset:offset+8].eq((rd_port.dat_r*(self.brightness.storage + 1)) >> 8)
+                )
+
+        # The memory is synchronous: the read data is available one clock
+        # cycle after the address so we can't ack in the same clock cycle.
+        channel_r = Signal(2)
+        self.comb += bus.dat_r.eq(bus_dat_r[channel_r])
+        self.sync += [
+            bus.ack.eq(0),
+            channel_r.eq(channel),
+            If(bus.cyc & bus.stb & ~bus.ack,
+                bus.ack.eq(1)
+            )
+        ]
+
+class RingFade(Module, AutoCSR):
+    def __init__(self, nleds, lanes=1, bpp=24):
+        self.sink   = sink = stream.Endpoint([("data", bpp*lanes)])
+        self.source = source = stream.Endpoint([("data", bpp*lanes)])
+
+        # Writing 'start' starts a cross-fade at the next frame: during
+        # 'frames' frames, the LEDs go linearly from the last frame shown
+        # to the incoming frames. Write it just before giving the new frame
+        # (before the swap, with the framebuffer) and wait for 'busy' to
+        # be cleared before starting another one.
+        self.frames = CSRStorage(16, reset=16)
+        self.start  = CSR()
+        self.busy   = CSRStatus()
+
+        ###
+
+        # The last frame shown is kept in a memory. It is frozen during the
+        # cross-fade: it gives the colors we start from.
+        mem = Memory(bpp*lanes, nleds)
+        self.specials += mem
+        rd_port = mem.get_port(has_re=True)
+        wr_port = mem.get_port(write_capable=True)
+        self.specials += rd_port, wr_port
+
+        # Fade position: 0 (start colors) to 256 (incoming colors).
+        # 256 is added to 'err' at the end of each frame and alpha goes up
+        # by one for each 'frames' we can take from it: after 'frames'
+        # frames, alpha is 256. This is done one step per cycle between
+        # two frames, while the sink is stalled (the serializer is in its
+        # reset gap).
+        alpha   = Signal((10, True))
+        err     = Signal(17)
+        pending = Signal()
+        update  = Signal()
+        fading  = self.busy.status
+        self.sync += If(self.start.re, pending.eq(1))
+        self.sync += If(update,
+            If(err >= self.frames.storage,
+                err.eq(err - self.frames.storage),
+                alpha.eq(alpha + 1)
+            ).Else(
+                update.eq(0)
+            )
+        )
+
+        # Pipeline: it moves when the output is free. Stage 1 reads the
+        # start color of the LED, stage 2 mixes it with the incoming one.
+        # The fade state is kept with each pixel of stage 1: it can
+        # change before the last pixel of a frame reaches stage 2.
+        ce       = Signal()
+        accept   = Signal()
+        adr      = Signal(max=nleds)
+        adr_r    = Signal(max=nleds)
+        data     = Signal(bpp*lanes)
+        valid    = Signal()
+        last     = Signal()
+        fading_r = Signal()
+        alpha_r  = Signal((10, True))
+        self.comb += [
+            ce.eq(source.ready | ~source.valid),
+            sink.ready.eq(ce & ~update),
+            accept.eq(sink.valid & sink.ready),
+            rd_port.adr.eq(adr),
+            rd_port.re.eq(accept),
+        ]
+        self.sync += If(ce,
+            valid.eq(accept),
+            source.valid.eq(valid),
+            source.last.eq(last)
+        )
+        self.sync += If(accept,
+            data.eq(sink.data),
+            last.eq(sink.last),
+            adr_r.eq(adr),
+            fading_r.eq(fading),
+            alpha_r.eq(alpha),
+            adr.eq(adr + 1),
+            If(sink.last,
+                adr.eq(0),
+                # End of frame: start, go on with or end the cross-fade
+                If(pending,
+                    pending.eq(0),
+                    fading.eq(1),
+                    alpha.eq(Mux(self.frames.storage == 0, 256, 0)),
+                    err.eq(0)
+                ).Elif(fading,
+                    If(alpha == 256,
+                        fading.eq(0)
+                    ).Else(
+                        err.eq(err + 256),
+                        update.eq(1)
+                    )
+                )
+            )
+        )
+
+        # Per channel: out = start + (incoming - start)*alpha/256
+        for n in range(lanes*bpp//8):
+            start    = rd_port.dat_r[8*n:8*(n+1)]
+            incoming = data[8*n:8*(n+1)]
+            diff     = Signal((10, True))
+            out      = Signal(8)
+            self.comb += [
+                diff.eq(incoming - start),
+                If(fading_r,
+                    out.eq(start + ((diff*alpha_r) >> 8))
+                ).Else(
+                    out.eq(incoming)
+                )
+            ]
+            self.sync += If(ce & valid, source.data[8*n:8*(n+1)].eq(out))
+
+        # Out of a cross-fade, the memory follows what is shown
+        self.comb += [
+            wr_port.adr.eq(adr_r),
+            wr_port.dat_w.eq(data),
+            wr_port.we.eq(ce & valid & ~fading_r),
+        ]
+
+# Timings of the supported chips, in seconds: (t0h, t1h, tbit, trst)
+chips = {
+    "WS2812B" : (0.40e-6, 0.80e-6, 1.25e-6,  75e-6),
+    "SK6812"  : (0.30e-6, 0.60e-6, 1.25e-6,  80e-6),
+    "WS2811"  : (0.50e-6, 1.20e-6, 2.50e-6, 280e-6),
+}
+
+# The table of RingTiming for a chip: the value loaded in the counter at
+# the start of each phase. A phase lasts (value + 1) cycles. The
+# serializer needs one more cycle at the end of PHASE_L to shift its data.
+# These are also the values to write in the timing CSRs (high0, high1,
+# low, gap) to switch to another chip at runtime.
+def chip_timings(chip, sys_clk_freq, time_scale=1):
+    t0h, t1h, tbit, trst = [int(t*sys_clk_freq/time_scale) for t in chips[chip]]
+    return [
+        t0h - 1,         # PHASE_H0:  all lanes are high
+        t1h - t0h - 1,   # PHASE_H1:  only lanes sending a '1' are high
+        tbit - t1h - 2,  # PHASE_L:   all lanes are low
+        trst - 1,        # PHASE_RST: reset gap
+    ]
+
+# Phases of the timing generator
+PHASE_H0  = 0
+PHASE_H1  = 1
+PHASE_L   = 2
+PHASE_RST = 3
+
+class RingTiming(Module, AutoCSR):
+    def __init__(self, sys_clk_freq, chip="WS2812B", with_csr=True, time_scale=1):
+        self.load  = Signal()
+        self.phase = Signal(2)
+        self.done  = Signal()
+
+        ###
+
+        t0h, t1h, tbit, trst = [int(t*sys_clk_freq/time_scale) for t in chips[chip]]
+        self.cycles = (t0h, t1h, tbit, trst)
+
+        # Each phase needs at least one cycle: this limits time_scale.
+        assert t0h >= 1 and t1h - t0h >= 1 and tbit - t1h >= 2
+
+        # Wide enough for the longest reset gap and the longest bit we
+        # know about.
+        width     = bits_for(int(300e-6*sys_clk_freq))
+        bit_width = bits_for(int(3e-6*sys_clk_freq))
+
+        table = chip_timings(chip, sys_clk_freq, time_scale)
+
+        # The table can be changed at runtime to drive another chip. The
+        # CSRs hold the values loaded in the counter, the software does
+        # the arithmetic of chip_timings(): there is no subtractor in
+        # front of the counter. Without CSRs the table is made of
+        # constants.
+        if with_csr:
+            self.high0 = CSRStorage(bit_width, reset=table[PHASE_H0])
+            self.high1 = CSRStorage(bit_width, reset=table[PHASE_H1])
+            self.low   = CSRStorage(bit_width, reset=table[PHASE_L])
+            self.gap   = CSRStorage(width,     reset=table[PHASE_RST])
+            table = [self.high0.storage, self.high1.storage, self.low.storage, self.gap.storage]
+        table = Array(table)
+
+        # One down-counter for everything. 'done' is set when it reaches 0.
+        # It starts with a reset gap.
+        count = Signal(width, reset=trst - 1)
+        self.sync += [
+            If(self.load,
+                count.eq(table[self.phase])
+            ).Elif(count != 0,
+                count.eq(count - 1)
+            )
+        ]
+        self.comb += self.done.eq(count == 0)
+
+class RingSerialCtrl(Module, AutoCSR):
+    def __init__(self, nleds, sys_clk_freq, lanes=1, chip="WS2812B", with_csr=True, bpp=24,
+                 time_scale=1):
+        self.do       = Signal(lanes)
+
+        # Pixels to send, 'last' marks the last LED of a frame.
+        # A pixel is sent MSB first: GRB (24 bpp) or GRBW (32 bpp).
+        self.sink     = sink = stream.Endpoint([("data", bpp*lanes)])
+
+        # Pulse at the end of each frame, when the reset gap starts.
+        self.frame_done = Signal()
+
+        # Set during the reset gap
+        self.idle     = Signal()
+
+        ###
+
+        bit_count = Signal(max=bpp)
+        data      = Signal(bpp*lanes)
+        last      = Signal()
+
+        # All the lanes are sent in lockstep so every bit must last the same
+        # time, whatever its value. A bit is sent like this:
+        #
+        #        |<- t0h ->|
+        #        |<------- t1h ------->|
+        #         _________ ___________
+        #  '0' __|         |___________________________|__
+        #         _____________________
+        #  '1' __|                     |_______________|__
+        #
+        #        |<------------- tbit ---------------->|
+        #
+        # The timing generator is shared by all the lanes.
+        self.submodules.timing = timing = RingTiming(sys_clk_freq, chip, with_csr, time_scale)
+        t0h, t1h, tbit, trst = timing.cycles
+
+        # Each bit costs tbit, each LED one more cycle in LED-SHIFT (or in
+        # RST for the last one, which goes there directly).
+        # Let's tell what we can expect from this chain.
+        frame_cycles = nleds*(bpp*tbit + 1) + trst
+        self.frame_rate = sys_clk_freq/frame_cycles
+        print("Led ring serializer: {} lane(s) of {} {} leds ({} bpp), {:.1f} frames/s max".format(
+            lanes, nleds, chip, bpp, self.frame_rate))
+
+        # Bit-sliced data path: the bit to send on lane n is the MSB of
+        # its own slice.
+        bits = Signal(lanes)
+        self.comb += bits.eq(Cat(*[data[bpp*(i+1)-1] for i in range(lanes)]))
+
+        # FSM
+        # The timing generator is loaded when we leave a state, for the
+        # phase of the next one.
+        self.submodules.fsm = fsm = FSM(reset_state="RST")
+        fsm.act("RST",
+            self.idle.eq(1),
+            If(timing.done,
+                NextState("LED-SHIFT"),
+            )
+        )
+        # If the source is late, do stays low. It must not be late for more
+        # than trst or the LEDs will latch an incomplete frame.
+        fsm.act("LED-SHIFT",
+            sink.ready.eq(1),
+            If(sink.valid,
+                NextValue(bit_count, bpp-1),
+                NextValue(data, sink.data),
+                NextValue(last, sink.last),
+                timing.load.eq(1),
+                timing.phase.eq(PHASE_H0),
+                NextState("BIT-H0")
+            )
+        )
+        fsm.act("BIT-H0",
+            self.do.eq(2**lanes-1),
+            If(timing.done,
+                timing.load.eq(1),
+                timing.phase.eq(PHASE_H1),
+                NextState("BIT-H1")
+            )
+        )
+        fsm.act("BIT-H1",
+            self.do.eq(bits),
+            If(timing.done,
+                timing.load.eq(1),
+                timing.phase.eq(PHASE_L),
+                NextState("BIT-L")
+            )
+        )
+        fsm.act("BIT-L",
+            If(timing.done,
+                NextState("BIT-SHIFT")
+            )
+        )
+        # Shifting the whole vector is the same as shifting every slice:
+        # the MSB of a slice falls into the LSB of the next one but we
+        # reload all of them before it could be sent.
+        fsm.act("BIT-SHIFT",
+            NextValue(data, data << 1),
+            NextValue(bit_count, bit_count - 1),
+            If(bit_count == 0,
+                If(last,
+                    self.frame_done.eq(1),
+                    timing.load.eq(1),
+                    timing.phase.eq(PHASE_RST),
+                    NextState("RST")
+                ).Else(
+                    NextState("LED-SHIFT")
+                )
+            ).Else(
+                timing.load.eq(1),
+                timing.phase.eq(PHASE_H0),
+                NextState("BIT-H0")
+            )
+        )
+
+# Symbol patterns of a bit, from the first symbol sent to the last
+# one. 'b' is the value of the bit: a '0' is high for n0 symbols, a '1'
+# for n1 symbols. With nsym=3, n0=1, n1=2: '0' is 100, '1' is 110.
+def symbols(b, nsym, n0, n1):
+    return [1]*n0 + [b]*(n1 - n0) + [0]*(nsym - n1)
+
+# Symbols of a bit for a chip at clk_freq (times in seconds, already
+# divided by time_scale): the fewest symbols giving t0h, t1h and the low
+# times within tolerance of the datasheet, or the closest we found.
+# Returns (nsym, div, n0, n1, error): a symbol is div clock cycles,
+# error is the largest difference with the datasheet.
+def symbol_timings(t0h, t1h, tbit, clk_freq, tolerance, nsym=None):
+    best = None
+    for n in ([nsym] if nsym is not None else range(3, 9)):
+        for div in sorted({max(1, int(clk_freq*tbit/n)), max(1, int(math.ceil(clk_freq*tbit/n)))}):
+            t_sym = div/clk_freq
+            n0    = min(max(1, int(round(t0h/t_sym))), n - 2)
+            n1    = min(max(n0 + 1, int(round(t1h/t_sym))), n - 1)
+            error = max(abs(n0*t_sym - t0h), abs(n1*t_sym - t1h),
+                        (tbit - t1h) - (n - n1)*t_sym,
+                        (tbit - t0h) - (n - n0)*t_sym)
+            if best is None or error < best[-1]:
+                best = (n, div, n0, n1, error)
+        if best[-1] <= tolerance:
+            break
+    return best
+
+class RingSymbolEncoder(Module):
+    def __init__(self, nleds, clk_freq, lanes=1, chip="WS2812B", bpp=24, nsym=None,
+                 tolerance=150e-9, time_scale=1):
+        self.do       = Signal(lanes)
+
+        # Same interface as RingSerialCtrl: the sink is in the sys clock
+        # domain. Everything else runs in the "ring" clock domain whose
+        # frequency is clk_freq.
+        self.sink     = sink = stream.Endpoint([("data", bpp*lanes)])
+
+        # Pulse at the end of each frame, in the sys clock domain.
+        self.frame_done = Signal()
+
+        # Set during the reset gap, in the sys clock domain.
+        self.idle     = Signal()
+
+        ###
+
+        # Each bit is made of nsym symbols of the same length, a symbol is
+        # 'div' cycles of the ring clock, '0' and '1' are high for n0 and
+        # n1 symbols. They are chosen from the timings of the chip (nsym
+        # can be forced). Only the ring clock matters here so sys_clk_freq
+        # can be anything.
+        t0h, t1h, tbit, trst = [t/time_scale for t in chips[chip]]
+        nsym, div, n0, n1, error = symbol_timings(t0h, t1h, tbit, clk_freq,
+                                                  tolerance/time_scale, nsym)
+        t_sym    = div/clk_freq
+        rst_syms = int(math.ceil(trst/t_sym))
+
+        frame_syms = nleds*bpp*nsym + rst_syms
+        self.frame_rate = 1/(frame_syms*t_sym)
+        print("Led ring symbol encoder: {} lane(s) of {} {} leds ({} bpp), {} symbols/bit, "
+              "t0h={:.0f}ns t1h={:.0f}ns tbit={:.0f}ns, {:.1f} frames/s max".format(
+              lanes, nleds, chip, bpp, nsym, 1e9*t_sym*n0, 1e9*t_sym*n1,
+              1e9*t_sym*nsym, self.frame_rate))
+
+        # The LEDs would not decode the bits: another ring clock is needed.
+        assert error <= tolerance/time_scale, \
+            "No symbols at {:.3f}MHz for the {} timings (off by {:.0f}ns)".format(
+            clk_freq/1e6, chip, 1e9*error*time_scale)
+
+        # Pixels cross to the ring clock domain through a small FIFO
+        fifo = stream.AsyncFIFO([("data", bpp*lanes)], 4)
+        fifo = ClockDomainsRenamer({"write": "sys", "read": "ring"})(fifo)
+        self.submodules.fifo = fifo
+        self.comb += sink.connect(fifo.sink)
+
+        # A pixel is expanded to its symbols all at once, by wiring:
+        # bit k of a lane gives symbols nsym*k to nsym*k + nsym - 1 of the
+        # lane, first symbol at the MSB.
+        expanded = []
+        for l in range(lanes):
+            pixel = fifo.source.data[bpp*l:bpp*(l+1)]
+            for k in range(bpp):
+                expanded += reversed(symbols(pixel[k], nsym, n0, n1))
+        width = bpp*nsym
+
+        # Symbol strobe
+        ce = Signal()
+        if div == 1:
+            self.comb += ce.eq(1)
+        else:
+            ce_count = Signal(max=div)
+            self.sync.ring += [
+                ce_count.eq(ce_count - 1),
+                If(ce_count == 0,
+                    ce_count.eq(div - 1)
+                )
+            ]
+            self.comb += ce.eq(ce_count == 0)
+
+        # The shift register gives the symbol to send on lane n at the MSB
+        # of its slice. 'count' is the number of symbols left after the
+        # current one. The next pixel is loaded right after the last symbol
+        # of the current one: there is no gap between bits nor between
+        # pixels. After the last pixel of a frame, the register is
+        # cleared for the reset gap. We start with a reset gap.
+        shift    = Signal(width*lanes)
+        count    = Signal(max=max(width, rst_syms), reset=rst_syms - 1)
+        rst      = Signal()
+        done     = Signal()
+        gap      = Signal(reset=1)
+        self.comb += [
+            self.do.eq(Cat(*[shift[width*(l+1)-1] for l in range(lanes)])),
+            fifo.source.ready.eq(ce & (count == 0) & ~rst),
+        ]
+        self.sync.ring += [
+            done.eq(0),
+            If(ce,
+                If(count != 0,
+                    shift.eq(shift << 1),
+                    count.eq(count - 1)
+                ).Elif(rst,
+                    shift.eq(0),
+                    count.eq(rst_syms - 1),
+                    rst.eq(0),
+                    gap.eq(1),
+                    done.eq(1)
+                ).Elif(fifo.source.valid,
+                    shift.eq(Cat(*expanded)),
+                    gap.eq(0),
+                    count.eq(width - 1),
+                    rst.eq(fifo.source.last)
+                ).Else(
+                    # The source is late, do stays low. It must not be
+                    # late for more than trst.
+                    shift.eq(0)
+                )
+            )
+        ]
+
+        # Back to the sys clock domain for the event manager
+        # and the statistics.
+        ps = PulseSynchronizer("ring", "sys")
+        self.submodules += ps
+        self.comb += [
+            ps.i.eq(done),
+            self.frame_done.eq(ps.o),
+        ]
+        self.specials += MultiReg(gap, self.idle)
@@ -0,0 +1,110 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include <irq.h>
+#include <libbase/uart.h>
+#include <libbase/console.h>
+#include <generated/csr.h>
+#include <generated/soc.h>
+
+/*
+ * Demo for workshop_step16bis.py: the LED ring controller reads its frames
+ * from memory. We draw in one of these two frames while the other one is
+ * read. LED n of lane l is at word n*LEDRING_LANES + l.
+ */
+static uint32_t frame[2][LEDRING_NLEDS*LEDRING_LANES];
+static int back = 0;
+
+static volatile unsigned int frames = 0;
+static volatile unsigned int fifo_low = 0;
+
+void ledring_isr(void);
+
+/* A color wheel: 0 to 255 goes from green to red to blue (GRB) */
+static uint32_t wheel(unsigned int pos)
+{
+	pos &= 0xff;
+	if (pos < 85)
+		return ((255 - 3*pos) << 16) | ((3*pos) << 8);
+	pos -= 85;
+	if (pos < 85)
+		return ((255 - 3*pos) << 8) | (3*pos);
+	pos -= 85;
+	return ((3*pos) << 16) | (255 - 3*pos);
+}
+
+/* Convert a GRB color to the pixel format */
+static uint32_t pixel(uint32_t grb)
+{
+#if LEDRING_BPP == 16
+	uint32_t g = (grb >> 16) & 0xff, r = (grb >> 8) & 0xff, b = grb & 0xff;
+	return ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3);
+#elif LEDRING_BPP == 32
+	/* GRBW: the white LED stays off */
+	return grb << 8;
+#else
+	return grb;
+#endif
+}
+
+/*
+ * Draw the next frame in the back buffer and give it to the DMA.
+ * The DMA takes the new address at the start of a frame: the
+ * other buffer is not read anymore after the next frame_done.
+ */
+static void draw(void)
+{
+	int l, n;
+
+	for (n = 0; n < LEDRING_NLEDS; n++)
+		for (l = 0; l < LEDRING_LANES; l++)
+			frame[back][n*LEDRING_LANES + l] = pixel(wheel(frames + (256*n)/LEDRING_NLEDS + 16*l));
+
+	ledring_dma_base_write((uint32_t)frame[back]);
+	back ^= 1;
+	frames++;
+}
+
+void ledring_isr(void)
+{
+	uint32_t pending = ledring_ev_pending_read();
+
+	ledring_ev_pending_write(pending);
+
+	/* The bus did not keep up: the frame may have been cut */
+	if (pending & (1 << CSR_LEDRING_EV_PENDING_FIFO_LOW_OFFSET))
+		fifo_low++;
+
+	if (pending & (1 << CSR_LEDRING_EV_PENDING_FRAME_DONE_OFFSET))
+		draw();
+}
+
+int main(void)
+{
+#ifdef CONFIG_CPU_HAS_INTERRUPT
+	irq_setmask(0);
+	irq_setie(1);
+#endif
+	uart_init();
+	printf("################################\n");
+	printf("#####   LED ring DMA demo  #####\n");
+	printf("################################\n\n");
+
+	/* Draw the first frame and start the DMA, the interrupt will do the rest */
+	draw();
+	ledring_dma_length_write(LEDRING_NLEDS);
+	ledring_dma_enable_write(1);
+
+	ledring_ev_pending_write(ledring_ev_pending_read());
+	ledring_ev_enable_write((1 << CSR_LEDRING_EV_ENABLE_FRAME_DONE_OFFSET) |
+				(1 << CSR_LEDRING_EV_ENABLE_FIFO_LOW_OFFSET));
+	irq_setmask(irq_getmask() | (1 << LEDRING_INTERRUPT));
+
+	while(1) {
+		busy_wait(1000);
+		printf("Frames drawn = %u, fifo low = %u\n", frames, fifo_low);
+	}
+
+	return 0;
+}
@@ -0,0 +1,33 @@
+// This file is Copyright (c) 2020 Florent Kermarrec <florent@enjoy-digital.fr>
+// License: BSD
+
+#include <generated/csr.h>
+#include <generated/soc.h>
+#include <irq.h>
+#include <libbase/uart.h>
+
+void isr(void);
+void ledring_isr(void);
+
+#ifdef CONFIG_CPU_HAS_INTERRUPT
+
+void isr(void)
+{
+	__attribute__((unused)) unsigned int irqs;
+
+	irqs = irq_pending() & irq_getmask();
+
+#ifndef UART_POLLING
+	if(irqs & (1 << UART_INTERRUPT))
+		uart_isr();
+#endif
+
+	if(irqs & (1 << LEDRING_INTERRUPT))
+		ledring_isr();
+}
+
+#else
+
+void isr(void){};
+
+#endif
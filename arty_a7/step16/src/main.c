@@ -0,0 +1,111 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include <irq.h>
+#include <libbase/uart.h>
+#include <libbase/console.h>
+#include <generated/csr.h>
+#include <generated/mem.h>
+#include <generated/soc.h>
+
+void ledring_isr(void);
+
+/* RGB565 pixels are packed two by word, LED 2n in the LSBs */
+#if LEDRING_BPP == 16
+#define PPW 2
+typedef uint16_t pixel_t;
+#else
+#define PPW 1
+typedef uint32_t pixel_t;
+#endif
+
+/* The back buffer: lane l, LED n is at pixel l*LEDRING_STRIDE*PPW + n */
+static volatile pixel_t *fb = (volatile pixel_t *)LEDRING_FB_BASE;
+
+static volatile unsigned int frames = 0;
+
+/* A color wheel: 0 to 255 goes from green to red to blue (GRB) */
+static uint32_t wheel(unsigned int pos)
+{
+	pos &= 0xff;
+	if (pos < 85)
+		return ((255 - 3*pos) << 16) | ((3*pos) << 8);
+	pos -= 85;
+	if (pos < 85)
+		return ((255 - 3*pos) << 8) | (3*pos);
+	pos -= 85;
+	return ((3*pos) << 16) | (255 - 3*pos);
+}
+
+/* Convert a GRB color to the framebuffer format */
+static uint32_t pixel(uint32_t grb)
+{
+#if LEDRING_BPP == 16
+	uint32_t g = (grb >> 16) & 0xff, r = (grb >> 8) & 0xff, b = grb & 0xff;
+	return ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3);
+#elif LEDRING_BPP == 32
+	/* GRBW: the white LED stays off */
+	return grb << 8;
+#else
+	return grb;
+#endif
+}
+
+/* Draw the next frame in the back buffer and ask for a swap */
+static void draw(void)
+{
+	int l, n;
+
+	for (l = 0; l < LEDRING_LANES; l++)
+		for (n = 0; n < LEDRING_NLEDS; n++)
+			fb[l*LEDRING_STRIDE*PPW + n] = pixel(wheel(frames + (256*n)/LEDRING_NLEDS + 16*l));
+
+	ledring_fb_swap_write(1);
+	frames++;
+}
+
+/*
+ * Called at the end of every frame. If our last swap has been done,
+ * the back buffer is not sent anymore: we can draw the next one.
+ */
+void ledring_isr(void)
+{
+	ledring_ev_pending_write(ledring_ev_pending_read());
+
+	if (!ledring_fb_pending_read())
+		draw();
+}
+
+int main(void)
+{
+#ifdef CONFIG_CPU_HAS_INTERRUPT
+	irq_setmask(0);
+	irq_setie(1);
+#endif
+	uart_init();
+	printf("################################\n");
+	printf("#####  Double buffer demo  ######\n");
+	printf("################################\n\n");
+
+#ifdef CSR_LEDRING_GAMMA_BRIGHTNESS_ADDR
+	/* LEDs are really bright: 25% is enough */
+	ledring_gamma_brightness_write(63);
+#endif
+
+	/* Draw the first frame, the interrupt will do the rest */
+	draw();
+
+	ledring_ev_pending_write(ledring_ev_pending_read());
+	ledring_ev_enable_write(1);
+	irq_setmask(irq_getmask() | (1 << LEDRING_INTERRUPT));
+
+	while(1) {
+		busy_wait(1000);
+		printf("Frames drawn = %u, sent = %u, dropped = %u, %u cycles/frame\n", frames,
+			(unsigned)ledring_stats_frames_read(), (unsigned)ledring_stats_dropped_read(),
+			(unsigned)ledring_stats_frame_cycles_read());
+	}
+
+	return 0;
+}
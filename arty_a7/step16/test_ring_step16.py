@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+
+from random import *
+
+from migen import *
+from litex.soc.interconnect import wishbone
+
+from ring import *
+
+# Simulation tools: the ring decoder, the golden model, the Verilator runner and the
+# selective VCD dumps
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "tools"))
+from ringsim import RingDecoder
+from ringmodel import encode, decode, compare, read_vcd
+from verilatorsim import run_verilator
+from wavedump import run_simulation
+
+sys_clk_freq = 24e6
+# All the ring timings are 4 times shorter: the LEDs see a 6MHz clock
+time_scale   = 4
+nleds        = 12
+lanes        = 2
+bpp          = 24
+gamma        = True
+brightness   = 200
+
+# Bits sent per LED
+bits         = 32 if bpp == 32 else 24
+
+# One frame per lane
+frame        = [[randrange(2**bpp) for i in range(nleds)] for l in range(lanes)]
+
+# Address of LED0 for each lane
+ppw          = 2 if bpp == 16 else 1
+stride       = 2**log2_int((nleds + ppw - 1)//ppw, need_pow2=False)
+
+# -------------------------------------------------------
+# - This is what we expect on do for a pixel
+# -------------------------------------------------------
+def expected(pixel):
+    if bpp != 16:
+        return pixel
+    r, g, b = (pixel >> 11) & 0x1f, (pixel >> 5) & 0x3f, pixel & 0x1f
+    r, g, b = (r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)
+    return (g << 16) | (r << 8) | b
+
+# -------------------------------------------------------
+# - Gamma/brightness correction: the test loads a linear
+# - table for channel 1, the others keep the gamma curve
+# -------------------------------------------------------
+def lut(channel, value):
+    if channel == 1:
+        return value
+    return int(round(255*(value/255)**2.2))
+
+def corrected(pixel):
+    if not gamma:
+        return pixel
+    color = 0
+    for n in range(bits//8):
+        value = lut(n, (pixel >> 8*n) & 0xff)
+        color |= ((value*(brightness + 1)) >> 8) << 8*n
+    return color
+
+# -----------------------------------------------------------------------
+# - Frames are decoded from do by the RingDecoder of tools/ringsim.py.
+# - capture() returns the first frame that starts after it is called.
+# -----------------------------------------------------------------------
+decoder = None
+
+def capture():
+    return (yield from decoder.next_frame())
+
+def check(pixel_of=lambda l, i: frame[l][i]):
+    detected = (yield from capture())
+
+    errors = 0
+    for l in range(lanes):
+        for i in range(nleds):
+            pixel = corrected(expected(pixel_of(l, i)))
+            status = "OK" if detected[l][i] == pixel else "ERROR"
+            if detected[l][i] != pixel:
+                errors += 1
+            print("Lane {} LED{:<3} expected 0x{:06x} detected 0x{:06x} {}".format(
+                l, i, pixel, detected[l][i], status))
+    print("{} error(s)".format(errors))
+
+# -----------------------------------------------------------------------
+# - Incrementing burst accesses, they return the number of cycles used
+# -----------------------------------------------------------------------
+def burst_write(bus, adr, words, bte=0b00):
+    cycles = 0
+    yield bus.cyc.eq(1)
+    yield bus.stb.eq(1)
+    yield bus.we.eq(1)
+    yield bus.sel.eq(0xf)
+    yield bus.bte.eq(bte)
+    for i, word in enumerate(words):
+        yield bus.adr.eq(adr + i)
+        yield bus.dat_w.eq(word)
+        yield bus.cti.eq(0b111 if i == len(words) - 1 else 0b010)
+        yield
+        cycles += 1
+        while not (yield bus.ack):
+            yield
+            cycles += 1
+    yield bus.cyc.eq(0)
+    yield bus.stb.eq(0)
+    yield bus.we.eq(0)
+    yield bus.cti.eq(0)
+    yield
+    return cycles
+
+def burst_read(bus, adr, length, bte=0b00):
+    cycles = 0
+    words  = []
+    yield bus.cyc.eq(1)
+    yield bus.stb.eq(1)
+    yield bus.we.eq(0)
+    yield bus.bte.eq(bte)
+    mask = {0b00: 0, 0b01: 3, 0b10: 7, 0b11: 15}[bte]
+    for i in range(length):
+        yield bus.adr.eq((adr & ~mask) | ((adr + i) & mask) if mask else adr + i)
+        yield bus.cti.eq(0b111 if i == length - 1 else 0b010)
+        yield
+        cycles += 1
+        while not (yield bus.ack):
+            yield
+            cycles += 1
+        words.append((yield bus.dat_r))
+    yield bus.cyc.eq(0)
+    yield bus.stb.eq(0)
+    yield bus.cti.eq(0)
+    yield bus.bte.eq(0)
+    yield
+    return words, cycles
+
+# -----------------------------------------------------------------------
+# - Waits for the end of n frames
+# -----------------------------------------------------------------------
+def wait_frames(stats, n):
+    frames = (yield stats.frames.status)
+    while (yield stats.frames.status) < frames + n:
+        yield
+
+# -----------------------------------------------------------------------
+# - This generator fills the framebuffer over Wishbone then checks the
+# - first complete frame that is sent.
+# -----------------------------------------------------------------------
+def fill_and_check(dut):
+    # Load a linear table for channel 1 and set the brightness
+    if gamma:
+        for i in range(256):
+            yield from dut.lut_bus.write(256 + i, i)
+        value = (yield from dut.lut_bus.read(256 + 0x80))
+        print("Read back LUT1[0x80] = 0x{:02x}".format(value))
+        yield dut.gamma.brightness.storage.eq(brightness)
+
+    # RGB565 pixels are packed two by word.
+    # Each lane is written with one burst, then read back the same way.
+    errors = 0
+    for l in range(lanes):
+        words = []
+        for i in range(0, nleds, ppw):
+            word = 0
+            for k in range(min(ppw, nleds - i)):
+                word |= frame[l][i + k] << bpp*k
+            words.append(word)
+        cycles = (yield from burst_write(dut.bus, l*stride, words))
+        print("Lane {}: {} words written in {} cycles".format(l, len(words), cycles))
+        values, cycles = (yield from burst_read(dut.bus, l*stride, len(words)))
+        print("Lane {}: {} words read in {} cycles".format(l, len(words), cycles))
+        errors += sum(v != w for v, w in zip(values, words))
+
+    # Wrapped burst: 4 words from word 2 gives words 2, 3, 0, 1
+    if stride >= 4:
+        values, cycles = (yield from burst_read(dut.bus, 2, 4, bte=0b01))
+        wrapped = []
+        for i in (2, 3, 0, 1):
+            wrapped.append((yield from dut.bus.read(i)))
+        errors += values != wrapped
+
+    # Byte enables: only write byte 1 of word 0, then restore it
+    value = (yield from dut.bus.read(0))
+    yield from dut.bus.write(0, 0xa5a5a5a5, sel=0b0010)
+    partial = (yield from dut.bus.read(0))
+    errors += partial != (value & ~0xff00) | 0xa500
+    yield from dut.bus.write(0, value)
+    print("Read back: {} error(s)".format(errors))
+
+    # We wrote the back buffer: swap and wait for the swap to be done
+    yield dut.fb.swap.re.eq(1)
+    yield
+    yield dut.fb.swap.re.eq(0)
+    yield
+    while (yield dut.fb.pending.status):
+        yield
+
+    yield from check()
+
+    # Wait for the end of the next frame and read the counters
+    stats  = dut.stats
+    frames = (yield stats.frames.status)
+    while (yield stats.frames.status) == frames:
+        yield
+    yield
+    frame_cycles = (yield stats.frame_cycles.status)
+    rst_cycles   = (yield stats.rst_cycles.status)
+    expected_cycles = int(round(sys_clk_freq/dut.ring.frame_rate))
+    print("Stats: {} frames, {} cycles/frame ({} expected), {} in reset gap, {} write(s) mid-frame, {} dropped".format(
+        frames + 1, frame_cycles, expected_cycles, rst_cycles,
+        (yield stats.writes.status), (yield stats.dropped.status)))
+    if frame_cycles != expected_cycles:
+        print("ERROR: wrong frame length")
+
+    # Load a one keyframe program: LEDs 1, 2 and 5 in one color, looping
+    # on itself. The others are off.
+    color   = randrange(2**bpp)
+    program = keyframe(color=color, first=1, count=2, first2=5, count2=1, flags=SEQ_JUMP)
+    for i, word in enumerate(program):
+        yield from dut.seq_bus.write(i, word)
+    yield dut.seq.enable.storage.eq(1)
+
+    # The framebuffer is read ahead of the serializer: the first pixels
+    # of the next frame may have been read before the program started
+    yield from wait_frames(stats, 2)
+
+    yield from check(lambda l, i: color if i in (1, 2, 5) else 0)
+
+    # Stop the program and rotate the framebuffer (modulo nleds)
+    offset = randrange(nleds, 2**16)
+    yield dut.seq.enable.storage.eq(0)
+    yield dut.rotate.offset.storage.eq(offset)
+    yield dut.rotate.offset.re.eq(1)
+    yield
+    yield dut.rotate.offset.re.eq(0)
+    yield from wait_frames(stats, 2)
+
+    print("Rotation by {}".format(offset))
+    yield from check(lambda l, i: frame[l][(i + offset) % nleds])
+
+# -----------------------------------------------------------------------
+# - RingRotate alone, with 6 LEDs: offset and step are taken modulo the
+# - number of LEDs, whatever their value. With time_scale, a ms is 24
+# - cycles.
+# -----------------------------------------------------------------------
+def check_rotate(dut, nleds):
+    errors = 0
+    for offset, step in [(4, 5), (7, 1), (6, 7), (13, 11), (0xffff, 0xfffe)]:
+        yield dut.period.storage.eq(0)
+        yield dut.offset.storage.eq(offset)
+        yield dut.step.storage.eq(step)
+        yield dut.offset.re.eq(1)
+        yield dut.step.re.eq(1)
+        yield
+        yield dut.offset.re.eq(0)
+        yield dut.step.re.eq(0)
+        for i in range(40):
+            yield
+        rotations = [(yield dut.rotation)]
+
+        # Then a step every ms
+        yield dut.period.storage.eq(1)
+        for n in range(2*nleds):
+            for i in range(40):
+                yield
+                rotation = (yield dut.rotation)
+                if rotation != rotations[-1]:
+                    break
+            rotations.append(rotation)
+        expected = [(offset + n*step) % nleds for n in range(2*nleds + 1)]
+        if rotations != expected:
+            print("Offset {} step {}: rotations {} expected {}".format(offset, step, rotations, expected))
+            errors += 1
+    print("Rotation of {} LEDs: {} error(s)".format(nleds, errors))
+
+# -----------------------------------------------------------------------
+# - This generator is a stream source: it gives the frame in a loop,
+# - 'last' is set on the last LED.
+# -----------------------------------------------------------------------
+@passive
+def stream_frame(sink):
+    while True:
+        for i in range(nleds):
+            yield sink.valid.eq(1)
+            yield sink.last.eq(i == nleds - 1)
+            yield sink.data.eq(sum(frame[l][i] << bpp*l for l in range(lanes)))
+            yield
+            while (yield sink.ready) == 0:
+                yield
+        yield sink.valid.eq(0)
+        # Let's be late: the serializer must wait
+        for i in range(randrange(20)):
+            yield
+
+# -----------------------------------------------------------------------
+# - The DMA reads the frame from a memory on its bus, one word per LED
+# - and per lane. The memory waits 'wait_states' cycles before each
+# - access: a slow enough bus makes the FIFO of the DMA run low.
+# -----------------------------------------------------------------------
+class DMATestbench(Module):
+    def __init__(self, do):
+        self.submodules.dut = dut = RingControl(do, mode.DOUBLE, nleds, sys_clk_freq, lanes,
+                                                with_framebuffer=False, bpp=bpp, with_dma=True,
+                                                time_scale=time_scale)
+        init = [frame[l][n] for n in range(nleds) for l in range(lanes)]
+        self.submodules.ram = ram = wishbone.SRAM(4*len(init), init=init)
+
+        self.wait_states = Signal(16)
+        waited = Signal(16)
+        self.comb += [
+            dut.dma_bus.connect(ram.bus, omit={"stb"}),
+            ram.bus.stb.eq(dut.dma_bus.stb & (waited >= self.wait_states)),
+        ]
+        self.sync += [
+            If(dut.dma_bus.ack,
+                waited.eq(0)
+            ).Elif(dut.dma_bus.stb & (waited < self.wait_states),
+                waited.eq(waited + 1)
+            )
+        ]
+
+def dma_frame(tb):
+    dut = tb.dut
+    yield dut.dma.base.storage.eq(0)
+    yield dut.dma.enable.storage.eq(1)
+    yield from check()
+
+    # Slow down the memory until the FIFO runs low (it gives a word every
+    # 150 cycles, the serializer needs one every 90 cycles), then back to
+    # full speed before it runs empty: the frames must not change.
+    yield tb.wait_states.eq(150)
+    for i in range(20000):
+        if (yield dut.ev.fifo_low.pending):
+            break
+        yield
+    pending = (yield dut.ev.fifo_low.pending)
+    yield tb.wait_states.eq(0)
+    yield from check()
+
+    errors = 0 if fifo_low_events and pending else 1
+    print("{} fifo_low event(s), interrupt {}pending: {} error(s)".format(
+        fifo_low_events, "" if pending else "not ", errors))
+
+fifo_low_events = 0
+
+@passive
+def count_fifo_low(dut):
+    global fifo_low_events
+    while True:
+        fifo_low_events += (yield dut.dma.fifo_low)
+        yield
+
+# -----------------------------------------------------------------------
+# - Cross-fade from 'frame' to 'frame2': the stream source asks for it at
+# - the start of a frame, the next frames are frame2.
+# -----------------------------------------------------------------------
+fade_frames  = 4
+frame2       = [[randrange(2**bpp) for i in range(nleds)] for l in range(lanes)]
+fade_request = False
+
+def lerp(start, target, alpha):
+    color = 0
+    for n in range(bits//8):
+        s, t = (start >> 8*n) & 0xff, (target >> 8*n) & 0xff
+        color |= (s + (((t - s)*alpha) >> 8)) << 8*n
+    return color
+
+@passive
+def fade_stream(dut):
+    global fade_request
+    source = frame
+    while True:
+        if fade_request:
+            fade_request = False
+            yield dut.fade.start.re.eq(1)
+            yield
+            yield dut.fade.start.re.eq(0)
+            this, source = source, frame2
+        else:
+            this = source
+        for i in range(nleds):
+            yield dut.sink.valid.eq(1)
+            yield dut.sink.last.eq(i == nleds - 1)
+            yield dut.sink.data.eq(sum(this[l][i] << bpp*l for l in range(lanes)))
+            yield
+            while (yield dut.sink.ready) == 0:
+                yield
+
+def check_fade(dut):
+    global fade_request
+    yield dut.fade.frames.storage.eq(fade_frames)
+    yield from check()
+
+    # Each frame must be a mix of the two frames: find the position
+    fade_request = True
+    alphas = []
+    for k in range(fade_frames + 4):
+        detected = (yield from capture())
+        for alpha in range(0, 257, 256//fade_frames):
+            if all(detected[l][i] == lerp(expected(frame[l][i]), expected(frame2[l][i]), alpha)
+                   for l in range(lanes) for i in range(nleds)):
+                alphas.append(alpha)
+                break
+        else:
+            alphas.append(None)
+    steps  = list(range(0, 257, 256//fade_frames))
+    errors = 0 if (None not in alphas and sorted(alphas) == alphas and
+                   all(a in alphas for a in steps) and alphas[-1] == 256) else 1
+    print("Cross-fade in {} frames: {} {} error(s)".format(fade_frames, alphas, errors))
+
+# -----------------------------------------------------------------------
+# - The whole do trace of the stream must be what the golden model of
+# - tools/ringmodel.py gives, cycle by cycle, and must decode (with NumPy)
+# - to the frames RingDecoder got. The VCD file must give the same trace.
+# -----------------------------------------------------------------------
+def check_golden(vcd_name):
+    trace  = decoder.trace()
+    pixels = [[expected(p) for p in lane] for lane in frame]
+    nframes = len(trace)//len(encode([pixels], sys_clk_freq, bits, time_scale=time_scale)) + 1
+    golden = encode([pixels]*nframes, sys_clk_freq, bits, time_scale=time_scale)
+
+    errors = 0
+    first  = compare(trace, golden)
+    if first is not None:
+        print("Golden model: do differs at cycle {}".format(first))
+        errors += 1
+    result = decode(trace, sys_clk_freq, lanes, bits, time_scale=time_scale)
+    if result.frames != decoder.frames or result.violations != decoder.violations:
+        print("Golden model: decoded frames or violations differ")
+        errors += 1
+    if vcd_name is not None:
+        vcd = read_vcd(vcd_name)
+        if len(vcd) != len(trace) or compare(vcd, trace) is not None:
+            print("Golden model: the VCD file gives another trace")
+            errors += 1
+    print("Golden model: {} cycle(s), {} frame(s) {} error(s)".format(
+        len(trace), len(result.frames), errors))
+
+# -----------------------------------------------------------------------
+# - Run
+# -----------------------------------------------------------------------
+
+def simulate(dut, do, generators, vcd_name, clocks={}, record=False, chip="WS2812B"):
+    global decoder
+    decoder = RingDecoder(do, sys_clk_freq, lanes, bits, chip, time_scale=time_scale, record=record)
+    generators = {"sys": generators + [decoder.generator()]}
+    clocks     = {"sys": 1e9/sys_clk_freq, **clocks}
+    # ./test_ring_step16.py verilator: same tests on a Verilator model
+    if "verilator" in sys.argv[1: ]:
+        run_verilator(dut, generators, clocks=clocks, vcd_name=vcd_name, ios={do},
+                      build_dir="verilator_" + vcd_name.split(".")[0])
+    # Only do and the clocks, gzip compressed (./test_ring_step16.py vcd: all the signals)
+    else:
+        vcd_name += ".gz"
+        run_simulation(dut, generators, clocks=clocks, vcd_name=vcd_name,
+                       signals=None if "vcd" in sys.argv[1: ] else [do])
+    rate = decoder.frame_rate()
+    print("{} frame(s){}, {} timing violation(s)".format(len(decoder.frames),
+        " at {:.1f} fps".format(rate) if rate else "", len(decoder.violations)))
+    for violation in decoder.violations[:10]:
+        print("  cycle {} lane {} {} {:.0f}".format(*violation))
+    return vcd_name
+
+def main():
+        global gamma
+
+        # Pixels from the framebuffer
+        do  = Signal(lanes)
+        dut = RingControl(do, mode.DOUBLE, nleds, sys_clk_freq, lanes, bpp=bpp, with_gamma=gamma,
+                          time_scale=time_scale)
+
+        simulate(dut, do, [ fill_and_check(dut) ], "sim.vcd")
+
+        # Rotation with offsets and steps larger than the ring
+        dut = RingRotate(6, sys_clk_freq, time_scale=1000)
+        run_simulation(dut, [ check_rotate(dut, 6) ])
+
+        # Pixels from a stream (without correction)
+        gamma = False
+
+        do  = Signal(lanes)
+        dut = RingControl(do, mode.DOUBLE, nleds, sys_clk_freq, lanes, with_framebuffer=False, bpp=bpp,
+                          time_scale=time_scale)
+
+        vcd_name = simulate(dut, do, [ check(), stream_frame(dut.sink) ], "sim_stream.vcd", record=True)
+        check_golden(vcd_name)
+
+        # Same stream with the symbol encoder, from a 12MHz clock
+        do  = Signal(lanes)
+        dut = RingControl(do, mode.DOUBLE, nleds, sys_clk_freq, lanes, with_framebuffer=False, bpp=bpp,
+                          symbol_clk_freq=12e6, time_scale=time_scale)
+
+        simulate(dut, do, [ check(), stream_frame(dut.sink) ], "sim_symbol.vcd",
+                 clocks={"ring": 1e9/12e6})
+
+        # Another chip from a 48MHz clock (the 12MHz of the board, with
+        # time_scale): 3 symbols would give T1H=833ns, the SK6812 needs 4
+        do  = Signal(lanes)
+        dut = RingControl(do, mode.DOUBLE, nleds, sys_clk_freq, lanes, chip="SK6812",
+                          with_framebuffer=False, bpp=bpp, symbol_clk_freq=48e6, time_scale=time_scale)
+
+        simulate(dut, do, [ check(), stream_frame(dut.sink) ], "sim_symbol_sk6812.vcd",
+                 clocks={"ring": 1e9/48e6}, chip="SK6812")
+
+        # Pixels read from memory by the DMA
+        do = Signal(lanes)
+        tb = DMATestbench(do)
+
+        simulate(tb, do, [ dma_frame(tb), count_fifo_low(tb.dut) ], "sim_dma.vcd")
+
+        # Cross-fade of a stream
+        do  = Signal(lanes)
+        dut = RingControl(do, mode.DOUBLE, nleds, sys_clk_freq, lanes, with_framebuffer=False, bpp=bpp,
+                          with_fade=True, time_scale=time_scale)
+
+        simulate(dut, do, [ check_fade(dut), fade_stream(dut) ], "sim_fade.vcd")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+
+#include <cstdint>
+#include <vector>
+#include "Vtop.h"
+#include "verilated.h"
+#include "verilated_vpi.h"
+#if VM_TRACE
+#include "verilated_vcd_c.h"
+#endif
+
+struct Sim {
+    VerilatedContext *context;
+    Vtop             *top;
+#if VM_TRACE
+    VerilatedVcdC    *vcd;
+#endif
+};
+
+extern "C" {
+
+void *sim_new(const char *vcd_name)
+{
+    Sim *sim = new Sim;
+    sim->context = new VerilatedContext;
+#if VM_TRACE
+    sim->vcd = NULL;
+    if (vcd_name)
+        sim->context->traceEverOn(true);
+#endif
+    sim->top = new Vtop(sim->context);
+#if VM_TRACE
+    if (vcd_name) {
+        sim->vcd = new VerilatedVcdC;
+        sim->top->trace(sim->vcd, 99);
+        sim->vcd->open(vcd_name);
+    }
+#endif
+    return sim;
+}
+
+void sim_eval(void *p, uint64_t time)
+{
+    Sim *sim = (Sim *)p;
+    sim->context->time(time);
+    sim->top->eval();
+}
+
+void sim_dump(void *p, uint64_t time)
+{
+#if VM_TRACE
+    Sim *sim = (Sim *)p;
+    if (sim->vcd)
+        sim->vcd->dump(time);
+#endif
+}
+
+void sim_free(void *p)
+{
+    Sim *sim = (Sim *)p;
+    sim->top->final();
+#if VM_TRACE
+    if (sim->vcd) {
+        sim->vcd->close();
+        delete sim->vcd;
+    }
+#endif
+    delete sim->top;
+    delete sim->context;
+    delete sim;
+}
+
+void *sim_handle(const char *name)
+{
+    return vpi_handle_by_name((PLI_BYTE8 *)name, NULL);
+}
+
+void *sim_index(void *handle, int index)
+{
+    return vpi_handle_by_index((vpiHandle)handle, index);
+}
+
+void sim_get(void *handle, uint32_t *words, int nwords)
+{
+    s_vpi_value value;
+    value.format = vpiVectorVal;
+    vpi_get_value((vpiHandle)handle, &value);
+    for (int i = 0; i < nwords; i++)
+        words[i] = value.value.vector[i].aval;
+}
+
+void sim_put(void *handle, const uint32_t *words, int nwords)
+{
+    std::vector<s_vpi_vecval> vector(nwords);
+    s_vpi_value value;
+    for (int i = 0; i < nwords; i++) {
+        vector[i].aval = words[i];
+        vector[i].bval = 0;
+    }
+    value.format = vpiVectorVal;
+    value.value.vector = vector.data();
+    vpi_put_value((vpiHandle)handle, &value, NULL, vpiNoDelay);
+}
+
+}
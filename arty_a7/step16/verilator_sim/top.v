@@ -0,0 +1,1247 @@
+/* Machine-generated using Migen */
+module top(
+	output [1:0] do_1,
+	input [6:0] storage,
+	input [6:0] storage_1,
+	input [6:0] storage_2,
+	input [12:0] storage_3,
+	input [29:0] bus_adr,
+	input [31:0] bus_dat_w,
+	input bus_cyc,
+	input bus_stb,
+	input bus_we,
+	input source_first,
+	input [7:0] storage_4,
+	input status,
+	input re,
+	input r,
+	input storage_5,
+	input [29:0] bus_adr_1,
+	input [31:0] bus_dat_w_1,
+	input [3:0] bus_sel,
+	input bus_cyc_1,
+	input bus_stb_1,
+	input bus_we_1,
+	input [2:0] bus_cti,
+	input [1:0] bus_bte,
+	input source_first_1,
+	input swap_re,
+	input [15:0] storage_6,
+	input re_1,
+	input [15:0] storage_7,
+	input re_2,
+	input [15:0] storage_8,
+	input [29:0] bus_adr_2,
+	input [31:0] bus_dat_w_2,
+	input bus_cyc_2,
+	input bus_stb_2,
+	input bus_we_2,
+	input storage_9,
+	input sys_clk
+);
+
+reg [1:0] ring_do;
+wire ring_sink_valid;
+reg ring_sink_ready;
+wire ring_sink_first;
+wire ring_sink_last;
+wire [47:0] ring_sink_payload_data;
+reg ring_frame_done;
+reg ring_idle;
+reg [4:0] ring_bit_count = 5'd0;
+reg [47:0] ring_data = 48'd0;
+reg ring_last = 1'd0;
+reg ring_load;
+reg [1:0] ring_phase;
+wire ring_done;
+reg [12:0] ring_count = 13'd448;
+wire [1:0] ring_bits;
+wire [31:0] gamma_bus_dat_r0;
+reg gamma_bus_ack = 1'd0;
+wire gamma_sink_valid;
+wire gamma_sink_ready;
+wire gamma_sink_first;
+wire gamma_sink_last;
+wire [47:0] gamma_sink_payload_data;
+wire gamma_source_valid;
+wire gamma_source_ready;
+wire gamma_source_last;
+reg [47:0] gamma_source_payload_data = 48'd0;
+wire [1:0] gamma_channel;
+wire gamma_ce;
+reg [1:0] gamma_valid = 2'd0;
+reg [1:0] gamma_last = 2'd0;
+wire [7:0] gamma_bus_dat_r1;
+wire [7:0] gamma_bus_dat_r2;
+wire [7:0] gamma_bus_dat_r3;
+wire [7:0] gamma_wr_port_memory0_adr;
+wire [7:0] gamma_wr_port_memory0_dat_r;
+wire gamma_wr_port_memory0_we;
+wire [7:0] gamma_wr_port_memory0_dat_w;
+wire [7:0] gamma_rd_port_memory0_adr;
+wire [7:0] gamma_rd_port_memory0_dat_r;
+wire gamma_rd_port_memory0_re;
+wire [7:0] gamma_wr_port_memory1_adr;
+wire [7:0] gamma_wr_port_memory1_dat_r;
+wire gamma_wr_port_memory1_we;
+wire [7:0] gamma_wr_port_memory1_dat_w;
+wire [7:0] gamma_rd_port_memory1_adr;
+wire [7:0] gamma_rd_port_memory1_dat_r;
+wire gamma_rd_port_memory1_re;
+wire [7:0] gamma_wr_port_memory2_adr;
+wire [7:0] gamma_wr_port_memory2_dat_r;
+wire gamma_wr_port_memory2_we;
+wire [7:0] gamma_wr_port_memory2_dat_w;
+wire [7:0] gamma_rd_port_memory2_adr;
+wire [7:0] gamma_rd_port_memory2_dat_r;
+wire gamma_rd_port_memory2_re;
+wire [7:0] gamma_wr_port_memory3_adr;
+wire [7:0] gamma_wr_port_memory3_dat_r;
+wire gamma_wr_port_memory3_we;
+wire [7:0] gamma_wr_port_memory3_dat_w;
+wire [7:0] gamma_rd_port_memory3_adr;
+wire [7:0] gamma_rd_port_memory3_dat_r;
+wire gamma_rd_port_memory3_re;
+wire [7:0] gamma_wr_port_memory4_adr;
+wire [7:0] gamma_wr_port_memory4_dat_r;
+wire gamma_wr_port_memory4_we;
+wire [7:0] gamma_wr_port_memory4_dat_w;
+wire [7:0] gamma_rd_port_memory4_adr;
+wire [7:0] gamma_rd_port_memory4_dat_r;
+wire gamma_rd_port_memory4_re;
+wire [7:0] gamma_wr_port_memory5_adr;
+wire [7:0] gamma_wr_port_memory5_dat_r;
+wire gamma_wr_port_memory5_we;
+wire [7:0] gamma_wr_port_memory5_dat_w;
+wire [7:0] gamma_rd_port_memory5_adr;
+wire [7:0] gamma_rd_port_memory5_dat_r;
+wire gamma_rd_port_memory5_re;
+reg [1:0] gamma_channel_r = 2'd0;
+wire irq;
+wire frame_done_status;
+reg frame_done_pending = 1'd0;
+wire frame_done_trigger;
+reg frame_done_clear;
+wire eventmanager_frame_done0;
+wire eventmanager_frame_done1;
+wire stats_frame_done;
+wire stats_idle;
+wire stats_write;
+wire stats_drop;
+reg [31:0] stats_frames_status = 32'd0;
+reg [31:0] stats_frame_cycles_status = 32'd0;
+reg [31:0] stats_rst_cycles_status = 32'd0;
+reg [31:0] stats_writes_status = 32'd0;
+reg [31:0] stats_dropped_status = 32'd0;
+reg [31:0] stats_cycles = 32'd0;
+reg [31:0] stats_rst_cycles = 32'd0;
+wire [31:0] fb_bus_dat_r;
+reg fb_bus_ack = 1'd0;
+reg fb_source_valid = 1'd0;
+wire fb_source_ready;
+wire fb_source_last;
+reg [47:0] fb_source_payload_data;
+reg [3:0] fb_led_adr = 4'd0;
+wire fb_led_on;
+wire fb_led_fb;
+wire [23:0] fb_led_color;
+wire [3:0] fb_rotation;
+wire fb_write;
+wire fb_drop;
+wire fb_lane;
+reg fb_lane_r = 1'd0;
+reg fb_front = 1'd0;
+wire fb_front_next;
+reg fb_status = 1'd0;
+wire fb_swap_now;
+wire [4:0] fb_fb_bus_adr;
+wire [47:0] fb_fb_bus_dat_r;
+reg [5:0] fb_fb_bus_we;
+wire [47:0] fb_fb_bus_dat_w;
+wire fb_burst;
+reg [29:0] fb_adr_bus;
+reg [29:0] fb_adr_burst;
+wire [4:0] fb_fb_port_adr;
+wire [47:0] fb_fb_port_dat_r;
+reg [3:0] fb_adr_next;
+reg [3:0] fb_pix = 4'd0;
+reg [3:0] fb_pix_next;
+wire [3:0] fb_rd_adr;
+reg [3:0] rotate_rotation = 4'd0;
+reg [15:0] rotate_rem = 16'd0;
+wire [15:0] rotate_rem_next;
+reg [3:0] rotate_k = 4'd0;
+reg rotate_busy = 1'd0;
+reg rotate_to_step = 1'd0;
+reg rotate_pending_offset = 1'd0;
+reg rotate_pending_step = 1'd0;
+reg [3:0] rotate_step = 4'd0;
+reg rotate_applied = 1'd0;
+wire rotate_wait;
+wire rotate_done;
+reg [12:0] rotate_count = 13'd6000;
+reg [15:0] rotate_ms = 16'd0;
+wire [4:0] rotate_rotated;
+wire [31:0] seq_bus_dat_r;
+reg seq_bus_ack = 1'd0;
+wire [3:0] seq_led_adr;
+wire seq_led_on;
+wire seq_led_fb;
+wire [23:0] seq_color0;
+wire [7:0] seq_entry_status;
+wire [9:0] seq_bus_port_adr;
+wire [31:0] seq_bus_port_dat_r;
+wire seq_bus_port_we;
+wire [31:0] seq_bus_port_dat_w;
+reg [9:0] seq_rd_port_adr;
+wire [31:0] seq_rd_port_dat_r;
+wire seq_wait;
+wire seq_done;
+reg [12:0] seq_count0 = 13'd6000;
+reg [7:0] seq_entry = 8'd0;
+reg [31:0] seq_words0 = 32'd0;
+reg [31:0] seq_words1 = 32'd0;
+reg [31:0] seq_words2 = 32'd0;
+reg [31:0] seq_color1 = 32'd0;
+reg [15:0] seq_first = 16'd0;
+reg [15:0] seq_count1 = 16'd0;
+reg [15:0] seq_first2 = 16'd0;
+reg [15:0] seq_count2 = 16'd0;
+reg [31:0] seq_ctrl = 32'd0;
+reg [15:0] seq_remaining = 16'd0;
+reg seq_active = 1'd0;
+reg seq_looping = 1'd0;
+reg [5:0] seq_loop_cnt = 6'd0;
+reg [2:0] ringserialctrl_state = 3'd0;
+reg [2:0] ringserialctrl_next_state;
+reg [4:0] ring_bit_count_ringserialctrl_next_value0;
+reg ring_bit_count_ringserialctrl_next_value_ce0;
+reg [47:0] ring_data_ringserialctrl_next_value1;
+reg ring_data_ringserialctrl_next_value_ce1;
+reg ring_last_ringserialctrl_next_value2;
+reg ring_last_ringserialctrl_next_value_ce2;
+reg [2:0] ringsequencer_state = 3'd0;
+reg [2:0] ringsequencer_next_state;
+reg seq_active_ringsequencer_next_value0;
+reg seq_active_ringsequencer_next_value_ce0;
+reg seq_looping_ringsequencer_next_value1;
+reg seq_looping_ringsequencer_next_value_ce1;
+reg [7:0] seq_entry_ringsequencer_next_value2;
+reg seq_entry_ringsequencer_next_value_ce2;
+reg [31:0] seq_words0_ringsequencer_next_value3;
+reg seq_words0_ringsequencer_next_value_ce3;
+reg [31:0] seq_words1_ringsequencer_next_value4;
+reg seq_words1_ringsequencer_next_value_ce4;
+reg [31:0] seq_words2_ringsequencer_next_value5;
+reg seq_words2_ringsequencer_next_value_ce5;
+reg [31:0] seq_color1_ringsequencer_next_value6;
+reg seq_color1_ringsequencer_next_value_ce6;
+reg [15:0] seq_first_ringsequencer_next_value7;
+reg seq_first_ringsequencer_next_value_ce7;
+reg [15:0] seq_count1_ringsequencer_next_value8;
+reg seq_count1_ringsequencer_next_value_ce8;
+reg [15:0] seq_first2_ringsequencer_next_value9;
+reg seq_first2_ringsequencer_next_value_ce9;
+reg [15:0] seq_count2_ringsequencer_next_value10;
+reg seq_count2_ringsequencer_next_value_ce10;
+reg [31:0] seq_ctrl_ringsequencer_next_value11;
+reg seq_ctrl_ringsequencer_next_value_ce11;
+reg [15:0] seq_remaining_ringsequencer_next_value12;
+reg seq_remaining_ringsequencer_next_value_ce12;
+reg [5:0] seq_loop_cnt_ringsequencer_next_value13;
+reg seq_loop_cnt_ringsequencer_next_value_ce13;
+wire [30:0] slice_proxy0;
+wire [30:0] slice_proxy1;
+wire [30:0] slice_proxy2;
+reg [7:0] comb_array_muxed0;
+reg [23:0] comb_array_muxed1;
+reg [15:0] comb_array_muxed2;
+reg [15:0] comb_array_muxed3;
+reg [12:0] sync_array_muxed;
+
+// synthesis translate_off
+reg dummy_s;
+initial dummy_s <= 1'd0;
+// synthesis translate_on
+
+assign ring_sink_valid = gamma_source_valid;
+assign gamma_source_ready = ring_sink_ready;
+assign ring_sink_first = source_first;
+assign ring_sink_last = gamma_source_last;
+assign ring_sink_payload_data = gamma_source_payload_data;
+assign do_1 = ring_do;
+assign frame_done_trigger = ring_frame_done;
+assign stats_frame_done = ring_frame_done;
+assign stats_idle = ring_idle;
+assign gamma_sink_valid = fb_source_valid;
+assign fb_source_ready = gamma_sink_ready;
+assign gamma_sink_first = source_first_1;
+assign gamma_sink_last = fb_source_last;
+assign gamma_sink_payload_data = fb_source_payload_data;
+assign stats_write = fb_write;
+assign stats_drop = fb_drop;
+assign fb_rotation = rotate_rotation;
+assign seq_led_adr = fb_led_adr;
+assign fb_led_on = seq_led_on;
+assign fb_led_fb = seq_led_fb;
+assign fb_led_color = seq_color0;
+assign ring_bits = {ring_data[47], ring_data[23]};
+assign ring_done = (ring_count == 1'd0);
+
+// synthesis translate_off
+reg dummy_d;
+// synthesis translate_on
+always @(*) begin
+	ring_do <= 2'd0;
+	ring_sink_ready <= 1'd0;
+	ring_frame_done <= 1'd0;
+	ring_idle <= 1'd0;
+	ring_load <= 1'd0;
+	ring_phase <= 2'd0;
+	ringserialctrl_next_state <= 3'd0;
+	ring_bit_count_ringserialctrl_next_value0 <= 5'd0;
+	ring_bit_count_ringserialctrl_next_value_ce0 <= 1'd0;
+	ring_data_ringserialctrl_next_value1 <= 48'd0;
+	ring_data_ringserialctrl_next_value_ce1 <= 1'd0;
+	ring_last_ringserialctrl_next_value2 <= 1'd0;
+	ring_last_ringserialctrl_next_value_ce2 <= 1'd0;
+	ringserialctrl_next_state <= ringserialctrl_state;
+	case (ringserialctrl_state)
+		1'd1: begin
+			ring_sink_ready <= 1'd1;
+			if (ring_sink_valid) begin
+				ring_bit_count_ringserialctrl_next_value0 <= 5'd23;
+				ring_bit_count_ringserialctrl_next_value_ce0 <= 1'd1;
+				ring_data_ringserialctrl_next_value1 <= ring_sink_payload_data;
+				ring_data_ringserialctrl_next_value_ce1 <= 1'd1;
+				ring_last_ringserialctrl_next_value2 <= ring_sink_last;
+				ring_last_ringserialctrl_next_value_ce2 <= 1'd1;
+				ring_load <= 1'd1;
+				ring_phase <= 1'd0;
+				ringserialctrl_next_state <= 2'd2;
+			end
+		end
+		2'd2: begin
+			ring_do <= 2'd3;
+			if (ring_done) begin
+				ring_load <= 1'd1;
+				ring_phase <= 1'd1;
+				ringserialctrl_next_state <= 2'd3;
+			end
+		end
+		2'd3: begin
+			ring_do <= ring_bits;
+			if (ring_done) begin
+				ring_load <= 1'd1;
+				ring_phase <= 2'd2;
+				ringserialctrl_next_state <= 3'd4;
+			end
+		end
+		3'd4: begin
+			if (ring_done) begin
+				ringserialctrl_next_state <= 3'd5;
+			end
+		end
+		3'd5: begin
+			ring_data_ringserialctrl_next_value1 <= (ring_data <<< 1'd1);
+			ring_data_ringserialctrl_next_value_ce1 <= 1'd1;
+			ring_bit_count_ringserialctrl_next_value0 <= (ring_bit_count - 1'd1);
+			ring_bit_count_ringserialctrl_next_value_ce0 <= 1'd1;
+			if ((ring_bit_count == 1'd0)) begin
+				if (ring_last) begin
+					ring_frame_done <= 1'd1;
+					ring_load <= 1'd1;
+					ring_phase <= 2'd3;
+					ringserialctrl_next_state <= 1'd0;
+				end else begin
+					ringserialctrl_next_state <= 1'd1;
+				end
+			end else begin
+				ring_load <= 1'd1;
+				ring_phase <= 1'd0;
+				ringserialctrl_next_state <= 2'd2;
+			end
+		end
+		default: begin
+			ring_idle <= 1'd1;
+			if (ring_done) begin
+				ringserialctrl_next_state <= 1'd1;
+			end
+		end
+	endcase
+// synthesis translate_off
+	dummy_d <= dummy_s;
+// synthesis translate_on
+end
+assign gamma_channel = bus_adr[9:8];
+assign gamma_ce = (gamma_source_ready | (~gamma_source_valid));
+assign gamma_sink_ready = gamma_ce;
+assign gamma_source_valid = gamma_valid[1];
+assign gamma_source_last = gamma_last[1];
+assign gamma_wr_port_memory0_adr = bus_adr[7:0];
+assign gamma_wr_port_memory0_dat_w = bus_dat_w[7:0];
+assign gamma_wr_port_memory0_we = ((((bus_cyc & bus_stb) & bus_we) & (~gamma_bus_ack)) & (gamma_channel == 1'd0));
+assign gamma_bus_dat_r1 = gamma_wr_port_memory0_dat_r;
+assign gamma_rd_port_memory0_adr = gamma_sink_payload_data[7:0];
+assign gamma_rd_port_memory0_re = gamma_ce;
+assign gamma_wr_port_memory1_adr = bus_adr[7:0];
+assign gamma_wr_port_memory1_dat_w = bus_dat_w[7:0];
+assign gamma_wr_port_memory1_we = ((((bus_cyc & bus_stb) & bus_we) & (~gamma_bus_ack)) & (gamma_channel == 1'd1));
+assign gamma_bus_dat_r2 = gamma_wr_port_memory1_dat_r;
+assign gamma_rd_port_memory1_adr = gamma_sink_payload_data[15:8];
+assign gamma_rd_port_memory1_re = gamma_ce;
+assign gamma_wr_port_memory2_adr = bus_adr[7:0];
+assign gamma_wr_port_memory2_dat_w = bus_dat_w[7:0];
+assign gamma_wr_port_memory2_we = ((((bus_cyc & bus_stb) & bus_we) & (~gamma_bus_ack)) & (gamma_channel == 2'd2));
+assign gamma_bus_dat_r3 = gamma_wr_port_memory2_dat_r;
+assign gamma_rd_port_memory2_adr = gamma_sink_payload_data[23:16];
+assign gamma_rd_port_memory2_re = gamma_ce;
+assign gamma_wr_port_memory3_adr = bus_adr[7:0];
+assign gamma_wr_port_memory3_dat_w = bus_dat_w[7:0];
+assign gamma_wr_port_memory3_we = ((((bus_cyc & bus_stb) & bus_we) & (~gamma_bus_ack)) & (gamma_channel == 1'd0));
+assign gamma_rd_port_memory3_adr = gamma_sink_payload_data[31:24];
+assign gamma_rd_port_memory3_re = gamma_ce;
+assign gamma_wr_port_memory4_adr = bus_adr[7:0];
+assign gamma_wr_port_memory4_dat_w = bus_dat_w[7:0];
+assign gamma_wr_port_memory4_we = ((((bus_cyc & bus_stb) & bus_we) & (~gamma_bus_ack)) & (gamma_channel == 1'd1));
+assign gamma_rd_port_memory4_adr = gamma_sink_payload_data[39:32];
+assign gamma_rd_port_memory4_re = gamma_ce;
+assign gamma_wr_port_memory5_adr = bus_adr[7:0];
+assign gamma_wr_port_memory5_dat_w = bus_dat_w[7:0];
+assign gamma_wr_port_memory5_we = ((((bus_cyc & bus_stb) & bus_we) & (~gamma_bus_ack)) & (gamma_channel == 2'd2));
+assign gamma_rd_port_memory5_adr = gamma_sink_payload_data[47:40];
+assign gamma_rd_port_memory5_re = gamma_ce;
+assign gamma_bus_dat_r0 = comb_array_muxed0;
+assign eventmanager_frame_done0 = frame_done_status;
+assign eventmanager_frame_done1 = frame_done_pending;
+
+// synthesis translate_off
+reg dummy_d_1;
+// synthesis translate_on
+always @(*) begin
+	frame_done_clear <= 1'd0;
+	if ((re & r)) begin
+		frame_done_clear <= 1'd1;
+	end
+// synthesis translate_off
+	dummy_d_1 <= dummy_s;
+// synthesis translate_on
+end
+assign irq = (status & storage_5);
+assign frame_done_status = 1'd0;
+assign fb_swap_now = (((fb_status & fb_source_valid) & fb_source_ready) & fb_source_last);
+assign fb_front_next = (fb_front ^ fb_swap_now);
+assign fb_drop = (swap_re & fb_status);
+assign fb_burst = (bus_cti == 2'd2);
+
+// synthesis translate_off
+reg dummy_d_2;
+// synthesis translate_on
+always @(*) begin
+	fb_adr_burst <= 30'd0;
+	case (bus_bte)
+		1'd0: begin
+			fb_adr_burst <= (bus_adr_1 + 1'd1);
+		end
+		1'd1: begin
+			fb_adr_burst <= {bus_adr_1[29:2], slice_proxy0[1:0]};
+		end
+		2'd2: begin
+			fb_adr_burst <= {bus_adr_1[29:3], slice_proxy1[2:0]};
+		end
+		2'd3: begin
+			fb_adr_burst <= {bus_adr_1[29:4], slice_proxy2[3:0]};
+		end
+	endcase
+// synthesis translate_off
+	dummy_d_2 <= dummy_s;
+// synthesis translate_on
+end
+
+// synthesis translate_off
+reg dummy_d_3;
+// synthesis translate_on
+always @(*) begin
+	fb_adr_bus <= 30'd0;
+	if (((fb_bus_ack & fb_burst) & (~bus_we_1))) begin
+		fb_adr_bus <= fb_adr_burst;
+	end else begin
+		fb_adr_bus <= bus_adr_1;
+	end
+// synthesis translate_off
+	dummy_d_3 <= dummy_s;
+// synthesis translate_on
+end
+assign fb_lane = fb_adr_bus[4];
+assign fb_fb_bus_adr = {(~fb_front), fb_adr_bus[3:0]};
+assign fb_fb_bus_dat_w = {2{bus_dat_w_1[23:0]}};
+assign fb_bus_dat_r = comb_array_muxed1;
+assign fb_write = (((bus_cyc_1 & bus_stb_1) & bus_we_1) & fb_bus_ack);
+
+// synthesis translate_off
+reg dummy_d_4;
+// synthesis translate_on
+always @(*) begin
+	fb_fb_bus_we <= 6'd0;
+	fb_fb_bus_we[0] <= ((fb_write & (fb_lane == 1'd0)) & bus_sel[0]);
+	fb_fb_bus_we[1] <= ((fb_write & (fb_lane == 1'd0)) & bus_sel[1]);
+	fb_fb_bus_we[2] <= ((fb_write & (fb_lane == 1'd0)) & bus_sel[2]);
+	fb_fb_bus_we[3] <= ((fb_write & (fb_lane == 1'd1)) & bus_sel[0]);
+	fb_fb_bus_we[4] <= ((fb_write & (fb_lane == 1'd1)) & bus_sel[1]);
+	fb_fb_bus_we[5] <= ((fb_write & (fb_lane == 1'd1)) & bus_sel[2]);
+// synthesis translate_off
+	dummy_d_4 <= dummy_s;
+// synthesis translate_on
+end
+
+// synthesis translate_off
+reg dummy_d_5;
+// synthesis translate_on
+always @(*) begin
+	fb_adr_next <= 4'd0;
+	fb_adr_next <= fb_led_adr;
+	if ((fb_source_valid & fb_source_ready)) begin
+		if ((fb_led_adr == 4'd11)) begin
+			fb_adr_next <= 1'd0;
+		end else begin
+			fb_adr_next <= (fb_led_adr + 1'd1);
+		end
+	end
+// synthesis translate_off
+	dummy_d_5 <= dummy_s;
+// synthesis translate_on
+end
+
+// synthesis translate_off
+reg dummy_d_6;
+// synthesis translate_on
+always @(*) begin
+	fb_pix_next <= 4'd0;
+	fb_pix_next <= fb_pix;
+	if ((fb_source_valid & fb_source_ready)) begin
+		if ((fb_led_adr == 4'd11)) begin
+			fb_pix_next <= fb_rotation;
+		end else begin
+			if ((fb_pix == 4'd11)) begin
+				fb_pix_next <= 1'd0;
+			end else begin
+				fb_pix_next <= (fb_pix + 1'd1);
+			end
+		end
+	end
+// synthesis translate_off
+	dummy_d_6 <= dummy_s;
+// synthesis translate_on
+end
+assign fb_rd_adr = fb_pix_next[3:0];
+assign fb_fb_port_adr = {fb_front_next, fb_rd_adr};
+assign fb_source_last = (fb_led_adr == 4'd11);
+
+// synthesis translate_off
+reg dummy_d_7;
+// synthesis translate_on
+always @(*) begin
+	fb_source_payload_data <= 48'd0;
+	if (fb_led_on) begin
+		fb_source_payload_data[23:0] <= (fb_led_fb ? fb_fb_port_dat_r[23:0] : fb_led_color);
+	end
+	if (fb_led_on) begin
+		fb_source_payload_data[47:24] <= (fb_led_fb ? fb_fb_port_dat_r[47:24] : fb_led_color);
+	end
+// synthesis translate_off
+	dummy_d_7 <= dummy_s;
+// synthesis translate_on
+end
+assign rotate_rem_next = ((rotate_rem >= comb_array_muxed2) ? (rotate_rem - comb_array_muxed3) : rotate_rem);
+assign rotate_wait = (~rotate_done);
+assign rotate_rotated = (rotate_rotation + rotate_step);
+assign rotate_done = (rotate_count == 1'd0);
+assign seq_bus_port_adr = bus_adr_2[9:0];
+assign seq_bus_port_dat_w = bus_dat_w_2;
+assign seq_bus_port_we = (((bus_cyc_2 & bus_stb_2) & bus_we_2) & (~seq_bus_ack));
+assign seq_bus_dat_r = seq_bus_port_dat_r;
+assign seq_wait = (~seq_done);
+assign seq_entry_status = seq_entry;
+assign seq_led_on = ((~seq_active) | (((seq_led_adr >= seq_first) & (seq_led_adr < (seq_first + seq_count1))) | ((seq_led_adr >= seq_first2) & (seq_led_adr < (seq_first2 + seq_count2)))));
+assign seq_led_fb = ((~seq_active) | seq_ctrl[30]);
+assign seq_color0 = seq_color1;
+assign seq_done = (seq_count0 == 1'd0);
+
+// synthesis translate_off
+reg dummy_d_8;
+// synthesis translate_on
+always @(*) begin
+	seq_rd_port_adr <= 10'd0;
+	ringsequencer_next_state <= 3'd0;
+	seq_active_ringsequencer_next_value0 <= 1'd0;
+	seq_active_ringsequencer_next_value_ce0 <= 1'd0;
+	seq_looping_ringsequencer_next_value1 <= 1'd0;
+	seq_looping_ringsequencer_next_value_ce1 <= 1'd0;
+	seq_entry_ringsequencer_next_value2 <= 8'd0;
+	seq_entry_ringsequencer_next_value_ce2 <= 1'd0;
+	seq_words0_ringsequencer_next_value3 <= 32'd0;
+	seq_words0_ringsequencer_next_value_ce3 <= 1'd0;
+	seq_words1_ringsequencer_next_value4 <= 32'd0;
+	seq_words1_ringsequencer_next_value_ce4 <= 1'd0;
+	seq_words2_ringsequencer_next_value5 <= 32'd0;
+	seq_words2_ringsequencer_next_value_ce5 <= 1'd0;
+	seq_color1_ringsequencer_next_value6 <= 32'd0;
+	seq_color1_ringsequencer_next_value_ce6 <= 1'd0;
+	seq_first_ringsequencer_next_value7 <= 16'd0;
+	seq_first_ringsequencer_next_value_ce7 <= 1'd0;
+	seq_count1_ringsequencer_next_value8 <= 16'd0;
+	seq_count1_ringsequencer_next_value_ce8 <= 1'd0;
+	seq_first2_ringsequencer_next_value9 <= 16'd0;
+	seq_first2_ringsequencer_next_value_ce9 <= 1'd0;
+	seq_count2_ringsequencer_next_value10 <= 16'd0;
+	seq_count2_ringsequencer_next_value_ce10 <= 1'd0;
+	seq_ctrl_ringsequencer_next_value11 <= 32'd0;
+	seq_ctrl_ringsequencer_next_value_ce11 <= 1'd0;
+	seq_remaining_ringsequencer_next_value12 <= 16'd0;
+	seq_remaining_ringsequencer_next_value_ce12 <= 1'd0;
+	seq_loop_cnt_ringsequencer_next_value13 <= 6'd0;
+	seq_loop_cnt_ringsequencer_next_value_ce13 <= 1'd0;
+	ringsequencer_next_state <= ringsequencer_state;
+	case (ringsequencer_state)
+		1'd1: begin
+			seq_rd_port_adr <= {seq_entry, 2'd0};
+			ringsequencer_next_state <= 2'd2;
+		end
+		2'd2: begin
+			seq_rd_port_adr <= {seq_entry, 2'd1};
+			seq_words0_ringsequencer_next_value3 <= seq_rd_port_dat_r;
+			seq_words0_ringsequencer_next_value_ce3 <= 1'd1;
+			ringsequencer_next_state <= 2'd3;
+		end
+		2'd3: begin
+			seq_rd_port_adr <= {seq_entry, 2'd2};
+			seq_words1_ringsequencer_next_value4 <= seq_rd_port_dat_r;
+			seq_words1_ringsequencer_next_value_ce4 <= 1'd1;
+			ringsequencer_next_state <= 3'd4;
+		end
+		3'd4: begin
+			seq_rd_port_adr <= {seq_entry, 2'd3};
+			seq_words2_ringsequencer_next_value5 <= seq_rd_port_dat_r;
+			seq_words2_ringsequencer_next_value_ce5 <= 1'd1;
+			ringsequencer_next_state <= 3'd5;
+		end
+		3'd5: begin
+			seq_active_ringsequencer_next_value0 <= 1'd1;
+			seq_active_ringsequencer_next_value_ce0 <= 1'd1;
+			seq_color1_ringsequencer_next_value6 <= seq_words0;
+			seq_color1_ringsequencer_next_value_ce6 <= 1'd1;
+			seq_first_ringsequencer_next_value7 <= seq_words1[15:0];
+			seq_first_ringsequencer_next_value_ce7 <= 1'd1;
+			seq_count1_ringsequencer_next_value8 <= seq_words1[31:16];
+			seq_count1_ringsequencer_next_value_ce8 <= 1'd1;
+			seq_first2_ringsequencer_next_value9 <= seq_words2[15:0];
+			seq_first2_ringsequencer_next_value_ce9 <= 1'd1;
+			seq_count2_ringsequencer_next_value10 <= seq_words2[31:16];
+			seq_count2_ringsequencer_next_value_ce10 <= 1'd1;
+			seq_ctrl_ringsequencer_next_value11 <= seq_rd_port_dat_r;
+			seq_ctrl_ringsequencer_next_value_ce11 <= 1'd1;
+			seq_remaining_ringsequencer_next_value12 <= seq_rd_port_dat_r[15:0];
+			seq_remaining_ringsequencer_next_value_ce12 <= 1'd1;
+			ringsequencer_next_state <= 3'd6;
+		end
+		3'd6: begin
+			if ((~storage_9)) begin
+				ringsequencer_next_state <= 1'd0;
+			end else begin
+				if ((seq_remaining == 1'd0)) begin
+					seq_entry_ringsequencer_next_value2 <= (seq_entry + 1'd1);
+					seq_entry_ringsequencer_next_value_ce2 <= 1'd1;
+					if (seq_ctrl[31]) begin
+						if ((seq_ctrl[29:24] == 1'd0)) begin
+							seq_entry_ringsequencer_next_value2 <= seq_ctrl[23:16];
+							seq_entry_ringsequencer_next_value_ce2 <= 1'd1;
+						end else begin
+							if ((~seq_looping)) begin
+								seq_looping_ringsequencer_next_value1 <= 1'd1;
+								seq_looping_ringsequencer_next_value_ce1 <= 1'd1;
+								seq_loop_cnt_ringsequencer_next_value13 <= (seq_ctrl[29:24] - 1'd1);
+								seq_loop_cnt_ringsequencer_next_value_ce13 <= 1'd1;
+								seq_entry_ringsequencer_next_value2 <= seq_ctrl[23:16];
+								seq_entry_ringsequencer_next_value_ce2 <= 1'd1;
+							end else begin
+								if ((seq_loop_cnt != 1'd0)) begin
+									seq_loop_cnt_ringsequencer_next_value13 <= (seq_loop_cnt - 1'd1);
+									seq_loop_cnt_ringsequencer_next_value_ce13 <= 1'd1;
+									seq_entry_ringsequencer_next_value2 <= seq_ctrl[23:16];
+									seq_entry_ringsequencer_next_value_ce2 <= 1'd1;
+								end else begin
+									seq_looping_ringsequencer_next_value1 <= 1'd0;
+									seq_looping_ringsequencer_next_value_ce1 <= 1'd1;
+								end
+							end
+						end
+					end
+					ringsequencer_next_state <= 1'd1;
+				end else begin
+					if (seq_done) begin
+						seq_remaining_ringsequencer_next_value12 <= (seq_remaining - 1'd1);
+						seq_remaining_ringsequencer_next_value_ce12 <= 1'd1;
+					end
+				end
+			end
+		end
+		default: begin
+			seq_active_ringsequencer_next_value0 <= 1'd0;
+			seq_active_ringsequencer_next_value_ce0 <= 1'd1;
+			seq_looping_ringsequencer_next_value1 <= 1'd0;
+			seq_looping_ringsequencer_next_value_ce1 <= 1'd1;
+			seq_entry_ringsequencer_next_value2 <= 1'd0;
+			seq_entry_ringsequencer_next_value_ce2 <= 1'd1;
+			if (storage_9) begin
+				ringsequencer_next_state <= 1'd1;
+			end
+		end
+	endcase
+// synthesis translate_off
+	dummy_d_8 <= dummy_s;
+// synthesis translate_on
+end
+assign slice_proxy0 = (bus_adr_1 + 1'd1);
+assign slice_proxy1 = (bus_adr_1 + 1'd1);
+assign slice_proxy2 = (bus_adr_1 + 1'd1);
+
+// synthesis translate_off
+reg dummy_d_9;
+// synthesis translate_on
+always @(*) begin
+	comb_array_muxed0 <= 8'd0;
+	case (gamma_channel_r)
+		1'd0: begin
+			comb_array_muxed0 <= gamma_bus_dat_r1;
+		end
+		1'd1: begin
+			comb_array_muxed0 <= gamma_bus_dat_r2;
+		end
+		default: begin
+			comb_array_muxed0 <= gamma_bus_dat_r3;
+		end
+	endcase
+// synthesis translate_off
+	dummy_d_9 <= dummy_s;
+// synthesis translate_on
+end
+
+// synthesis translate_off
+reg dummy_d_10;
+// synthesis translate_on
+always @(*) begin
+	comb_array_muxed1 <= 24'd0;
+	case (fb_lane_r)
+		1'd0: begin
+			comb_array_muxed1 <= fb_fb_bus_dat_r[23:0];
+		end
+		default: begin
+			comb_array_muxed1 <= fb_fb_bus_dat_r[47:24];
+		end
+	endcase
+// synthesis translate_off
+	dummy_d_10 <= dummy_s;
+// synthesis translate_on
+end
+
+// synthesis translate_off
+reg dummy_d_11;
+// synthesis translate_on
+always @(*) begin
+	comb_array_muxed2 <= 16'd0;
+	case (rotate_k)
+		1'd0: begin
+			comb_array_muxed2 <= 4'd12;
+		end
+		1'd1: begin
+			comb_array_muxed2 <= 5'd24;
+		end
+		2'd2: begin
+			comb_array_muxed2 <= 6'd48;
+		end
+		2'd3: begin
+			comb_array_muxed2 <= 7'd96;
+		end
+		3'd4: begin
+			comb_array_muxed2 <= 8'd192;
+		end
+		3'd5: begin
+			comb_array_muxed2 <= 9'd384;
+		end
+		3'd6: begin
+			comb_array_muxed2 <= 10'd768;
+		end
+		3'd7: begin
+			comb_array_muxed2 <= 11'd1536;
+		end
+		4'd8: begin
+			comb_array_muxed2 <= 12'd3072;
+		end
+		4'd9: begin
+			comb_array_muxed2 <= 13'd6144;
+		end
+		4'd10: begin
+			comb_array_muxed2 <= 14'd12288;
+		end
+		4'd11: begin
+			comb_array_muxed2 <= 15'd24576;
+		end
+		default: begin
+			comb_array_muxed2 <= 16'd49152;
+		end
+	endcase
+// synthesis translate_off
+	dummy_d_11 <= dummy_s;
+// synthesis translate_on
+end
+
+// synthesis translate_off
+reg dummy_d_12;
+// synthesis translate_on
+always @(*) begin
+	comb_array_muxed3 <= 16'd0;
+	case (rotate_k)
+		1'd0: begin
+			comb_array_muxed3 <= 4'd12;
+		end
+		1'd1: begin
+			comb_array_muxed3 <= 5'd24;
+		end
+		2'd2: begin
+			comb_array_muxed3 <= 6'd48;
+		end
+		2'd3: begin
+			comb_array_muxed3 <= 7'd96;
+		end
+		3'd4: begin
+			comb_array_muxed3 <= 8'd192;
+		end
+		3'd5: begin
+			comb_array_muxed3 <= 9'd384;
+		end
+		3'd6: begin
+			comb_array_muxed3 <= 10'd768;
+		end
+		3'd7: begin
+			comb_array_muxed3 <= 11'd1536;
+		end
+		4'd8: begin
+			comb_array_muxed3 <= 12'd3072;
+		end
+		4'd9: begin
+			comb_array_muxed3 <= 13'd6144;
+		end
+		4'd10: begin
+			comb_array_muxed3 <= 14'd12288;
+		end
+		4'd11: begin
+			comb_array_muxed3 <= 15'd24576;
+		end
+		default: begin
+			comb_array_muxed3 <= 16'd49152;
+		end
+	endcase
+// synthesis translate_off
+	dummy_d_12 <= dummy_s;
+// synthesis translate_on
+end
+
+// synthesis translate_off
+reg dummy_d_13;
+// synthesis translate_on
+always @(*) begin
+	sync_array_muxed <= 13'd0;
+	case (ring_phase)
+		1'd0: begin
+			sync_array_muxed <= storage;
+		end
+		1'd1: begin
+			sync_array_muxed <= storage_1;
+		end
+		2'd2: begin
+			sync_array_muxed <= storage_2;
+		end
+		default: begin
+			sync_array_muxed <= storage_3;
+		end
+	endcase
+// synthesis translate_off
+	dummy_d_13 <= dummy_s;
+// synthesis translate_on
+end
+
+always @(posedge sys_clk) begin
+	if (ring_load) begin
+		ring_count <= sync_array_muxed;
+	end else begin
+		if ((ring_count != 1'd0)) begin
+			ring_count <= (ring_count - 1'd1);
+		end
+	end
+	ringserialctrl_state <= ringserialctrl_next_state;
+	if (ring_bit_count_ringserialctrl_next_value_ce0) begin
+		ring_bit_count <= ring_bit_count_ringserialctrl_next_value0;
+	end
+	if (ring_data_ringserialctrl_next_value_ce1) begin
+		ring_data <= ring_data_ringserialctrl_next_value1;
+	end
+	if (ring_last_ringserialctrl_next_value_ce2) begin
+		ring_last <= ring_last_ringserialctrl_next_value2;
+	end
+	if (gamma_ce) begin
+		gamma_valid <= {gamma_valid[0], gamma_sink_valid};
+		gamma_last <= {gamma_last[0], gamma_sink_last};
+	end
+	if (gamma_ce) begin
+		gamma_source_payload_data[7:0] <= ((gamma_rd_port_memory0_dat_r * (storage_4 + 1'd1)) >>> 4'd8);
+	end
+	if (gamma_ce) begin
+		gamma_source_payload_data[15:8] <= ((gamma_rd_port_memory1_dat_r * (storage_4 + 1'd1)) >>> 4'd8);
+	end
+	if (gamma_ce) begin
+		gamma_source_payload_data[23:16] <= ((gamma_rd_port_memory2_dat_r * (storage_4 + 1'd1)) >>> 4'd8);
+	end
+	if (gamma_ce) begin
+		gamma_source_payload_data[31:24] <= ((gamma_rd_port_memory3_dat_r * (storage_4 + 1'd1)) >>> 4'd8);
+	end
+	if (gamma_ce) begin
+		gamma_source_payload_data[39:32] <= ((gamma_rd_port_memory4_dat_r * (storage_4 + 1'd1)) >>> 4'd8);
+	end
+	if (gamma_ce) begin
+		gamma_source_payload_data[47:40] <= ((gamma_rd_port_memory5_dat_r * (storage_4 + 1'd1)) >>> 4'd8);
+	end
+	gamma_bus_ack <= 1'd0;
+	gamma_channel_r <= gamma_channel;
+	if (((bus_cyc & bus_stb) & (~gamma_bus_ack))) begin
+		gamma_bus_ack <= 1'd1;
+	end
+	if (frame_done_clear) begin
+		frame_done_pending <= 1'd0;
+	end
+	if (frame_done_trigger) begin
+		frame_done_pending <= 1'd1;
+	end
+	stats_cycles <= (stats_cycles + 1'd1);
+	if (stats_idle) begin
+		stats_rst_cycles <= (stats_rst_cycles + 1'd1);
+	end
+	if (stats_frame_done) begin
+		stats_frames_status <= (stats_frames_status + 1'd1);
+		stats_frame_cycles_status <= (stats_cycles + 1'd1);
+		stats_rst_cycles_status <= stats_rst_cycles;
+		stats_cycles <= 1'd0;
+		stats_rst_cycles <= 1'd0;
+	end
+	if ((stats_write & (~stats_idle))) begin
+		stats_writes_status <= (stats_writes_status + 1'd1);
+	end
+	if (stats_drop) begin
+		stats_dropped_status <= (stats_dropped_status + 1'd1);
+	end
+	fb_front <= fb_front_next;
+	if (fb_swap_now) begin
+		fb_status <= 1'd0;
+	end
+	if (swap_re) begin
+		fb_status <= 1'd1;
+	end
+	fb_lane_r <= fb_lane;
+	if (fb_bus_ack) begin
+		fb_bus_ack <= ((bus_cyc_1 & bus_stb_1) & fb_burst);
+	end else begin
+		fb_bus_ack <= (bus_cyc_1 & bus_stb_1);
+	end
+	fb_led_adr <= fb_adr_next;
+	fb_pix <= fb_pix_next;
+	fb_source_valid <= 1'd1;
+	rotate_applied <= 1'd0;
+	if (rotate_busy) begin
+		rotate_rem <= rotate_rem_next;
+		rotate_k <= (rotate_k - 1'd1);
+		if ((rotate_k == 1'd0)) begin
+			rotate_busy <= 1'd0;
+			if (rotate_to_step) begin
+				rotate_step <= rotate_rem_next;
+			end else begin
+				rotate_applied <= 1'd1;
+			end
+		end
+	end else begin
+		if (rotate_pending_offset) begin
+			rotate_pending_offset <= 1'd0;
+			rotate_busy <= 1'd1;
+			rotate_to_step <= 1'd0;
+			rotate_rem <= storage_6;
+			rotate_k <= 4'd12;
+		end else begin
+			if (rotate_pending_step) begin
+				rotate_pending_step <= 1'd0;
+				rotate_busy <= 1'd1;
+				rotate_to_step <= 1'd1;
+				rotate_rem <= storage_7;
+				rotate_k <= 4'd12;
+			end
+		end
+	end
+	if (re_1) begin
+		rotate_pending_offset <= 1'd1;
+	end
+	if (re_2) begin
+		rotate_pending_step <= 1'd1;
+	end
+	if (rotate_applied) begin
+		rotate_rotation <= rotate_rem;
+		rotate_ms <= 1'd0;
+	end else begin
+		if ((rotate_done & (storage_8 != 1'd0))) begin
+			rotate_ms <= (rotate_ms + 1'd1);
+			if ((rotate_ms >= (storage_8 - 1'd1))) begin
+				rotate_ms <= 1'd0;
+				if ((rotate_rotated >= 4'd12)) begin
+					rotate_rotation <= (rotate_rotated - 4'd12);
+				end else begin
+					rotate_rotation <= rotate_rotated;
+				end
+			end
+		end
+	end
+	if (rotate_wait) begin
+		if ((~rotate_done)) begin
+			rotate_count <= (rotate_count - 1'd1);
+		end
+	end else begin
+		rotate_count <= 13'd6000;
+	end
+	seq_bus_ack <= 1'd0;
+	if (((bus_cyc_2 & bus_stb_2) & (~seq_bus_ack))) begin
+		seq_bus_ack <= 1'd1;
+	end
+	if (seq_wait) begin
+		if ((~seq_done)) begin
+			seq_count0 <= (seq_count0 - 1'd1);
+		end
+	end else begin
+		seq_count0 <= 13'd6000;
+	end
+	ringsequencer_state <= ringsequencer_next_state;
+	if (seq_active_ringsequencer_next_value_ce0) begin
+		seq_active <= seq_active_ringsequencer_next_value0;
+	end
+	if (seq_looping_ringsequencer_next_value_ce1) begin
+		seq_looping <= seq_looping_ringsequencer_next_value1;
+	end
+	if (seq_entry_ringsequencer_next_value_ce2) begin
+		seq_entry <= seq_entry_ringsequencer_next_value2;
+	end
+	if (seq_words0_ringsequencer_next_value_ce3) begin
+		seq_words0 <= seq_words0_ringsequencer_next_value3;
+	end
+	if (seq_words1_ringsequencer_next_value_ce4) begin
+		seq_words1 <= seq_words1_ringsequencer_next_value4;
+	end
+	if (seq_words2_ringsequencer_next_value_ce5) begin
+		seq_words2 <= seq_words2_ringsequencer_next_value5;
+	end
+	if (seq_color1_ringsequencer_next_value_ce6) begin
+		seq_color1 <= seq_color1_ringsequencer_next_value6;
+	end
+	if (seq_first_ringsequencer_next_value_ce7) begin
+		seq_first <= seq_first_ringsequencer_next_value7;
+	end
+	if (seq_count1_ringsequencer_next_value_ce8) begin
+		seq_count1 <= seq_count1_ringsequencer_next_value8;
+	end
+	if (seq_first2_ringsequencer_next_value_ce9) begin
+		seq_first2 <= seq_first2_ringsequencer_next_value9;
+	end
+	if (seq_count2_ringsequencer_next_value_ce10) begin
+		seq_count2 <= seq_count2_ringsequencer_next_value10;
+	end
+	if (seq_ctrl_ringsequencer_next_value_ce11) begin
+		seq_ctrl <= seq_ctrl_ringsequencer_next_value11;
+	end
+	if (seq_remaining_ringsequencer_next_value_ce12) begin
+		seq_remaining <= seq_remaining_ringsequencer_next_value12;
+	end
+	if (seq_loop_cnt_ringsequencer_next_value_ce13) begin
+		seq_loop_cnt <= seq_loop_cnt_ringsequencer_next_value13;
+	end
+end
+
+reg [7:0] lut[0:255];
+reg [7:0] memadr;
+reg [7:0] memadr_1;
+always @(posedge sys_clk) begin
+	if (gamma_wr_port_memory0_we)
+		lut[gamma_wr_port_memory0_adr] <= gamma_wr_port_memory0_dat_w;
+	memadr <= gamma_wr_port_memory0_adr;
+end
+
+always @(posedge sys_clk) begin
+	if (gamma_rd_port_memory0_re)
+		memadr_1 <= gamma_rd_port_memory0_adr;
+end
+
+assign gamma_wr_port_memory0_dat_r = lut[memadr];
+assign gamma_rd_port_memory0_dat_r = lut[memadr_1];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/lut.init", lut);
+end
+
+reg [7:0] lut_1[0:255];
+reg [7:0] memadr_2;
+reg [7:0] memadr_3;
+always @(posedge sys_clk) begin
+	if (gamma_wr_port_memory1_we)
+		lut_1[gamma_wr_port_memory1_adr] <= gamma_wr_port_memory1_dat_w;
+	memadr_2 <= gamma_wr_port_memory1_adr;
+end
+
+always @(posedge sys_clk) begin
+	if (gamma_rd_port_memory1_re)
+		memadr_3 <= gamma_rd_port_memory1_adr;
+end
+
+assign gamma_wr_port_memory1_dat_r = lut_1[memadr_2];
+assign gamma_rd_port_memory1_dat_r = lut_1[memadr_3];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/lut_1.init", lut_1);
+end
+
+reg [7:0] lut_2[0:255];
+reg [7:0] memadr_4;
+reg [7:0] memadr_5;
+always @(posedge sys_clk) begin
+	if (gamma_wr_port_memory2_we)
+		lut_2[gamma_wr_port_memory2_adr] <= gamma_wr_port_memory2_dat_w;
+	memadr_4 <= gamma_wr_port_memory2_adr;
+end
+
+always @(posedge sys_clk) begin
+	if (gamma_rd_port_memory2_re)
+		memadr_5 <= gamma_rd_port_memory2_adr;
+end
+
+assign gamma_wr_port_memory2_dat_r = lut_2[memadr_4];
+assign gamma_rd_port_memory2_dat_r = lut_2[memadr_5];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/lut_2.init", lut_2);
+end
+
+reg [7:0] lut_3[0:255];
+reg [7:0] memadr_6;
+reg [7:0] memadr_7;
+always @(posedge sys_clk) begin
+	if (gamma_wr_port_memory3_we)
+		lut_3[gamma_wr_port_memory3_adr] <= gamma_wr_port_memory3_dat_w;
+	memadr_6 <= gamma_wr_port_memory3_adr;
+end
+
+always @(posedge sys_clk) begin
+	if (gamma_rd_port_memory3_re)
+		memadr_7 <= gamma_rd_port_memory3_adr;
+end
+
+assign gamma_wr_port_memory3_dat_r = lut_3[memadr_6];
+assign gamma_rd_port_memory3_dat_r = lut_3[memadr_7];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/lut_3.init", lut_3);
+end
+
+reg [7:0] lut_4[0:255];
+reg [7:0] memadr_8;
+reg [7:0] memadr_9;
+always @(posedge sys_clk) begin
+	if (gamma_wr_port_memory4_we)
+		lut_4[gamma_wr_port_memory4_adr] <= gamma_wr_port_memory4_dat_w;
+	memadr_8 <= gamma_wr_port_memory4_adr;
+end
+
+always @(posedge sys_clk) begin
+	if (gamma_rd_port_memory4_re)
+		memadr_9 <= gamma_rd_port_memory4_adr;
+end
+
+assign gamma_wr_port_memory4_dat_r = lut_4[memadr_8];
+assign gamma_rd_port_memory4_dat_r = lut_4[memadr_9];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/lut_4.init", lut_4);
+end
+
+reg [7:0] lut_5[0:255];
+reg [7:0] memadr_10;
+reg [7:0] memadr_11;
+always @(posedge sys_clk) begin
+	if (gamma_wr_port_memory5_we)
+		lut_5[gamma_wr_port_memory5_adr] <= gamma_wr_port_memory5_dat_w;
+	memadr_10 <= gamma_wr_port_memory5_adr;
+end
+
+always @(posedge sys_clk) begin
+	if (gamma_rd_port_memory5_re)
+		memadr_11 <= gamma_rd_port_memory5_adr;
+end
+
+assign gamma_wr_port_memory5_dat_r = lut_5[memadr_10];
+assign gamma_rd_port_memory5_dat_r = lut_5[memadr_11];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/lut_5.init", lut_5);
+end
+
+reg [47:0] fb[0:27];
+reg [4:0] memadr_12;
+reg [4:0] memadr_13;
+always @(posedge sys_clk) begin
+	if (fb_fb_bus_we[0])
+		fb[fb_fb_bus_adr][7:0] <= fb_fb_bus_dat_w[7:0];
+	if (fb_fb_bus_we[1])
+		fb[fb_fb_bus_adr][15:8] <= fb_fb_bus_dat_w[15:8];
+	if (fb_fb_bus_we[2])
+		fb[fb_fb_bus_adr][23:16] <= fb_fb_bus_dat_w[23:16];
+	if (fb_fb_bus_we[3])
+		fb[fb_fb_bus_adr][31:24] <= fb_fb_bus_dat_w[31:24];
+	if (fb_fb_bus_we[4])
+		fb[fb_fb_bus_adr][39:32] <= fb_fb_bus_dat_w[39:32];
+	if (fb_fb_bus_we[5])
+		fb[fb_fb_bus_adr][47:40] <= fb_fb_bus_dat_w[47:40];
+	memadr_12 <= fb_fb_bus_adr;
+end
+
+always @(posedge sys_clk) begin
+	memadr_13 <= fb_fb_port_adr;
+end
+
+assign fb_fb_bus_dat_r = fb[memadr_12];
+assign fb_fb_port_dat_r = fb[memadr_13];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/fb.init", fb);
+end
+
+reg [31:0] mem[0:1023];
+reg [9:0] memadr_14;
+reg [9:0] memadr_15;
+always @(posedge sys_clk) begin
+	if (seq_bus_port_we)
+		mem[seq_bus_port_adr] <= seq_bus_port_dat_w;
+	memadr_14 <= seq_bus_port_adr;
+end
+
+always @(posedge sys_clk) begin
+	memadr_15 <= seq_rd_port_adr;
+end
+
+assign seq_bus_port_dat_r = mem[memadr_14];
+assign seq_rd_port_dat_r = mem[memadr_15];
+
+initial begin
+	$readmemh("/root/package/arty_a7/step16/verilator_sim/mem.init", mem);
+end
+
+endmodule
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import argparse
+
+from migen import *
+
+from litex.soc.integration.soc_core import *
+from litex.soc.integration.builder import *
+from litex.soc.integration.soc import SoCRegion
+
+from litex.soc.cores.clock import *
+
+from litex_boards.platforms import arty
+
+from ring import *
+
+# CRG ----------------------------------------------------------------------------------------------
+
+class CRG(Module):
+    def __init__(self, platform, sys_clk_freq, ring_clk_freq=None):
+        self.clock_domains.cd_sys   = ClockDomain()
+
+        # # #
+
+        clk = platform.request("clk100")
+        rst_n = platform.request("cpu_reset")
+
+        self.submodules.pll = pll = S7PLL()
+
+        self.comb += pll.reset.eq(~rst_n)
+
+        pll.register_clkin(clk, 100e6)
+        pll.create_clkout(self.cd_sys, sys_clk_freq)
+
+        # Symbol clock of the LED ring encoder
+        if ring_clk_freq is not None:
+            self.clock_domains.cd_ring = ClockDomain()
+            pll.create_clkout(self.cd_ring, ring_clk_freq)
+
+        platform.add_period_constraint(clk, 1e9/100e6)
+
+# BaseSoC ------------------------------------------------------------------------------------------
+
+class BaseSoC(SoCCore):
+    def __init__(self, sys_clk_freq=int(100e6), mode=mode.DOUBLE, nleds=12, lanes=1, chip="WS2812B", bpp=24, with_gamma=False,
+                 with_symbol_encoder=False, with_fade=False, with_timing_csr=True, **kwargs):
+
+        platform = arty.Platform(variant="a7-35", toolchain="vivado")
+
+        SoCCore.__init__(self, platform, sys_clk_freq,
+            ident         = "LiteX SoC on Arty A7-35",
+            **kwargs
+        )
+
+        # The symbol encoder picks the symbols of a bit from the timings of
+        # the chip. At 12MHz: 3 symbols for the WS2812B, 4 for the SK6812
+        # and 5 for the WS2811 (it fails to build when a chip can't be
+        # driven within 150ns of its datasheet).
+        ring_clk_freq = 12e6 if with_symbol_encoder else None
+
+        self.submodules.crg = CRG(platform, sys_clk_freq, ring_clk_freq)
+
+        # Here we add the data out pins of the LED rings.
+        # The first one is always B7, the other lanes are on PMOD JB.
+        from litex.build.generic_platform import Pins, IOStandard
+        pins = ["B7"] + ["pmodb:{}".format(i) for i in range(1, lanes)]
+        platform.add_extension([("do", 0, Pins(" ".join(pins)), IOStandard("LVCMOS33"))])
+
+        led = RingControl(platform.request("do"), mode, nleds, sys_clk_freq, lanes, chip, bpp=bpp,
+                          with_gamma=with_gamma, symbol_clk_freq=ring_clk_freq, with_fade=with_fade,
+                          with_timing_csr=with_timing_csr)
+        self.submodules.ledring = led
+        self.add_csr("ledring")
+
+        # Frame done interrupt
+        self.irq.add("ledring", use_loc_if_exists=True)
+
+        # For the firmware
+        self.add_constant("LEDRING_NLEDS", nleds)
+        self.add_constant("LEDRING_LANES", lanes)
+        self.add_constant("LEDRING_BPP", bpp)
+
+        # The framebuffer is mapped on the main bus: one 32-bit word per LED
+        # (two in RGB565), one power of 2 sized region per lane.
+        stride = led.fb.stride
+        self.bus.add_slave(name="ledring_fb", slave=self.ledring.bus, region=SoCRegion(
+             size   = 4*stride*2**log2_int(lanes, need_pow2=False),
+             cached = False
+         ))
+        self.add_constant("LEDRING_STRIDE", stride)
+
+        # Keyframes of the animation sequencer: 256 entries of 4 words
+        self.bus.add_slave(name="ledring_seq", slave=self.ledring.seq_bus, region=SoCRegion(
+             size   = 4*4*256,
+             cached = False
+         ))
+
+        # Gamma lookup tables: 256 words per color channel
+        if with_gamma:
+            self.bus.add_slave(name="ledring_lut", slave=self.ledring.lut_bus, region=SoCRegion(
+                 size   = 4*256*4,
+                 cached = False
+             ))
+
+# Build --------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX SoC on Arty A7-35")
+
+    parser.add_argument("--build",       action="store_true", help="Build bitstream")
+    parser.add_argument("--mode-single", action="store_true", help="Build bitstream")
+    parser.add_argument("--load",        action="store_true", help="Load bitstream")
+    parser.add_argument("--flash",       action="store_true", help="Flash Bitstream")
+    parser.add_argument("--sys-clk-freq",default=100e6,       help="System clock frequency (default: 100MHz)")
+    parser.add_argument("--nleds",       default=12,          help="Number of chained LEDs per lane (default: 12)")
+    parser.add_argument("--lanes",       default=1,           help="Number of data out pins (default: 1)")
+    parser.add_argument("--bpp",         default=24,          help="Bits per pixel: 16 (RGB565), 24 (GRB) or 32 (GRBW) (default: 24)")
+    parser.add_argument("--with-gamma",  action="store_true", help="Add the gamma/brightness correction stage")
+    parser.add_argument("--with-fade",   action="store_true", help="Add the cross-fade stage")
+    parser.add_argument("--with-symbol-encoder", action="store_true", help="Send bits as symbols from a 12MHz clock")
+    parser.add_argument("--chip",        default="WS2812B",   help="Default LED timings: " + ", ".join(chips) + " (default: WS2812B)")
+    parser.add_argument("--without-timing-csr", action="store_true", help="LED timings of --chip fixed at build time (smaller)")
+
+    builder_args(parser)
+
+    soc_core_args(parser)
+
+    args = parser.parse_args()
+
+    m = mode.DOUBLE
+    if args.mode_single:
+        m = mode.SINGLE
+
+    soc = BaseSoC(
+        sys_clk_freq      = int(float(args.sys_clk_freq)),
+        mode              = m,
+        nleds             = int(args.nleds),
+        lanes             = int(args.lanes),
+        chip              = args.chip,
+        bpp               = int(args.bpp),
+        with_gamma        = args.with_gamma,
+        with_symbol_encoder = args.with_symbol_encoder,
+        with_fade         = args.with_fade,
+        with_timing_csr   = not args.without_timing_csr,
+        **soc_core_argdict(args)
+    )
+
+    builder = Builder(soc, **builder_argdict(args))
+
+    builder.build(run=args.build)
+
+    if args.load:
+        prog = soc.platform.create_programmer()
+        prog.load_bitstream(os.path.join(builder.gateware_dir, soc.build_name + ".bit"))
+        exit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import argparse
+
+from migen import *
+
+from litex.soc.integration.soc_core import *
+from litex.soc.integration.builder import *
+
+from litex.soc.cores.clock import *
+
+from litex_boards.platforms import arty
+
+# For the DDR3 controller
+from litedram.modules import MT41K128M16
+from litedram.phy import s7ddrphy
+
+from ring import *
+
+# CRG ----------------------------------------------------------------------------------------------
+
+class _CRG(Module):
+    def __init__(self, platform, sys_clk_freq):
+        self.rst = Signal()
+        self.clock_domains.cd_sys       = ClockDomain()
+        self.clock_domains.cd_sys4x     = ClockDomain(reset_less=True)
+        self.clock_domains.cd_sys4x_dqs = ClockDomain(reset_less=True)
+        self.clock_domains.cd_idelay    = ClockDomain()
+
+        # # #
+
+        self.submodules.pll = pll = S7PLL(speedgrade=-1)
+        self.comb += pll.reset.eq(~platform.request("cpu_reset") | self.rst)
+        pll.register_clkin(platform.request("clk100"), 100e6)
+        pll.create_clkout(self.cd_sys,       sys_clk_freq)
+        pll.create_clkout(self.cd_sys4x,     4*sys_clk_freq)
+        pll.create_clkout(self.cd_sys4x_dqs, 4*sys_clk_freq, phase=90)
+        pll.create_clkout(self.cd_idelay,    200e6)
+
+        # Ignore sys_clk to pll.clkin path created by SoC's rst.
+        platform.add_false_path_constraints(self.cd_sys.clk, pll.clkin)
+
+        self.submodules.idelayctrl = S7IDELAYCTRL(self.cd_idelay)
+
+# BaseSoC ------------------------------------------------------------------------------------------
+
+class BaseSoC(SoCCore):
+    def __init__(self, sys_clk_freq=int(100e6), nleds=12, lanes=1, chip="WS2812B", bpp=24,
+                 with_timing_csr=True, **kwargs):
+
+        platform = arty.Platform(variant="a7-35", toolchain="vivado")
+
+        SoCCore.__init__(self, platform, sys_clk_freq,
+            ident         = "LiteX SoC on Arty A7-35",
+            **kwargs
+        )
+
+        self.submodules.crg = _CRG(platform, sys_clk_freq)
+
+        # DDR3 SDRAM -------------------------------------------------------------------------------
+        if not self.integrated_main_ram_size:
+            self.submodules.ddrphy = s7ddrphy.A7DDRPHY(platform.request("ddram"),
+                memtype        = "DDR3",
+                nphases        = 4,
+                sys_clk_freq   = sys_clk_freq)
+            self.add_sdram("sdram",
+                phy           = self.ddrphy,
+                module        = MT41K128M16(sys_clk_freq, "1:4"),
+                l2_cache_size = kwargs.get("l2_size", 8192)
+            )
+
+        # Here we add the data out pins of the LED rings.
+        # The first one is always B7, the other lanes are on PMOD JB.
+        from litex.build.generic_platform import Pins, IOStandard
+        pins = ["B7"] + ["pmodb:{}".format(i) for i in range(1, lanes)]
+        platform.add_extension([("do", 0, Pins(" ".join(pins)), IOStandard("LVCMOS33"))])
+
+        # No framebuffer here: frames are read from main memory by the
+        # LED ring controller, it is a bus master.
+        led = RingControl(platform.request("do"), mode.DOUBLE, nleds, sys_clk_freq, lanes, chip, bpp=bpp,
+                          with_framebuffer=False, with_dma=True, with_timing_csr=with_timing_csr)
+        self.submodules.ledring = led
+        self.add_csr("ledring")
+
+        self.bus.add_master(name="ledring", master=self.ledring.dma_bus)
+
+        # Frame done interrupt
+        self.irq.add("ledring", use_loc_if_exists=True)
+
+        # For the firmware
+        self.add_constant("LEDRING_NLEDS", nleds)
+        self.add_constant("LEDRING_LANES", lanes)
+        self.add_constant("LEDRING_BPP", bpp)
+
+# Build --------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX SoC on Arty A7-35")
+
+    parser.add_argument("--build",       action="store_true", help="Build bitstream")
+    parser.add_argument("--load",        action="store_true", help="Load bitstream")
+    parser.add_argument("--flash",       action="store_true", help="Flash Bitstream")
+    parser.add_argument("--sys-clk-freq",default=100e6,       help="System clock frequency (default: 100MHz)")
+    parser.add_argument("--nleds",       default=12,          help="Number of chained LEDs per lane (default: 12)")
+    parser.add_argument("--lanes",       default=1,           help="Number of data out pins (default: 1)")
+    parser.add_argument("--bpp",         default=24,          help="Bits per pixel: 16 (RGB565), 24 (GRB) or 32 (GRBW) (default: 24)")
+    parser.add_argument("--chip",        default="WS2812B",   help="Default LED timings: " + ", ".join(chips) + " (default: WS2812B)")
+    parser.add_argument("--without-timing-csr", action="store_true", help="LED timings of --chip fixed at build time (smaller)")
+
+    builder_args(parser)
+
+    soc_core_args(parser)
+
+    args = parser.parse_args()
+
+    soc = BaseSoC(
+        sys_clk_freq      = int(float(args.sys_clk_freq)),
+        nleds             = int(args.nleds),
+        lanes             = int(args.lanes),
+        chip              = args.chip,
+        bpp               = int(args.bpp),
+        with_timing_csr   = not args.without_timing_csr,
+        **soc_core_argdict(args)
+    )
+
+    builder = Builder(soc, **builder_argdict(args))
+
+    builder.build(run=args.build)
+
+    if args.load:
+        prog = soc.platform.create_programmer()
+        prog.load_bitstream(os.path.join(builder.gateware_dir, soc.build_name + ".bit"))
+        exit()
+
+if __name__ == "__main__":
+    main()
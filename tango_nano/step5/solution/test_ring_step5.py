@@ -7,6 +7,10 @@ from migen.genlib.misc import WaitTimer
 from platform_tango import *
 from ring import *
 
+# Fast-forward through the timers in simulation
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "tools"))
+from fastforward import FastForward
+
 # CRG ----------------------------------------------------------------------------------------------
 
 class CRG(Module):
@@ -59,8 +63,10 @@ def main():
 
     if "sim" in sys.argv[1: ]:
         do = Signal()
-        ring = RingControl(do, 0x408020, 12, 24e6)
-        run_simulation(ring, test(ring), clocks={"sys": 1e9/24e6}, vcd_name="sim.vcd")
+        ring = RingControl(do, style, 0x408020, 12, 24e6)
+        ff = FastForward(ring)
+        run_simulation(ring, [test(ring), ff.generator()], clocks={"sys": 1e9/24e6}, vcd_name="sim.vcd")
+        print("{} cycles, {} skipped by the fast-forward".format(ff.cycle, ff.skipped))
         exit()
 
     if "dual" in sys.argv[1: ]:
@@ -101,23 +101,27 @@ class RingSerialCtrl(Module):
         t1h  = int(0.80e-6 * sys_clk_freq)
         t1l  = int(0.45e-6 * sys_clk_freq)
 
-        # Timers.
-        t0h_timer = WaitTimer(t0h)
-        t0l_timer = WaitTimer(t0l)
-        self.submodules += t0h_timer, t0l_timer
-
-        t1h_timer = WaitTimer(t1h)
-        t1l_timer = WaitTimer(t1l)
-        self.submodules += t1h_timer, t1l_timer
-
-        trst_timer = WaitTimer(trst)
-        self.submodules += trst_timer
+        # One down-counter for all the timings: five WaitTimers, each with
+        # its own counter and comparator, don't fit well in the GW1N-1.
+        # It is loaded when we enter a state and 'timer_done' is set when
+        # it reaches 0: a state lasts (value loaded + 1) cycles.
+        timer       = Signal(bits_for(trst), reset=trst)
+        timer_load  = Signal()
+        timer_value = Signal(bits_for(trst))
+        timer_done  = Signal()
+        self.comb += timer_done.eq(timer == 0)
+        self.sync += [
+            If(timer_load,
+                timer.eq(timer_value)
+            ).Elif(~timer_done,
+                timer.eq(timer - 1)
+            )
+        ]
 
         # FSM
         self.submodules.fsm = fsm = FSM(reset_state="RST")
         fsm.act("RST",
-            trst_timer.wait.eq(1),
-            If(trst_timer.done,
+            If(timer_done,
                 NextValue(led_count, 0),
                 NextState("LED-SHIFT"),
                 NextValue(led, conf.leds),
@@ -133,32 +137,41 @@ class RingSerialCtrl(Module):
             ),
             NextValue(led, led << 1),
             If(led_count == (nleds),
+                timer_load.eq(1),
+                timer_value.eq(trst),
                 NextState("RST")
             ).Else(
                 NextState("BIT-TEST")
             )
         )
         fsm.act("BIT-TEST",
+            timer_load.eq(1),
             If(data[-1] == 0,
+                timer_value.eq(t0h - 1),
                 NextState("ZERO-SEND"),
-            ),
-            If(data[-1] == 1,
+            ).Else(
+                timer_value.eq(t1h - 1),
                 NextState("ONE-SEND"),
             ),
         )
         fsm.act("ZERO-SEND",
-            t0h_timer.wait.eq(1),
-            t0l_timer.wait.eq(t0h_timer.done),
-            self.do.eq(~t0h_timer.done),
-            If(t0l_timer.done,
-                NextState("BIT-SHIFT")
+            self.do.eq(1),
+            If(timer_done,
+                timer_load.eq(1),
+                timer_value.eq(t0l),
+                NextState("BIT-LOW")
             )
         )
         fsm.act("ONE-SEND",
-            t1h_timer.wait.eq(1),
-            t1l_timer.wait.eq(t1h_timer.done),
-            self.do.eq(~t1h_timer.done),
-            If(t1l_timer.done,
+            self.do.eq(1),
+            If(timer_done,
+                timer_load.eq(1),
+                timer_value.eq(t1l),
+                NextState("BIT-LOW")
+            )
+        )
+        fsm.act("BIT-LOW",
+            If(timer_done,
                 NextState("BIT-SHIFT")
             )
         )
@@ -0,0 +1,121 @@
+#
+# Fast-forward through the WaitTimer periods of a simulation.
+#
+# Most of the cycles of a ring simulation are spent waiting: the reset gap
+# (trst_timer) or the 50ms between two frames (ring_timer), where only the
+# counter of a WaitTimer changes. FastForward sees it and jumps ahead by
+# writing the counters, leaving a few cycles before the timers expire.
+#
+#    ff      = FastForward(dut)
+#    decoder = RingDecoder(dut.do, sys_clk_freq, fast_forward=ff)
+#    run_simulation(dut, [test(dut), decoder.generator(), ff.generator()])
+#
+#    print(ff.cycle, ff.skipped)     # cycles of the design, cycles not simulated
+#
+# It only jumps when the state of the design (all the registers but the
+# counting timers, and its inputs) was the same for two cycles: the next
+# cycles would be the same until a timer expires. Testbenches only see
+# fewer cycles: they must wait for the design, not count cycles (or use
+# ff.cycle, or ff.skips). The VCD file is not stretched either.
+#
+# With several clock domains the design is only fast-forwarded when the
+# other domains have no registers.
+#
+
+from migen import passive
+from migen.genlib.misc import WaitTimer
+from migen.fhdl.structure import _Assign, _Operator
+from migen.fhdl.tools import list_signals, list_targets
+
+# -----------------------------------------------------------------------
+# - The WaitTimers of a design, with their counter
+# -----------------------------------------------------------------------
+def wait_timers(module):
+    timers = [module] if isinstance(module, WaitTimer) else []
+    for name, submodule in module._submodules:
+        timers += wait_timers(submodule)
+    return timers
+
+# The counter is the signal compared to 0 for done
+def timer_count(timer):
+    for statement in timer._fragment.comb:
+        if (isinstance(statement, _Assign) and statement.l is timer.done and
+            isinstance(statement.r, _Operator)):
+            return statement.r.operands[0]
+    raise ValueError("No counter found in {}".format(timer))
+
+class FastForward:
+    def __init__(self, dut, timers=None, min_skip=100, margin=2, domain="sys"):
+        self.dut      = dut
+        self.timers   = timers
+        # Jumps are at least min_skip cycles, the counters are left at
+        # margin cycles of the end at least.
+        self.min_skip = min_skip
+        self.margin   = margin
+        self.domain   = domain
+
+        # Results:
+        #  cycle:   cycles of the design, simulated or skipped
+        #  skipped: cycles skipped
+        #  skips:   (simulated cycle, cycles skipped after it) of each jump
+        self.cycle    = 0
+        self.skipped  = 0
+        self.skips    = []
+
+    # The registers of the design (but the counters) and its inputs, from
+    # the fragment of the simulator (elaborated when the simulation starts)
+    def _elaborate(self):
+        fragment = self.dut._fragment
+        timers   = self.timers if self.timers is not None else wait_timers(self.dut)
+        counts   = [timer_count(timer) for timer in timers]
+        sync     = fragment.sync.get(self.domain, [])
+        others   = [d for d in fragment.sync if d != self.domain and fragment.sync[d]]
+        if others:
+            return [], []
+        timers   = [(timer, count) for timer, count in zip(timers, counts)
+                    if count in list_targets(sync)]
+        targets  = list_targets(sync) | list_targets(fragment.comb)
+        clocks   = {cd.clk for cd in fragment.clock_domains} | {cd.rst for cd in fragment.clock_domains}
+        inputs   = list_signals(fragment) - targets - clocks
+        state    = (list_targets(sync) | inputs) - {count for timer, count in timers}
+        return timers, sorted(state, key=lambda x: x.duid)
+
+    @passive
+    def generator(self):
+        timers, state = self._elaborate()
+        waits  = [timer.wait for timer, count in timers]
+        counts = [count for timer, count in timers]
+        last   = None
+        hold   = 0
+        while True:
+            if hold:
+                hold -= 1
+                self.cycle += 1
+                yield
+                continue
+            wait, count = (yield [waits, counts])
+            # Timers counting down, and for long enough to skip something
+            skip = [c for w, c in zip(wait, count) if w and c]
+            skip = min(skip) - 1 - self.margin if skip else 0
+            if skip >= self.min_skip:
+                snapshot = ((yield state), wait)
+                if last is None:
+                    last = (snapshot, count)
+                elif snapshot == last[0] and all(
+                     c == l - 1 for w, c, l in zip(wait, count, last[1]) if w and c):
+                    for w, c, signal in zip(wait, count, counts):
+                        if w and c:
+                            yield signal.eq(c - 1 - skip)
+                    self.skips.append((self.cycle - self.skipped, skip))
+                    self.skipped += skip
+                    self.cycle   += skip
+                    last = None
+                else:
+                    # Something else is going on: look again later
+                    hold = self.min_skip//4
+                    last = None
+            else:
+                hold = self.min_skip//4
+                last = None
+            self.cycle += 1
+            yield
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+#
+# Regression runner for all the simulations of the workshop.
+#
+# Every script calling run_simulation is found and run in its own process,
+# from a temporary working directory (so sim.vcd files don't collide).
+# Scripts that build a bitstream unless "sim" is given get "sim" (and the
+# options they check before simulating, like "pipe", get one more run).
+#
+#    ./tools/regress.py                      # everything
+#    ./tools/regress.py step16 solution -j 8 # paths containing step16 or solution
+#    ./tools/regress.py -x step16 --json report.json
+#    ./tools/regress.py --solutions          # not the exercises
+#
+# A run fails if it exits with an error or if it prints "ERROR" or a
+# non-zero "N error(s)". The simulated cycles are counted by hooking the
+# migen simulator clock.
+#
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# -----------------------------------------------------------------------
+# - Runs in the child process: counts the clock edges of each domain,
+# - runs the script and writes the counts to $REGRESS_STATS on exit.
+# -----------------------------------------------------------------------
+bootstrap = """
+import os, sys, json, atexit, runpy
+from migen.sim import core
+
+cycles = {}
+tick   = core.TimeManager.tick
+def counting_tick(self):
+    dt, rising, falling = tick(self)
+    for cd in rising:
+        cycles[cd] = cycles.get(cd, 0) + 1
+    return dt, rising, falling
+core.TimeManager.tick = counting_tick
+
+def save():
+    with open(os.environ["REGRESS_STATS"], "w") as f:
+        json.dump(cycles, f)
+atexit.register(save)
+
+script   = sys.argv[1]
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(script))
+runpy.run_path(script, run_name="__main__")
+"""
+
+# -----------------------------------------------------------------------
+# - Finding the testbenches
+# -----------------------------------------------------------------------
+def find_scripts(top):
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith((".", "__")) and d != "tools")
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if name.endswith(".py") and "run_simulation(" in open(path).read():
+                yield path
+
+# Returns the command line arguments of each run of a script
+def runs_of(path):
+    source = open(path).read()
+    checks = re.findall(r'"(\w+)" in sys.argv', source)
+    if "sim" in checks:
+        # Options checked before "sim" change what is simulated
+        options = checks[:checks.index("sim")]
+        return [["sim"]] + [[option, "sim"] for option in options if option != "load"]
+    if re.search(r"\.build\(", source) and "def main" in source:
+        # Would start a bitstream build
+        return []
+    return [[]]
+
+# -----------------------------------------------------------------------
+# - One run
+# -----------------------------------------------------------------------
+error_re = re.compile(r"\bERROR\b|\b[1-9][0-9]* error\(s\)")
+
+def run(path, args, timeout, keep):
+    workdir = tempfile.mkdtemp(prefix="regress_")
+    stats   = os.path.join(workdir, "stats.json")
+    env     = dict(os.environ, REGRESS_STATS=stats, PYTHONDONTWRITEBYTECODE="1")
+    result  = {
+        "script":  os.path.relpath(path, root),
+        "args":    args,
+        "workdir": workdir if keep else None,
+    }
+
+    start = time.time()
+    try:
+        p = subprocess.run([sys.executable, "-c", bootstrap, path] + args, cwd=workdir, env=env,
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        output = p.stdout.decode(errors="replace")
+        if p.returncode != 0:
+            status = "FAIL"
+        elif error_re.search(output):
+            status = "FAIL"
+        else:
+            status = "PASS"
+    except subprocess.TimeoutExpired as e:
+        output = (e.stdout or b"").decode(errors="replace")
+        status = "TIMEOUT"
+    result["wall_time"] = time.time() - start
+
+    cycles = {}
+    if os.path.exists(stats):
+        cycles = json.load(open(stats))
+    result["status"] = status
+    result["cycles"] = cycles
+    result["tail"]   = output.splitlines()[-20:] if status != "PASS" else []
+
+    if not keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+# -----------------------------------------------------------------------
+# - Main
+# -----------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Runs all the simulations of the workshop")
+    parser.add_argument("filters",   nargs="*",                  help="Only run scripts whose path contains one of these")
+    parser.add_argument("-x", "--exclude", action="append", default=[], help="Skip scripts whose path contains this")
+    parser.add_argument("-j", "--jobs", default=os.cpu_count(),  help="Number of simulations run at once (default: number of CPUs)")
+    parser.add_argument("--timeout", default=3600,               help="Timeout of a simulation in seconds (default: 3600)")
+    parser.add_argument("--json",    default=None,               help="Write the report to this file")
+    parser.add_argument("--keep",    action="store_true",        help="Keep the working directories (and VCD files)")
+    parser.add_argument("--solutions", action="store_true",      help="Skip the exercises that have a solution (they are incomplete)")
+    parser.add_argument("--list",    action="store_true",        help="Only list the runs")
+    args = parser.parse_args()
+
+    jobs = []
+    for path in find_scripts(root):
+        rel = os.path.relpath(path, root)
+        if args.filters and not any(f in rel for f in args.filters):
+            continue
+        if any(x in rel for x in args.exclude):
+            continue
+        if args.solutions and os.path.exists(os.path.join(os.path.dirname(path), "solution", os.path.basename(path))):
+            continue
+        for run_args in runs_of(path):
+            jobs.append((path, run_args))
+
+    if args.list:
+        for path, run_args in jobs:
+            print(" ".join([os.path.relpath(path, root)] + run_args))
+        return
+
+    print("{} simulation(s), {} at once".format(len(jobs), args.jobs))
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=int(args.jobs)) as pool:
+        futures = [pool.submit(run, path, run_args, float(args.timeout), args.keep)
+                   for path, run_args in jobs]
+        results = []
+        for future in futures:
+            r = future.result()
+            results.append(r)
+            cycles = r["cycles"].get("sys", sum(r["cycles"].values()))
+            print("{:<7} {:<55} {:>10} cycles {:>8.1f}s".format(
+                r["status"], " ".join([r["script"]] + r["args"]), cycles, r["wall_time"]))
+            for line in r["tail"]:
+                print("        | " + line)
+    wall_time = time.time() - start
+
+    failed = [r for r in results if r["status"] != "PASS"]
+    print("{} passed, {} failed, {:.1f}s".format(len(results) - len(failed), len(failed), wall_time))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"wall_time": wall_time, "results": results}, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
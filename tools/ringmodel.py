@@ -0,0 +1,179 @@
+#
+# NumPy golden model of the LED ring serializer (RingSerialCtrl).
+#
+# encode() gives the do waveform, one sample per sys_clk cycle, that the
+# serializer sends for some frames. decode() does the opposite on a trace
+# with run-length operations: no Python loop over the cycles, so millions
+# of cycles are checked in milliseconds. Traces come from a simulation
+# (RingDecoder(..., record=True).trace()) or from a VCD file (read_vcd()).
+#
+#    expected = encode(frames, sys_clk_freq, time_scale=4)
+#    trace    = decoder.trace()
+#    assert compare(trace, expected) is None
+#    result   = decode(trace, sys_clk_freq, lanes=2, time_scale=4)
+#    print(result.frames[0][1][3], result.violations)
+#
+
+import gzip
+import collections
+
+import numpy as np
+
+from ringsim import chips, RingLimits
+
+# -----------------------------------------------------------------------
+# - Encoder
+# -----------------------------------------------------------------------
+
+# frames[n][lane][led] are the pixels (as sent: GRB or GRBW, MSB first).
+# The waveform starts at reset like the serializer: a reset gap, then each
+# frame followed by a reset gap. Each LED starts with one low cycle (the
+# LED-SHIFT state), each bit is t0h high, then the bit for t1h - t0h, then
+# low until tbit. The source is never late.
+def encode(frames, sys_clk_freq, bits=24, chip="WS2812B", time_scale=1):
+    t0h, t1h, tbit, trst = [int(t*sys_clk_freq/time_scale) for t in chips[chip]]
+
+    pixels  = np.asarray(frames, dtype=np.int64)
+    nframes, lanes, nleds = pixels.shape
+
+    # (frame, lane, led, bit) then (frame, lane, led, bit, cycle)
+    values = (pixels[..., None] >> np.arange(bits - 1, -1, -1)) & 1
+    t      = np.arange(tbit)
+    wave   = (t < t0h) | (values[..., None].astype(bool) & (t >= t0h) & (t < t1h))
+
+    # One low cycle before each LED, the reset gap after each frame
+    wave = wave.reshape(nframes, lanes, nleds, bits*tbit)
+    wave = np.pad(wave, ((0, 0), (0, 0), (0, 0), (1, 0)))
+    wave = wave.reshape(nframes, lanes, nleds*(bits*tbit + 1))
+    wave = np.pad(wave, ((0, 0), (0, 0), (0, trst)))
+    wave = wave.transpose(1, 0, 2).reshape(lanes, -1)
+    wave = np.pad(wave, ((0, 0), (trst, 0)))
+
+    do = np.zeros(wave.shape[1], dtype=np.uint32)
+    for l in range(lanes):
+        do |= wave[l].astype(np.uint32) << l
+    return do
+
+# Index of the first cycle where the traces differ, None if they match
+# (on the length of the shortest one).
+def compare(trace, expected):
+    n = min(len(trace), len(expected))
+    diff = np.flatnonzero(np.asarray(trace[:n]) != np.asarray(expected[:n]))
+    return int(diff[0]) if len(diff) else None
+
+# -----------------------------------------------------------------------
+# - Decoder: same results as RingDecoder, from a whole trace
+# -----------------------------------------------------------------------
+Decoded = collections.namedtuple("Decoded", "frames frame_start frame_end violations")
+
+# Pulses after the last complete frame are ignored.
+def _decode_lane(x, limits, bits):
+    # Rising edges at r, falling edges at f: pulse i is high from r[i] to f[i]
+    edges = np.diff(np.concatenate(([0], x, [0])).astype(np.int8))
+    r     = np.flatnonzero(edges == 1)
+    f     = np.flatnonzero(edges == -1)
+    if len(r) and f[-1] == len(x):
+        # Still high at the end of the trace
+        r, f = r[:-1], f[:-1]
+    highs = f - r
+    lows  = r[1:] - f[:-1]
+
+    # A frame ends when do stays low for 'reset' cycles
+    first = np.concatenate(([0], np.flatnonzero(lows >= limits.reset) + 1))
+    last  = np.concatenate((first[1:], [len(r)]))
+    if len(r) and len(x) - f[-1] <= limits.reset:
+        first, last = first[:-1], last[:-1]
+    if not len(r):
+        first, last = first[:0], last[:0]
+
+    violations = []
+    def report(cycles, what, lengths):
+        violations.extend(zip(cycles.tolist(), [what]*len(cycles), lengths.tolist()))
+
+    bit = highs > limits.threshold
+    bad = np.where(bit, (highs < limits.t1h[0]) | (highs > limits.t1h[1]),
+                        (highs < limits.t0h[0]) | (highs > limits.t0h[1]))
+    bad[last[-1] if len(last) else 0:] = False
+    report(f[bad & ~bit], "T0H", limits.ns(highs[bad & ~bit]))
+    report(f[bad & bit],  "T1H", limits.ns(highs[bad & bit]))
+
+    # Lows inside a frame (not the one before its first bit)
+    inside = np.ones(len(lows), dtype=bool)
+    inside[first[1:] - 1] = False
+    if len(last):
+        inside[last[-1] - 1:] = False
+    short  = inside & (lows < limits.tl_min)
+    long   = inside & (lows > limits.max_low)
+    report(r[1:][short], "TL",  limits.ns(lows[short]))
+    report(r[1:][long],  "RES", limits.ns(lows[long]))
+
+    # Pixels, and the bits left over in each frame
+    weights = 1 << np.arange(bits - 1, -1, -1, dtype=np.int64)
+    frames  = []
+    extra   = []
+    for a, b in zip(first, last):
+        n = (b - a)//bits
+        frames.append((bit[a:a + n*bits].reshape(n, bits) @ weights).tolist())
+        extra.append(int((b - a) % bits))
+    return frames, r[first], f[last - 1], violations, extra
+
+def decode(do, sys_clk_freq, lanes=1, bits=24, chip="WS2812B", tolerance=150e-9, max_low=5e-6,
+           time_scale=1):
+    limits = RingLimits(sys_clk_freq, chip, tolerance, max_low, time_scale)
+    do     = np.asarray(do)
+
+    results = [_decode_lane((do >> l) & 1, limits, bits) for l in range(lanes)]
+    nframes = min(len(result[0]) for result in results)
+
+    frames     = [[results[l][0][n] for l in range(lanes)] for n in range(nframes)]
+    start      = [int(min(results[l][1][n] for l in range(lanes))) for n in range(nframes)]
+    end        = [int(max(results[l][2][n] for l in range(lanes))) for n in range(nframes)]
+    violations = [(cycle, l, what, length)
+                  for l in range(lanes) for cycle, what, length in results[l][3]]
+    # Incomplete pixels are seen when the frame ends, on all the lanes
+    violations += [(end[n] + limits.reset, l, "PIXEL", results[l][4][n])
+                   for n in range(nframes) for l in range(lanes) if results[l][4][n]]
+    return Decoded(frames, start, end, sorted(violations))
+
+# -----------------------------------------------------------------------
+# - VCD files: the value of a signal before each rising edge of the clock,
+# - like a generator reads it (.vcd.gz files too).
+# -----------------------------------------------------------------------
+def read_vcd(filename, signal="do", clock="sys_clk"):
+    codes  = {}
+    scope  = []
+    times  = {signal: [], clock: []}
+    values = {signal: [], clock: []}
+    now    = 0.0
+    opener = gzip.open if filename.endswith(".gz") else open
+    with opener(filename, "rt") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            elif line.startswith("$scope"):
+                scope.append(line.split()[2])
+            elif line.startswith("$upscope"):
+                scope.pop()
+            elif line.startswith("$var"):
+                fields = line.split()
+                name   = fields[4]
+                for wanted in (signal, clock):
+                    if name == wanted or ".".join(scope + [name]).endswith("." + wanted):
+                        codes.setdefault(fields[3], wanted)
+            elif line.startswith("#"):
+                now = float(line[1:])
+            elif line.startswith("b"):
+                value, code = line[1:].split()
+                if code in codes:
+                    times[codes[code]].append(now)
+                    values[codes[code]].append(int(value.replace("x", "0").replace("z", "0"), 2))
+            elif line[0] in "01xz" and line[1:].strip() in codes:
+                code = line[1:].strip()
+                times[codes[code]].append(now)
+                values[codes[code]].append(int(line[0]) if line[0] in "01" else 0)
+
+    clk_times  = np.array(times[clock])
+    clk_values = np.array(values[clock])
+    rising     = clk_times[1:][(clk_values[1:] == 1) & (clk_values[:-1] == 0)]
+    index      = np.searchsorted(np.array(times[signal]), rising, side="left") - 1
+    return np.array(values[signal], dtype=np.uint32)[np.maximum(index, 0)]
@@ -0,0 +1,202 @@
+#
+# Simulation helpers for the LED ring controllers.
+#
+# RingDecoder watches the data out pin(s) of a ring during run_simulation
+# and turns the pulses into frames of pixels, like the LEDs would do. It
+# also checks the pulse timings against the chip datasheet.
+#
+#    decoder = RingDecoder(dut.do, sys_clk_freq, lanes=2)
+#
+#    def test(dut):
+#        frame = (yield from decoder.next_frame())
+#        assert frame[0][3] == 0x123456     # lane 0, LED 3
+#
+#    run_simulation(dut, [test(dut), decoder.generator()])
+#
+#    print(decoder.violations, decoder.frame_rate())
+#
+# With a FastForward (tools/fastforward.py), give it to the decoder: the
+# cycles skipped are added to its cycle count (and to its trace, do does
+# not change while they are skipped).
+#
+
+from migen import passive
+
+# Timings of the chips, in seconds: (t0h, t1h, tbit, trst).
+# Same values as the chips table of the ring controllers.
+chips = {
+    "WS2812B": (0.40e-6, 0.80e-6, 1.25e-6, 75e-6),
+    "SK6812":  (0.30e-6, 0.60e-6, 1.25e-6, 80e-6),
+    "WS2811":  (0.50e-6, 1.20e-6, 2.50e-6, 280e-6),
+}
+
+# What the decoders accept, in sys_clk cycles
+class RingLimits:
+    def __init__(self, sys_clk_freq, chip="WS2812B", tolerance=150e-9, max_low=5e-6, time_scale=1):
+        self.sys_clk_freq = sys_clk_freq
+        self.time_scale   = time_scale
+
+        # With the time_scale of the ring controller, durations are
+        # time_scale times shorter.
+        t0h, t1h, tbit, trst = chips[chip]
+        cycles = lambda t: t*sys_clk_freq/time_scale
+        self.threshold = cycles((t0h + t1h)/2)
+        self.t0h       = (cycles(t0h - tolerance), cycles(t0h + tolerance))
+        self.t1h       = (cycles(t1h - tolerance), cycles(t1h + tolerance))
+        self.tl_min    = cycles(tbit - t1h - tolerance)
+        # Longer than max_low, the LEDs may take it as a reset. A frame
+        # ends when do stays low for 10 bits.
+        self.max_low   = cycles(max_low)
+        self.reset     = int(cycles(10*tbit))
+
+    # Length in ns as seen by the LEDs
+    def ns(self, cycles):
+        return 1e9*cycles*self.time_scale/self.sys_clk_freq
+
+class RingDecoder(RingLimits):
+    def __init__(self, do, sys_clk_freq, lanes=1, bits=24, chip="WS2812B", tolerance=150e-9,
+                 max_low=5e-6, time_scale=1, record=False, fast_forward=None):
+        RingLimits.__init__(self, sys_clk_freq, chip, tolerance, max_low, time_scale)
+        self.do           = do
+        self.lanes        = lanes
+        self.bits         = bits
+        self.fast_forward = fast_forward
+
+        # With record, every sample of do is kept (see trace())
+        self.record       = record
+        self.samples      = []
+
+        # Results:
+        #  frames:      frames[n][lane][led] is a pixel (MSB sent first)
+        #  frame_start: cycle of the first rising edge of each frame
+        #  frame_end:   cycle of the last falling edge of each frame
+        #  violations:  (cycle, lane, what, length in ns, as seen by the LEDs)
+        #               or (cycle, lane, "PIXEL", bits received) when the
+        #               last pixel of a lane is incomplete
+        self.frames      = []
+        self.frame_start = []
+        self.frame_end   = []
+        self.violations  = []
+        self.cycle       = 0
+
+        self._reset_frame()
+
+    def _reset_frame(self):
+        self._pixels = [[] for l in range(self.lanes)]
+        self._value  = [0]*self.lanes
+        self._nbits  = [0]*self.lanes
+        self._start  = None
+        self._end    = None
+
+    def _violation(self, lane, what, cycles):
+        self.violations.append((self.cycle, lane, what, self.ns(cycles)))
+
+    def _incomplete(self, lane, nbits):
+        self.violations.append((self.cycle, lane, "PIXEL", nbits))
+
+    def _end_frame(self):
+        for l in range(self.lanes):
+            if self._nbits[l]:
+                self._incomplete(l, self._nbits[l])
+        self.frames.append(self._pixels)
+        self.frame_start.append(self._start)
+        self.frame_end.append(self._end)
+        self._reset_frame()
+
+    # -------------------------------------------------------------------
+    # - The decoder itself: add it to the generators of run_simulation.
+    # - do is sampled once per cycle for all the lanes, the decoding is
+    # - only done on edges.
+    # -------------------------------------------------------------------
+    @passive
+    def generator(self):
+        rise = [0]*self.lanes
+        fall = [0]*self.lanes
+        prev = 0
+        ticks = 0
+        skips = 0
+        while True:
+            # Cycles skipped by the FastForward since the last sample
+            while self.fast_forward is not None and skips < len(self.fast_forward.skips):
+                tick, skipped = self.fast_forward.skips[skips]
+                if tick >= ticks:
+                    break
+                if self.record:
+                    self.samples.extend([prev]*skipped)
+                self.cycle += skipped
+                skips      += 1
+            ticks += 1
+            value = (yield self.do)
+            if self.record:
+                self.samples.append(value)
+            if value != prev:
+                for l in range(self.lanes):
+                    mask = 1 << l
+                    if not (value ^ prev) & mask:
+                        continue
+                    if value & mask:
+                        # Rising edge: check the low time
+                        low = self.cycle - fall[l]
+                        if self._start is None:
+                            self._start = self.cycle
+                        if not self._pixels[l] and not self._nbits[l]:
+                            pass    # First bit of the lane in this frame
+                        elif low < self.tl_min:
+                            self._violation(l, "TL", low)
+                        elif low > self.max_low:
+                            self._violation(l, "RES", low)
+                        rise[l] = self.cycle
+                    else:
+                        # Falling edge: a bit has been sent
+                        high = self.cycle - rise[l]
+                        bit  = int(high > self.threshold)
+                        lo, hi = self.t1h if bit else self.t0h
+                        if not lo <= high <= hi:
+                            self._violation(l, "T1H" if bit else "T0H", high)
+                        self._value[l] = (self._value[l] << 1) | bit
+                        self._nbits[l] += 1
+                        if self._nbits[l] == self.bits:
+                            self._pixels[l].append(self._value[l])
+                            self._value[l] = 0
+                            self._nbits[l] = 0
+                        fall[l] = self.cycle
+                        self._end = self.cycle
+                prev = value
+            elif value == 0 and self._end is not None and self.cycle - self._end >= self.reset:
+                self._end_frame()
+            self.cycle += 1
+            yield
+
+    # -------------------------------------------------------------------
+    # - For the testbenches
+    # -------------------------------------------------------------------
+
+    # Returns the first frame that starts after now
+    def next_frame(self):
+        now = self.cycle
+        while not any(start > now for start in self.frame_start):
+            yield
+        return [f for f, start in zip(self.frames, self.frame_start) if start > now][0]
+
+    # Returns the next n frames
+    def next_frames(self, n):
+        now = self.cycle
+        while sum(start > now for start in self.frame_start) < n:
+            yield
+        return [f for f, start in zip(self.frames, self.frame_start) if start > now][:n]
+
+    # Frame n of a lane as (led index, pixel) pairs
+    def leds(self, n=-1, lane=0):
+        return list(enumerate(self.frames[n][lane]))
+
+    # The recorded samples of do, one per cycle, as a NumPy array
+    def trace(self):
+        import numpy as np
+        return np.array(self.samples, dtype=np.uint32)
+
+    # Frames per second of the simulated clock, from the start of the frames
+    def frame_rate(self):
+        if len(self.frame_start) < 2:
+            return None
+        cycles = (self.frame_start[-1] - self.frame_start[0])/(len(self.frame_start) - 1)
+        return self.sys_clk_freq/cycles
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+#
+# Simulation throughput benchmarks of the workshop designs.
+#
+# Each design is elaborated and simulated for a fixed number of sys_clk
+# cycles, without and with a VCD file. Each run is done in its own process
+# and gives:
+#  - elaboration time (building the design and the simulator)
+#  - simulation time and clock cycles per second (all clock domains)
+#  - peak memory of the process
+#  - size of the VCD file
+#
+#    ./tools/simbench.py                          # all, writes simbench.json
+#    ./tools/simbench.py ring -c 50000 -o new.json
+#    ./tools/simbench.py --compare old.json       # ratios against another run
+#
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import importlib
+import subprocess
+
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# -----------------------------------------------------------------------
+# - The designs: script to import, how to build the DUT, what to feed it
+# - with (a generator running until the end) and the clocks.
+# -----------------------------------------------------------------------
+def ring_serial(m):
+    dut = m.RingSerialCtrl(12, 24e6, lanes=2)
+    def stimulus():
+        yield "passive"
+        yield dut.sink.valid.eq(1)
+        while True:
+            yield dut.sink.data.eq(random.randrange(2**48))
+            yield
+    return dut, [stimulus()], {"sys": 1e9/24e6}
+
+def ring_control(m):
+    from migen import Signal
+    dut = m.RingControl(Signal(2), m.mode.DOUBLE, 12, 24e6, 2, with_gamma=True)
+    return dut, [], {"sys": 1e9/24e6}
+
+def compute(m, pipeline):
+    dut = m.Compute(pipeline)
+    def stimulus():
+        yield "passive"
+        yield dut.input1_valid.eq(1)
+        yield dut.input2_valid.eq(1)
+        while True:
+            yield dut.input1.eq(random.randrange(16))
+            yield dut.input2.eq(random.randrange(16))
+            yield
+    return dut, [stimulus()], {"sys": 1e9/100e6}
+
+def workshop_mem(m):
+    from migen import ClockDomainsRenamer
+    dut = ClockDomainsRenamer({"write": "sys", "read": "sclk"})(m.WorkshopMem(m.init_data))
+    def stimulus():
+        yield "passive"
+        yield dut.source.ready.eq(1)
+    return dut, {"sys": [stimulus()]}, {"sys": 1e9/10e6, "sclk": 1e9/100e6}
+
+def s2dma(m):
+    dut = m.S2DMA(32, 16)
+    def stimulus():
+        yield "passive"
+        yield dut.source.ready.eq(1)
+        yield dut.sink.valid.eq(1)
+        while True:
+            for i in range(64):
+                yield dut.sink.data.eq(random.randrange(256))
+                yield dut.sink.last.eq(i == 63)
+                yield
+    return dut, [stimulus()], {"sys": 1e9/100e6}
+
+benchmarks = {
+    "ring_serial":   ("arty_a7/step16/ring.py",                    ring_serial),
+    "ring_control":  ("arty_a7/step16/ring.py",                    ring_control),
+    "compute":       ("arty_a7/extra0/solution/workshop_extra0.py", lambda m: compute(m, False)),
+    "compute_pipe":  ("arty_a7/extra0/solution/workshop_extra0.py", lambda m: compute(m, True)),
+    "workshop_mem":  ("arty_a7/extra1/solution/workshop_extra1.py", workshop_mem),
+    "s2dma":         ("arty_a7/step14/solution/s2dma.py",           s2dma),
+}
+
+# -----------------------------------------------------------------------
+# - One run, in the child process
+# -----------------------------------------------------------------------
+def run(name, cycles, vcd):
+    from migen import passive
+    from migen.sim.core import Simulator
+
+    path, build = benchmarks[name]
+    random.seed(0)
+
+    start = time.time()
+    sys.path.insert(0, os.path.join(root, os.path.dirname(path)))
+    module = importlib.import_module(os.path.basename(path)[:-3])
+    dut, generators, clocks = build(module)
+    if not isinstance(generators, dict):
+        generators = {"sys": generators}
+
+    # The only active generator: it stops the simulation after 'cycles'
+    def count():
+        for i in range(cycles):
+            yield
+    generators["sys"] = list(generators.get("sys", [])) + [count()]
+
+    vcd_name = os.path.join(tempfile.mkdtemp(prefix="simbench_"), "sim.vcd") if vcd else None
+    edges    = [0]
+    with Simulator(dut, generators, clocks=clocks, vcd_name=vcd_name) as s:
+        tick = s.time.tick
+        def counting_tick():
+            dt, rising, falling = tick()
+            edges[0] += len(rising)
+            return dt, rising, falling
+        s.time.tick = counting_tick
+        elaboration = time.time() - start
+
+        start = time.time()
+        s.run()
+        simulation = time.time() - start
+
+    vcd_size = 0
+    if vcd_name:
+        vcd_size = os.path.getsize(vcd_name)
+        os.remove(vcd_name)
+        os.rmdir(os.path.dirname(vcd_name))
+
+    return {
+        "name":            name,
+        "vcd":             vcd,
+        "sys_cycles":      cycles,
+        "cycles":          edges[0],
+        "elaboration_s":   elaboration,
+        "simulation_s":    simulation,
+        "cycles_per_s":    edges[0]/simulation,
+        "peak_memory_kb":  resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "vcd_bytes":       vcd_size,
+    }
+
+# -----------------------------------------------------------------------
+# - Main: one process per run
+# -----------------------------------------------------------------------
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation throughput benchmarks")
+    parser.add_argument("names",          nargs="*",                 help="Benchmarks to run (default: all): " + ", ".join(benchmarks))
+    parser.add_argument("-c", "--cycles", default=20000,             help="sys_clk cycles simulated by each run (default: 20000)")
+    parser.add_argument("-o", "--output", default="simbench.json",   help="Results file (default: simbench.json)")
+    parser.add_argument("--compare",      default=None,              help="Results file to compare with")
+    parser.add_argument("--child",        nargs=2,                   help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        name, vcd = args.child
+        print(json.dumps(run(name, int(args.cycles), vcd == "vcd")))
+        return
+
+    import migen
+    names   = [n for n in benchmarks if not args.names or any(f in n for f in args.names)]
+    results = []
+    for name in names:
+        for vcd in ("novcd", "vcd"):
+            p = subprocess.run([sys.executable, __file__, "--child", name, vcd, "-c", str(args.cycles)],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                r = json.loads(p.stdout.decode().splitlines()[-1])
+                print("{:<14} {:<6} {:>9.0f} cycles/s  elaboration {:6.2f}s  simulation {:7.2f}s  "
+                      "{:>7} kB  VCD {:>10} bytes".format(
+                      name, vcd, r["cycles_per_s"], r["elaboration_s"], r["simulation_s"],
+                      r["peak_memory_kb"], r["vcd_bytes"]))
+            except (IndexError, ValueError):
+                error = (p.stderr.decode().strip().splitlines() or ["no output"])[-1]
+                r = {"name": name, "vcd": vcd == "vcd", "error": error}
+                print("{:<14} {:<6} ERROR {}".format(name, vcd, error))
+            results.append(r)
+
+    report = {
+        "revision": git_revision(),
+        "date":     time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python":   platform.python_version(),
+        "migen":    getattr(migen, "__version__", None),
+        "machine":  platform.machine(),
+        "results":  results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        old = {(r["name"], r["vcd"]): r for r in json.load(open(args.compare))["results"]}
+        print("Compared with {}:".format(args.compare))
+        for r in results:
+            o = old.get((r["name"], r["vcd"]))
+            if o is None or "error" in o or "error" in r:
+                continue
+            print("{:<14} {:<6} cycles/s x{:.2f}  elaboration x{:.2f}  memory x{:.2f}".format(
+                r["name"], "vcd" if r["vcd"] else "novcd",
+                r["cycles_per_s"]/o["cycles_per_s"], r["elaboration_s"]/o["elaboration_s"],
+                r["peak_memory_kb"]/o["peak_memory_kb"]))
+
+if __name__ == "__main__":
+    main()
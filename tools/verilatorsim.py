@@ -0,0 +1,454 @@
+#
+# Runs the usual Migen generator testbenches on a Verilator model.
+#
+# run_verilator() takes the same arguments as run_simulation(). The design
+# is converted to Verilog, compiled by Verilator into a shared library and
+# the generators drive it with the usual requests:
+#
+#    yield dut.sink.valid.eq(1)       # write (at the next clock edge)
+#    value = (yield dut.done)         # read (any expression)
+#    value = (yield dut.mem[3])       # memory read
+#    yield                            # next clock cycle
+#
+#    run_verilator(dut, [test(dut), decoder.generator()], clocks={"sys": 1e9/24e6})
+#
+# Generators see the same values, at the same cycles, as with run_simulation.
+# All the signals of the design can be read and written: Verilator is run
+# with --public-flat-rw and the signals are reached through VPI by their
+# Verilog name. Signals read by the design but driven by nobody (the inputs
+# of the DUT) are made ports of the top module, 'ios' adds more ports.
+#
+# Needs Verilator (5.x) and a C++ compiler. The model is only rebuilt when
+# the Verilog changes. VCD files are written by Verilator (--trace).
+#
+
+import os
+import ctypes
+import inspect
+import hashlib
+import subprocess
+import collections
+import collections.abc
+
+from migen import *
+from migen.fhdl import verilog
+from migen.fhdl.structure import _Value, _Statement, _Fragment
+from migen.fhdl.specials import _MemoryLocation
+from migen.fhdl.tools import list_signals, list_targets, list_special_ios
+from migen.sim.core import Evaluator, TimeManager
+
+# -----------------------------------------------------------------------
+# - The C side: a few functions around the Verilated model, called with
+# - ctypes. Values are passed as arrays of 32-bit words, LSB first.
+# -----------------------------------------------------------------------
+harness = r"""
+#include <cstdint>
+#include <vector>
+#include "Vtop.h"
+#include "verilated.h"
+#include "verilated_vpi.h"
+#if VM_TRACE
+#include "verilated_vcd_c.h"
+#endif
+
+struct Sim {
+    VerilatedContext *context;
+    Vtop             *top;
+#if VM_TRACE
+    VerilatedVcdC    *vcd;
+#endif
+};
+
+extern "C" {
+
+void *sim_new(const char *vcd_name)
+{
+    Sim *sim = new Sim;
+    sim->context = new VerilatedContext;
+#if VM_TRACE
+    sim->vcd = NULL;
+    if (vcd_name)
+        sim->context->traceEverOn(true);
+#endif
+    sim->top = new Vtop(sim->context);
+#if VM_TRACE
+    if (vcd_name) {
+        sim->vcd = new VerilatedVcdC;
+        sim->top->trace(sim->vcd, 99);
+        sim->vcd->open(vcd_name);
+    }
+#endif
+    return sim;
+}
+
+void sim_eval(void *p, uint64_t time)
+{
+    Sim *sim = (Sim *)p;
+    sim->context->time(time);
+    sim->top->eval();
+}
+
+void sim_dump(void *p, uint64_t time)
+{
+#if VM_TRACE
+    Sim *sim = (Sim *)p;
+    if (sim->vcd)
+        sim->vcd->dump(time);
+#endif
+}
+
+void sim_free(void *p)
+{
+    Sim *sim = (Sim *)p;
+    sim->top->final();
+#if VM_TRACE
+    if (sim->vcd) {
+        sim->vcd->close();
+        delete sim->vcd;
+    }
+#endif
+    delete sim->top;
+    delete sim->context;
+    delete sim;
+}
+
+void *sim_handle(const char *name)
+{
+    return vpi_handle_by_name((PLI_BYTE8 *)name, NULL);
+}
+
+void *sim_index(void *handle, int index)
+{
+    return vpi_handle_by_index((vpiHandle)handle, index);
+}
+
+void sim_get(void *handle, uint32_t *words, int nwords)
+{
+    s_vpi_value value;
+    value.format = vpiVectorVal;
+    vpi_get_value((vpiHandle)handle, &value);
+    for (int i = 0; i < nwords; i++)
+        words[i] = value.value.vector[i].aval;
+}
+
+void sim_put(void *handle, const uint32_t *words, int nwords)
+{
+    std::vector<s_vpi_vecval> vector(nwords);
+    s_vpi_value value;
+    for (int i = 0; i < nwords; i++) {
+        vector[i].aval = words[i];
+        vector[i].bval = 0;
+    }
+    value.format = vpiVectorVal;
+    value.value.vector = vector.data();
+    vpi_put_value((vpiHandle)handle, &value, NULL, vpiNoDelay);
+}
+
+}
+"""
+
+# -----------------------------------------------------------------------
+# - Conversion and build
+# -----------------------------------------------------------------------
+def _build(fragment, ios, build_dir, trace, verilator):
+    conv = verilog.convert(fragment, ios, name="top")
+
+    # Memory init files are read at runtime: give their full path
+    os.makedirs(build_dir, exist_ok=True)
+    source = conv.main_source
+    for filename, content in conv.data_files.items():
+        path = os.path.abspath(os.path.join(build_dir, filename))
+        with open(path, "w") as f:
+            f.write(content)
+        source = source.replace('$readmemh("{}"'.format(filename), '$readmemh("{}"'.format(path))
+
+    # Rebuild only if something changed
+    library = os.path.join(build_dir, "obj", "libtop.so")
+    digest  = hashlib.sha1((source + harness + str(trace)).encode()).hexdigest()
+    stamp   = os.path.join(build_dir, "top.sha1")
+    if os.path.exists(library) and os.path.exists(stamp) and open(stamp).read() == digest:
+        return conv, library
+
+    with open(os.path.join(build_dir, "top.v"), "w") as f:
+        f.write(source)
+    with open(os.path.join(build_dir, "harness.cpp"), "w") as f:
+        f.write(harness)
+
+    cmd = [verilator, "--cc", "top.v", "--top-module", "top", "--exe", "harness.cpp",
+           "--build", "-j", "0", "--Mdir", "obj", "-o", "libtop.so",
+           "--vpi", "--public-flat-rw", "-Wno-fatal", "-O3",
+           "-CFLAGS", "-fPIC -O2", "-LDFLAGS", "-shared"]
+    if trace:
+        cmd.append("--trace")
+    subprocess.run(cmd, cwd=build_dir, check=True)
+
+    with open(stamp, "w") as f:
+        f.write(digest)
+    return conv, library
+
+# -----------------------------------------------------------------------
+# - Signal values come from the model. They are read when a generator
+# - asks for them and kept until the model is evaluated again.
+# -----------------------------------------------------------------------
+class _NotInDesign(ValueError):
+    pass
+
+class _ModelValues(dict):
+    def __init__(self, model):
+        self.model = model
+
+    def __missing__(self, signal):
+        try:
+            value = self.model.get(signal)
+        except _NotInDesign:
+            # Like run_simulation: a signal used by nobody keeps its reset value
+            value = signal.reset.value
+        self[signal] = value
+        return value
+
+class _Model:
+    def __init__(self, library, ns, ports, vcd_name):
+        self.lib = lib = ctypes.CDLL(os.path.abspath(library))
+        lib.sim_new.restype     = ctypes.c_void_p
+        lib.sim_new.argtypes    = [ctypes.c_char_p]
+        lib.sim_eval.argtypes   = [ctypes.c_void_p, ctypes.c_uint64]
+        lib.sim_dump.argtypes   = [ctypes.c_void_p, ctypes.c_uint64]
+        lib.sim_free.argtypes   = [ctypes.c_void_p]
+        lib.sim_handle.restype  = ctypes.c_void_p
+        lib.sim_handle.argtypes = [ctypes.c_char_p]
+        lib.sim_index.restype   = ctypes.c_void_p
+        lib.sim_index.argtypes  = [ctypes.c_void_p, ctypes.c_int]
+        lib.sim_get.argtypes    = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]
+        lib.sim_put.argtypes    = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]
+
+        self.ns      = ns
+        self.ports   = ports
+        self.sim     = lib.sim_new(vcd_name.encode() if vcd_name else None)
+        self.handles = dict()
+
+    def close(self):
+        self.lib.sim_free(self.sim)
+
+    def eval(self, time):
+        self.lib.sim_eval(self.sim, time)
+
+    def dump(self, time):
+        self.lib.sim_dump(self.sim, time)
+
+    # VPI handle of a signal, or of a memory word (memory, index)
+    def handle(self, key):
+        try:
+            return self.handles[key]
+        except KeyError:
+            pass
+        if isinstance(key, tuple):
+            handle = self.lib.sim_index(self.handle(key[0]), key[1])
+        else:
+            try:
+                name = self.ns.get_name(key)
+            except KeyError:
+                raise _NotInDesign("{} is not in the converted design".format(key))
+            # Ports are written in the TOP scope (the top module only has
+            # copies of them), everything else is in the top module.
+            scopes = ["TOP", "TOP.top"] if key in self.ports else ["TOP.top"]
+            handle = None
+            for scope in scopes:
+                handle = handle or self.lib.sim_handle("{}.{}".format(scope, name).encode())
+        if not handle:
+            raise ValueError("No VPI handle for {}".format(key))
+        self.handles[key] = handle
+        return handle
+
+    def get(self, key, nbits=None, signed=False):
+        if nbits is None:
+            nbits, signed = key.nbits, key.signed
+        nwords = (nbits + 31)//32
+        words  = (ctypes.c_uint32*nwords)()
+        self.lib.sim_get(self.handle(key), words, nwords)
+        value = sum(w << 32*i for i, w in enumerate(words)) & (2**nbits - 1)
+        if signed and value >> (nbits - 1):
+            value -= 2**nbits
+        return value
+
+    def put(self, key, value, nbits=None):
+        if nbits is None:
+            nbits = key.nbits
+        value &= 2**nbits - 1
+        nwords = (nbits + 31)//32
+        words  = (ctypes.c_uint32*nwords)(*[(value >> 32*i) & 0xffffffff for i in range(nwords)])
+        self.lib.sim_put(self.handle(key), words, nwords)
+
+# The migen evaluator, reading and writing the model. Writes are kept in
+# 'modifications' until the next clock edge, like with run_simulation.
+class _ModelEvaluator(Evaluator):
+    def __init__(self, model, clock_domains):
+        Evaluator.__init__(self, clock_domains, {})
+        self.model         = model
+        self.signal_values = _ModelValues(model)
+        self.memory_writes = dict()
+
+    def eval(self, node, postcommit=False):
+        if isinstance(node, _MemoryLocation):
+            memory = node.memory
+            key    = (memory, self.eval(node.index, postcommit))
+            if postcommit and key in self.memory_writes:
+                return self.memory_writes[key]
+            return self.model.get(key, memory.width)
+        return Evaluator.eval(self, node, postcommit)
+
+    def assign(self, node, value):
+        if isinstance(node, _MemoryLocation):
+            memory = node.memory
+            self.memory_writes[(memory, self.eval(node.index))] = value & (2**memory.width - 1)
+        else:
+            Evaluator.assign(self, node, value)
+
+    def commit(self):
+        for signal, value in self.modifications.items():
+            try:
+                self.model.put(signal, value)
+            except _NotInDesign:
+                pass
+        for (memory, index), value in self.memory_writes.items():
+            self.model.put((memory, index), value, memory.width)
+        self.modifications.clear()
+        self.memory_writes.clear()
+
+    def invalidate(self):
+        self.signal_values.clear()
+
+# -----------------------------------------------------------------------
+# - The simulator
+# -----------------------------------------------------------------------
+class VerilatorSimulator:
+    def __init__(self, fragment_or_module, generators, clocks={"sys": 10}, vcd_name=None,
+                 build_dir="verilator", ios=None, verilator="verilator"):
+        if isinstance(fragment_or_module, _Fragment):
+            fragment = fragment_or_module
+        else:
+            fragment = fragment_or_module.get_fragment()
+
+        # Same clocks as run_simulation: domains without a ClockDomain get one
+        clocks = collections.OrderedDict(sorted(clocks.items()))
+        self.time = TimeManager(clocks)
+        for clock in clocks.keys():
+            if clock not in fragment.clock_domains:
+                fragment.clock_domains.append(ClockDomain(clock, reset_less=True))
+
+        # The inputs of the design are the signals nobody drives
+        special_outs = list_special_ios(fragment, False, True, True)
+        inputs = ((list_signals(fragment) | list_special_ios(fragment, True, False, False))
+                  - list_targets(fragment) - special_outs)
+        ports  = set(inputs) | set(ios or [])
+        resets = set()
+        for cd in fragment.clock_domains:
+            ports.add(cd.clk)
+            if cd.rst is not None:
+                resets.add(cd.rst)
+        ports |= resets
+
+        conv, library = _build(fragment, ports, build_dir, vcd_name is not None, verilator)
+        self.model     = _Model(library, conv.ns, ports, vcd_name)
+        self.evaluator = _ModelEvaluator(self.model, fragment.clock_domains)
+        self.clocks    = {cd.name: cd.clk for cd in fragment.clock_domains if cd.name in clocks}
+        self.inputs    = inputs | resets
+        self.now       = 0
+
+        if not isinstance(generators, dict):
+            generators = {"sys": generators}
+        self.generators = dict()
+        self.passive_generators = set()
+        for k, v in generators.items():
+            if isinstance(v, collections.abc.Iterable) and not inspect.isgenerator(v):
+                self.generators[k] = list(v)
+            else:
+                self.generators[k] = [v]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def close(self):
+        self.model.close()
+
+    def _evalexec_nested_lists(self, x):
+        if isinstance(x, list):
+            return [self._evalexec_nested_lists(e) for e in x]
+        elif isinstance(x, _Value):
+            return self.evaluator.eval(x)
+        elif isinstance(x, _Statement):
+            self.evaluator.execute([x])
+            return None
+        else:
+            raise ValueError("Invalid simulator exec/eval request", x)
+
+    # Same protocol as the migen simulator
+    def _process_generators(self, cd):
+        exhausted = []
+        for generator in self.generators[cd]:
+            reply = None
+            while True:
+                try:
+                    request = generator.send(reply)
+                    if request is None:
+                        break  # next cycle
+                    elif isinstance(request, str):
+                        if request == "passive":
+                            self.passive_generators.add(generator)
+                        elif request == "active":
+                            self.passive_generators.discard(generator)
+                        else:
+                            raise ValueError("Unknown simulator command: '{}'".format(request))
+                    else:
+                        reply = self._evalexec_nested_lists(request)
+                except StopIteration:
+                    exhausted.append(generator)
+                    break
+        for generator in exhausted:
+            self.generators[cd].remove(generator)
+
+    def _continue_simulation(self):
+        for cd_generators in self.generators.values():
+            if set(cd_generators) - self.passive_generators:
+                return True
+        return False
+
+    def _eval(self):
+        self.model.eval(int(self.now))
+        self.evaluator.invalidate()
+
+    def run(self):
+        # Ports have no initial value in Verilog
+        for signal in self.inputs:
+            self.model.put(signal, signal.reset.value)
+        for name, clk in self.clocks.items():
+            self.model.put(clk, int(self.time.clocks[name].high))
+        self._eval()
+        self.model.dump(0)
+
+        while True:
+            dt, rising, falling = self.time.tick()
+            self.now += dt
+
+            # The generators see the values from before the edge, their
+            # writes are applied with the edge.
+            for cd in sorted(rising):
+                if cd in self.generators:
+                    self._process_generators(cd)
+            for cd in rising | falling:
+                if cd in self.clocks:
+                    self.model.put(self.clocks[cd], int(cd in rising))
+            self._eval()
+            if self.evaluator.modifications or self.evaluator.memory_writes:
+                self.evaluator.commit()
+                self._eval()
+            self.model.dump(int(self.now))
+
+            if not self._continue_simulation():
+                break
+
+def run_verilator(*args, **kwargs):
+    with VerilatorSimulator(*args, **kwargs) as s:
+        s.run()
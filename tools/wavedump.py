@@ -0,0 +1,128 @@
+#
+# Selective and streamed VCD dumps for run_simulation.
+#
+# The migen simulator dumps every signal of the design, for the whole run,
+# in a temporary file copied into the VCD file at the end. This one only
+# dumps the signals we ask for, streams them to the file as the simulation
+# runs (gzip compressed if the file name ends with .gz, GTKWave reads it)
+# and can be started and stopped by conditions.
+#
+#    from wavedump import run_simulation, debug_signals
+#
+#    run_simulation(dut, generators, clocks={"sys": 1e9/24e6}, vcd_name="sim.vcd.gz",
+#                   signals=[dut.do, dut.ring.fsm.state] + debug_signals(dut),
+#                   start=dut.ring.frame_done,      # a migen expression...
+#                   stop=lambda: decoder.cycle > 50000)   # ...or a function
+#
+# Without 'signals' everything is dumped, like with migen. The dump is
+# (re)started each time 'start' is true while stopped, and stopped when
+# 'stop' is true. The values of all the signals are dumped at each start.
+#
+
+import gzip
+
+from migen.fhdl.structure import _Value
+from migen.fhdl.namer import build_namespace
+from migen.fhdl.tools import list_signals
+from migen.sim.core import Simulator
+from migen.sim.vcd import vcd_codes
+
+# -----------------------------------------------------------------------
+# - The signals of the self.dbg lists of a module and its submodules
+# - (the ones given to LiteScope in the workshop)
+# -----------------------------------------------------------------------
+def debug_signals(module):
+    signals = list(getattr(module, "dbg", []))
+    for name, submodule in module._submodules:
+        signals += debug_signals(submodule)
+    return signals
+
+class StreamVCDWriter:
+    def __init__(self, filename, signals, evaluator, start=None, stop=None, timescale=1000):
+        self.evaluator = evaluator
+        self.start     = start
+        self.stop      = stop
+        # Simulation times are in ns, with decimals: the file is in ps
+        self.timescale = timescale
+
+        opener = gzip.open if filename.endswith(".gz") else open
+        self.file = opener(filename, "wt")
+
+        self.codes  = {}
+        self.values = {}
+        codes = vcd_codes()
+        ns    = build_namespace(signals)
+        self.file.write("$timescale 1ps $end\n")
+        for signal in sorted(signals, key=lambda x: x.duid):
+            code = next(codes)
+            self.codes[signal] = code
+            self.file.write("$var wire {} {} {} $end\n".format(len(signal), code, ns.get_name(signal)))
+        self.file.write("$enddefinitions $end\n")
+
+        self.t         = 0
+        self.written_t = None
+        self.recording = False
+        if start is None:
+            self._start()
+
+    def _condition(self, condition):
+        if isinstance(condition, _Value):
+            return self.evaluator.eval(condition)
+        return condition()
+
+    def _timestamp(self):
+        if self.written_t != self.t:
+            self.file.write("#{}\n".format(int(round(self.t*self.timescale))))
+            self.written_t = self.t
+
+    def _write(self, signal, value):
+        self._timestamp()
+        if value < 0:
+            value += 2**len(signal)
+        if len(signal) > 1:
+            self.file.write("b{:b} {}\n".format(value, self.codes[signal]))
+        else:
+            self.file.write("{}{}\n".format(value, self.codes[signal]))
+        self.values[signal] = value
+
+    def _start(self):
+        self.recording = True
+        for signal in self.codes:
+            self._write(signal, self.evaluator.eval(signal))
+
+    # Called by the simulator
+    def set(self, signal, value):
+        if self.recording and signal in self.codes:
+            if value < 0:
+                value += 2**len(signal)
+            if self.values.get(signal) != value:
+                self._write(signal, value)
+
+    def delay(self, delay):
+        self.t += delay
+        if self.recording:
+            if self.stop is not None and self._condition(self.stop):
+                self._timestamp()
+                self.recording = False
+        elif self.start is not None and self._condition(self.start):
+            self._start()
+
+    def close(self):
+        if self.recording:
+            self._timestamp()
+        self.file.close()
+
+# -----------------------------------------------------------------------
+# - Same as migen's run_simulation, with the dump options
+# -----------------------------------------------------------------------
+def run_simulation(fragment_or_module, generators, clocks={"sys": 10}, vcd_name=None,
+                   special_overrides={}, signals=None, start=None, stop=None, with_clocks=True):
+    with Simulator(fragment_or_module, generators, clocks, None, special_overrides) as s:
+        if vcd_name is not None:
+            if signals is None:
+                signals = list_signals(s.fragment)
+            signals = set(signals)
+            if with_clocks:
+                signals |= {cd.clk for cd in s.fragment.clock_domains}
+            s.vcd = StreamVCDWriter(vcd_name, signals, s.evaluator, start, stop)
+        s.run()